@@ -3,6 +3,11 @@ from flask_cors import CORS
 import json
 import os
 import re
+import threading
+
+from scraping.common.delta import DeltaReader, apply
+from scraping.common.records import product_key
+from scraping.common.store import DB_PATH, get_store
 
 app = Flask(__name__)
 CORS(app)
@@ -35,6 +40,31 @@ def is_mobile_product(name):
 def to_str_or_na(value):
     return 'N/A' if value is None else str(value)
 
+# source -> (DeltaReader, {product_key: record}): loaded from the store once, then
+# kept current by applying the deltas scraper runs append. Flask serves requests on
+# several threads: reading a delta log and applying it happen under _cache_lock.
+_cache = {}
+_cache_lock = threading.Lock()
+
+def load_entries(source, json_file):
+    """Live products of `source`; the exported JSON file is only read when the store
+    has none (e.g. before the first run that used it)"""
+    if os.path.exists(DB_PATH):
+        with _cache_lock:
+            if source not in _cache:
+                # Position the reader first: a run saved while loading is applied twice, which is harmless
+                reader = DeltaReader(source)
+                _cache[source] = reader, {product_key(p): p for p in get_store().products(source=source)}
+            reader, products = _cache[source]
+            apply(products, reader.read())
+            entries = list(products.values())
+        if entries:
+            return entries
+    if os.path.exists(json_file):
+        with open(json_file, 'r') as f:
+            return json.load(f)
+    return []
+
 def parse_reviews(reviews): #"1,234 Reviews"    → 1234
     if isinstance(reviews, str) and re.search(r'\d', reviews):
         return int(re.sub(r'[^\d]', '', reviews))
@@ -48,64 +78,52 @@ def get_products():
     seen_croma = set()
 
     # Process Flipkart data
-    flipkart_file = 'flipkart_mobiles.json'
-    if os.path.exists(flipkart_file):
-        with open(flipkart_file, 'r') as f:
-            flipkart_data = json.load(f)
-            for entry in flipkart_data:
-                title = entry.get('title', '')
-                if title not in seen_flipkart and is_mobile_product(title):
-                    seen_flipkart.add(title)
-                    mobile_name = clean_mobile_name(title)
-                    color = extract_color(title)
-                    product = {
-                        "mobile_name": mobile_name.lower(),
-                        "color": color,
-                        "source": "Flipkart",
-                        "price": to_str_or_na(entry.get('price')),
-                        "ratings_count": parse_reviews(entry.get('reviews')),
-                    }
-                    products.append(product)
+    for entry in load_entries('flipkart_mobiles', 'flipkart_mobiles.json'):
+        title = entry.get('title', '')
+        if title not in seen_flipkart and is_mobile_product(title):
+            seen_flipkart.add(title)
+            mobile_name = clean_mobile_name(title)
+            color = extract_color(title)
+            product = {
+                "mobile_name": mobile_name.lower(),
+                "color": color,
+                "source": "Flipkart",
+                "price": to_str_or_na(entry.get('price')),
+                "ratings_count": parse_reviews(entry.get('reviews')),
+            }
+            products.append(product)
 
     # Process Amazon data
-    amazon_file = 'amazon_mobiles.json'
-    if os.path.exists(amazon_file):
-        with open(amazon_file, 'r') as f:
-            amazon_data = json.load(f)
-            for entry in amazon_data:
-                name = entry.get('name', '')
-                if name not in seen_amazon and is_mobile_product(name):
-                    seen_amazon.add(name)
-                    mobile_name = clean_mobile_name(name)
-                    color = extract_color(name)
-                    product = {
-                        "mobile_name": mobile_name.lower(),
-                        "color": color,
-                        "source": "Amazon",
-                        "price": to_str_or_na(entry.get('price')),
-                        "ratings_count": parse_reviews(entry.get('reviews')),
-                    }
-                    products.append(product)
+    for entry in load_entries('amazon_mobiles', 'amazon_mobiles.json'):
+        name = entry.get('name', '')
+        if name not in seen_amazon and is_mobile_product(name):
+            seen_amazon.add(name)
+            mobile_name = clean_mobile_name(name)
+            color = extract_color(name)
+            product = {
+                "mobile_name": mobile_name.lower(),
+                "color": color,
+                "source": "Amazon",
+                "price": to_str_or_na(entry.get('price')),
+                "ratings_count": parse_reviews(entry.get('reviews')),
+            }
+            products.append(product)
 
     # Process Croma data
-    croma_file = 'croma_mobiles.json'
-    if os.path.exists(croma_file):
-        with open(croma_file, 'r') as f:
-            croma_data = json.load(f)
-            for entry in croma_data:
-                name = entry.get('name', '')
-                if name not in seen_croma and is_mobile_product(name):
-                    seen_croma.add(name)
-                    mobile_name = clean_mobile_name(name)
-                    color = extract_color(name)
-                    product = {
-                        "mobile_name": mobile_name.lower(),
-                        "color": color,
-                        "source": "Croma",
-                        "price": to_str_or_na(entry.get('price')),
-                        "ratings_count": None,
-                    }
-                    products.append(product)
+    for entry in load_entries('croma_mobiles', 'croma_mobiles.json'):
+        name = entry.get('name', '')
+        if name not in seen_croma and is_mobile_product(name):
+            seen_croma.add(name)
+            mobile_name = clean_mobile_name(name)
+            color = extract_color(name)
+            product = {
+                "mobile_name": mobile_name.lower(),
+                "color": color,
+                "source": "Croma",
+                "price": to_str_or_na(entry.get('price')),
+                "ratings_count": None,
+            }
+            products.append(product)
 
     if not products:
         return jsonify({'error': 'No valid products found'}), 404
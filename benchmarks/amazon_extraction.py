@@ -0,0 +1,72 @@
+# benchmarks/amazon_extraction.py
+#
+# Per-page card extraction time of the Amazon scrapers: the old path (one
+# WebDriver call per field per card) against the single execute_script read.
+# Both run on the same loaded page, so only extraction is measured.
+#
+#   python -m benchmarks.amazon_extraction --category laptops --pages 2 --runs 3
+
+import argparse
+import statistics
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from scraping import amazon_laptop, amazon_scraper
+from scraping.common.driver_setup import get_pool, close_pool, lease_driver
+
+SCRAPERS = {"mobiles": amazon_scraper, "laptops": amazon_laptop}
+
+
+def time_extraction(extract, driver, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        products = extract(driver)
+        timings.append(time.perf_counter() - start)
+    return products, statistics.median(timings)
+
+
+def benchmark(category="mobiles", pages=1, runs=3):
+    module = SCRAPERS[category]
+    results = []
+
+    for page in range(1, pages + 1):
+        url = f"{module.BASE_URL}&page={page}"
+        with lease_driver(url=url) as driver:
+            module.limiter.wait(url)
+            driver.get(url)
+            WebDriverWait(driver, 25).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, module.CARD_CSS))
+            )
+            old, old_s = time_extraction(module.extract_products_by_element, driver, runs)
+            new, new_s = time_extraction(module.extract_products, driver, runs)
+
+        results.append({"page": page, "cards": len(new), "by_element_s": old_s,
+                        "one_script_s": new_s, "same_output": old == new})
+        print(f"📊 [amazon_{category}] page {page}: {len(new)} cards, "
+              f"by element {old_s * 1000:.0f} ms, one script {new_s * 1000:.0f} ms "
+              f"({old_s / max(new_s, 1e-9):.0f}x){'' if old == new else ' ⚠️ outputs differ'}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Amazon card extraction")
+    parser.add_argument("--category", choices=list(SCRAPERS), default="mobiles")
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=3, help="Extractions per page (median is reported)")
+    parser.add_argument("--headless", action="store_true")
+    args = parser.parse_args()
+
+    get_pool(headless=args.headless)
+    try:
+        benchmark(args.category, pages=args.pages, runs=args.runs)
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
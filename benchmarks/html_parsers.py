@@ -0,0 +1,78 @@
+# benchmarks/html_parsers.py
+#
+# Parse time of the saved Flipkart listing pages (debug/page_*.html and
+# debug/page_laptop_*.html) with every available HTML parser backend, with and
+# without SoupStrainer scoping. "html.parser, full tree" is what the scrapers
+# did before. Also checks that every variant extracts the same products.
+#
+#   python -m benchmarks.html_parsers --runs 3
+
+import argparse
+import glob
+import re
+import statistics
+import time
+
+from scraping import flipkart_laptop, flipkart_mobiles
+from scraping.common.parsing import available_backends, get_backend
+
+PAGE_SETS = {
+    "flipkart_mobiles": (flipkart_mobiles, "debug/page_[0-9]*.html"),
+    "flipkart_laptops": (flipkart_laptop, "debug/page_laptop_*.html"),
+}
+
+
+def parse_products(module, html, backend, scoped):
+    cards = backend.cards(html, module.CARD_CSS, strainers=module.CARD_STRAINERS if scoped else ())
+    products = [module.scrape_product(card, backend) for card in cards]
+    # Timestamps differ between runs, everything else must match
+    return [{k: v for k, v in p.items() if k != "timestamp"} for p in products if p]
+
+
+def benchmark(runs=3, limit=None):
+    results = []
+    variants = [(name, scoped) for name in available_backends()
+                for scoped in ((False, True) if name != "selectolax" else (False,))]
+
+    for job, (module, pattern) in PAGE_SETS.items():
+        files = sorted(glob.glob(pattern), key=lambda f: int(re.findall(r"\d+", f)[-1]))[:limit]
+        if not files:
+            print(f"⚠️ [{job}] no saved pages match {pattern}")
+            continue
+        pages = [open(f, encoding="utf-8").read() for f in files]
+
+        reference = None
+        for name, scoped in variants:
+            backend = get_backend(name)
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                output = [parse_products(module, html, backend, scoped) for html in pages]
+                timings.append((time.perf_counter() - start) / len(pages))
+            reference = reference if reference is not None else output
+            per_page = statistics.median(timings)
+            results.append({"job": job, "parser": name, "scoped": scoped, "pages": len(pages),
+                            "per_page_ms": round(per_page * 1000, 2), "same_output": output == reference})
+
+        rows = results[-len(variants):]
+        # Speedups are relative to the old setup: html.parser building the full tree
+        baseline = next(r["per_page_ms"] for r in rows if r["parser"] == "html.parser" and not r["scoped"])
+        print(f"\n📊 [{job}] {len(pages)} pages")
+        for row in rows:
+            label = f"{row['parser']}, {'strainer' if row['scoped'] else 'full tree'}"
+            print(f"   {label:<26} {row['per_page_ms']:>8.1f} ms/page  "
+                  f"{baseline / row['per_page_ms']:>5.1f}x{'' if row['same_output'] else '  ⚠️ output differs'}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends on saved pages")
+    parser.add_argument("--runs", type=int, default=3, help="Passes over the pages (median is reported)")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N pages of each set")
+    args = parser.parse_args()
+    benchmark(runs=args.runs, limit=args.limit)
+
+
+if __name__ == "__main__":
+    main()
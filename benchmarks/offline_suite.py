@@ -0,0 +1,202 @@
+# benchmarks/offline_suite.py
+#
+# Every site parser run over the pages saved in the repo, no network or browser:
+# pages/s, products/s, peak memory of one pass and how often each field was
+# extracted. Results are written to benchmarks/results/offline_<commit>.json and
+# compared with the previous results file, so a slower parser or a selector
+# that stopped matching shows up between commits. The run fails (exit status 1)
+# when a suite extracts no products or never extracts one of its fields.
+#
+#   python -m benchmarks.offline_suite --runs 3
+#
+# Amazon reads the same CARD_CSS/CARD_FIELDS the live scraper uses, through
+# parse_cards() instead of the browser DOM. Croma has no saved pages yet: a live
+# run of croma_scraper saves debug/croma_page_1.html, then add
+# "croma_mobiles": ("debug/croma_page_*.html", card_fields(croma_scraper)).
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.html_parsers import parse_products
+from scraping import amazon_scraper, flipkart_laptop, flipkart_mobiles, reliance_scraper
+from scraping.common.dom import parse_cards
+from scraping.common.parsing import BACKENDS, DEFAULT_PARSER, get_backend
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+# Values that count as "field not extracted"
+MISSING = (None, "", "N/A", [])
+
+
+def flipkart(module):
+    return lambda html, backend: parse_products(module, html, backend, scoped=True)
+
+
+def card_fields(module):
+    def parse(html, backend):
+        raw = parse_cards(html, module.CARD_CSS, module.CARD_FIELDS, backend)
+        return [p for p in map(module.clean_product, raw) if p]
+    return parse
+
+
+SUITES = {
+    "flipkart_mobiles": ("debug/page_[0-9]*.html", flipkart(flipkart_mobiles)),
+    "flipkart_laptops": ("debug/page_laptop_*.html", flipkart(flipkart_laptop)),
+    "amazon_mobiles": ("debug/amazon_page_*.html", card_fields(amazon_scraper)),
+    # parse_5g_page always builds its own lxml soup
+    "reliance_5g": ("scraping/page_source_*.html", lambda html, backend: reliance_scraper.parse_5g_page(html)),
+}
+
+
+def field_rates(products):
+    """Share of products where each field was extracted"""
+    fields = sorted({k for p in products for k in p if k != "timestamp"})
+    return {f: round(sum(p.get(f) not in MISSING for p in products) / len(products), 3)
+            for f in fields}
+
+
+def run_suite(parse, pages, backend, runs):
+    # The parsers print per product; keep that out of the output (and the timings)
+    with contextlib.redirect_stdout(io.StringIO()):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            products = [p for html in pages for p in parse(html, backend)]
+            timings.append(time.perf_counter() - start)
+
+        # Separate pass: tracemalloc slows allocation down a lot
+        tracemalloc.start()
+        for html in pages:
+            parse(html, backend)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    elapsed = statistics.median(timings)
+    return {
+        "pages": len(pages),
+        "products": len(products),
+        "pages_per_s": round(len(pages) / elapsed, 2),
+        "products_per_s": round(len(products) / elapsed, 2),
+        "peak_mb": round(peak / 2**20, 2),
+        "field_rates": field_rates(products) if products else {},
+    }
+
+
+def failures(results):
+    """Suites that extracted no products, or never extracted one of their fields"""
+    failed = []
+    for name, row in results["suites"].items():
+        if not row.get("products"):
+            failed.append(f"{name}: no products")
+        failed.extend(f"{name}.{field}: never extracted" for field, rate in row["field_rates"].items() if not rate)
+    return failed
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def previous_results(exclude):
+    files = [f for f in glob.glob(os.path.join(RESULTS_DIR, "offline_*.json"))
+             if os.path.abspath(f) != os.path.abspath(exclude)]
+    if not files:
+        return None
+    with open(max(files, key=os.path.getmtime), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(current, previous, threshold=0.1):
+    """Print suites that got slower by more than `threshold` and fields that lost matches"""
+    print(f"\n🔍 Compared with {previous['commit']} ({previous['date']})")
+    regressions = 0
+    for name, now in current["suites"].items():
+        before = previous["suites"].get(name)
+        if not before or not before.get("pages") or not now.get("pages"):
+            continue
+        if now["pages_per_s"] < before["pages_per_s"] * (1 - threshold):
+            regressions += 1
+            print(f"   ⚠️ [{name}] {before['pages_per_s']} -> {now['pages_per_s']} pages/s")
+        for field, rate in before["field_rates"].items():
+            if now["field_rates"].get(field, 0) < rate:
+                regressions += 1
+                print(f"   ⚠️ [{name}.{field}] extracted {rate:.0%} -> {now['field_rates'].get(field, 0):.0%}")
+    if not regressions:
+        print("   ✅ No regressions")
+    return regressions
+
+
+def benchmark(runs=3, limit=None, parser=DEFAULT_PARSER, suites=None):
+    backend = get_backend(parser)
+    results = {
+        "commit": git_commit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "parser": backend.name,
+        "runs": runs,
+        "suites": {},
+    }
+
+    for name in suites or SUITES:
+        pattern, parse = SUITES[name]
+        files = sorted(glob.glob(pattern), key=lambda f: int(re.findall(r"\d+", f)[-1]))[:limit]
+        if not files:
+            print(f"⚠️ [{name}] no saved pages match {pattern}")
+            results["suites"][name] = {"pages": 0, "products": 0, "field_rates": {}}
+            continue
+        pages = [open(f, encoding="utf-8").read() for f in files]
+
+        row = run_suite(parse, pages, backend, runs)
+        results["suites"][name] = row
+        print(f"\n📊 [{name}] {row['pages']} pages, {row['products']} products")
+        print(f"   {row['pages_per_s']:.1f} pages/s, {row['products_per_s']:.0f} products/s, "
+              f"peak {row['peak_mb']:.1f} MB")
+        if not row["products"]:
+            print("   ⚠️ no products extracted, the selectors no longer match these pages")
+        for field, rate in row["field_rates"].items():
+            print(f"   {field:<14} {rate:>6.0%}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run every site parser over the saved pages")
+    parser.add_argument("--runs", type=int, default=3, help="Passes over the pages (median is reported)")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N pages of each site")
+    parser.add_argument("--parser", choices=list(BACKENDS), default=DEFAULT_PARSER, help="HTML parser backend")
+    parser.add_argument("--suite", action="append", choices=list(SUITES), help="Only run these sites (repeatable)")
+    parser.add_argument("--output", default=None, help="Results file (default: benchmarks/results/offline_<commit>.json)")
+    args = parser.parse_args()
+
+    results = benchmark(runs=args.runs, limit=args.limit, parser=args.parser, suites=args.suite)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"offline_{results['commit']}.json")
+    previous = previous_results(exclude=output)
+    if previous:
+        compare(results, previous)
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to {output}")
+
+    failed = failures(results)
+    for failure in failed:
+        print(f"❌ {failure}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
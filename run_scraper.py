@@ -305,15 +305,125 @@
 #     main()
 import argparse
 import os
-
-from scraping.flipkart_laptop import scrape_flipkart_laptops, setup_driver as flipkart_driver_setup
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from scraping import amazon_laptop, amazon_scraper, flipkart_laptop, flipkart_mobiles
+from scraping.common.checkpoint import Checkpoint
+from scraping.common.crawler import run_crawl
+from scraping.common.delta import alert_price_drops, on_delta
+
+from scraping.common.driver_setup import get_pool, close_pool
+from scraping.common.metrics import report_all
+from scraping.common.mongo import BATCH_SIZE as MONGO_BATCH_SIZE, FLUSH_INTERVAL as MONGO_FLUSH_INTERVAL, close_mongo, configure_mongo
+from scraping.common.output import COMPRESSIONS, FORMATS, configure_output
+from scraping.common.parsing import BACKENDS, DEFAULT_PARSER, configure_parser
+from scraping.common.rate_limit import configure_limiter, get_limiter
+from scraping.common.replay import REPLAY_RATE_SCALE, start_recording, start_replay, stop as stop_replay
+from scraping.common.selector_registry import report_selectors
+from scraping.common.sink import JsonlSink, stream_path
+
+
+from scraping.flipkart_laptop import scrape_flipkart_laptops
 from scraping.flipkart_mobiles import scrape_flipkart_mobiles
 from scraping.amazon_scraper import get_amazon_mobile_data
-from scraping.amazon_laptop import get_amazon_laptop_data, save_data as save_amazon_laptop_data
+from scraping.amazon_laptop import get_amazon_laptop_data
 # from scraping.reliance_scraper import scrape_reliance_best_selling, scrape_reliance_5g_smartphones, setup_driver as reliance_driver_setup
 # from scraping.croma_scraper import scrape_croma_products, setup_driver as croma_driver_setup
 # from scraping.croma_laptop import scrape_croma_laptops, save_data as save_croma_laptop_data
-from scraping.utils import save_data
+from scraping.utils import save_stream
+
+# Jobs of --site all: name -> (scraper, output file, domain)
+ALL_JOBS = {
+    "flipkart_mobiles": (scrape_flipkart_mobiles, "data/flipkart_mobiles.csv", "www.flipkart.com"),
+    "flipkart_laptops": (scrape_flipkart_laptops, "data/flipkart_laptops.csv", "www.flipkart.com"),
+    "amazon_mobiles": (get_amazon_mobile_data, "data/amazon_mobiles.csv", "www.amazon.in"),
+    "amazon_laptops": (get_amazon_laptop_data, "data/amazon_laptops.csv", "www.amazon.in"),
+}
+# Jobs whose scraper takes --tabs and --parse-workers
+PAGE_OPTION_JOBS = ("flipkart_mobiles", "flipkart_laptops")
+
+def save_job(name, checkpoint):
+    """Save a job's products from its checkpoint's stream, then drop the checkpoint"""
+    # Pages that produced products, so an interrupted crawl doesn't mark the rest disappeared
+    covered = sum(1 for count in checkpoint.pages.values() if count)
+    save_stream(checkpoint.sink.path, ALL_JOBS[name][1], pages=covered)
+    checkpoint.finish()
+
+def stream_job(name, pages, resume=False, **options):
+    """Run one job of ALL_JOBS with every finished page checkpointed and streamed to
+    data/<name>.stream.jsonl instead of kept in memory, then save it from there.
+    A crash leaves the finished pages on disk for --resume. Returns the product count."""
+    scraper, filename, _ = ALL_JOBS[name]
+    sink = JsonlSink(stream_path(filename))
+    checkpoint = Checkpoint(name, resume=resume, sink=sink)
+    try:
+        scraper(pages=pages, checkpoint=checkpoint, **options)
+    finally:
+        sink.close()
+    save_job(name, checkpoint)
+    return sink.count
+
+def run_job(name, pages, rate_scale=1.0, recycle_after=50, lean=True, parser=DEFAULT_PARSER,
+            output_formats=None, compression=None, alert_drop=None, mongo=None, tabs=0, resume=False,
+            parse_workers=0):
+    """Worker of --parallel: one site/category with its own browser, saved as soon as it is done.
+    `tabs` and `parse_workers` go to the jobs of PAGE_OPTION_JOBS."""
+    configure_limiter(scale=rate_scale)
+    configure_parser(parser)
+    configure_output(output_formats, compression)
+    if alert_drop:
+        on_delta(alert_price_drops(alert_drop))
+    if mongo:
+        configure_mongo(**mongo)
+    get_pool(size=1, max_pages=recycle_after, lean=lean)
+    started = time.perf_counter()
+    try:
+        options = {"tabs": tabs, "parse_workers": parse_workers} if name in PAGE_OPTION_JOBS else {}
+        count = stream_job(name, pages, resume, **options)
+        return count, time.perf_counter() - started
+    finally:
+        report_all()
+        report_selectors(os.path.join("data", f"selector_stats_{name}.json"))
+        close_pool()
+        close_mongo()
+
+def mongo_settings(args):
+    """configure_mongo() kwargs of --mongo, or None"""
+    if not args.mongo:
+        return None
+    return {"database": args.mongo_db, "batch_size": args.mongo_batch, "flush_interval": args.mongo_flush_interval}
+
+def run_parallel(args):
+    """Run every job of ALL_JOBS in a process pool. Returns the exit code (1 if any job failed)."""
+    # Limiters are per process, so jobs hitting the same site split its rate between them
+    per_domain = Counter(domain for *_, domain in ALL_JOBS.values())
+    started = time.perf_counter()
+    failed = []
+
+    with ProcessPoolExecutor(max_workers=args.parallel) as executor:
+        futures = {
+            executor.submit(run_job, name, args.pages, args.rate_scale / per_domain[job[3]],
+                            args.recycle_after, not args.full_resources, args.parser,
+                            args.output_format, args.compress, args.alert_drop, mongo_settings(args),
+                            args.tabs, args.resume, args.parse_workers): name
+
+            for name, job in ALL_JOBS.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                count, seconds = future.result()
+                print(f"✅ [{name}] {count} products in {seconds:.1f}s")
+            except Exception as e:
+                failed.append(name)
+                print(f"❌ [{name}] failed: {str(e)[:100]}")
+
+    print(f"🏁 {len(ALL_JOBS) - len(failed)}/{len(ALL_JOBS)} jobs succeeded "
+          f"in {time.perf_counter() - started:.1f}s")
+    return 1 if failed else 0
 
 def main():
     parser = argparse.ArgumentParser(description="Run E-Commerce Scraper")
@@ -321,36 +431,78 @@ def main():
     parser.add_argument("--category", choices=["mobiles", "laptops"], default="mobiles", help="Product category to scrape")
     parser.add_argument("--pages", type=int, default=1, help="Number of pages to scrape")
     parser.add_argument("--limit", type=int, default=1000, help="Max products (for Croma)")
+    parser.add_argument("--pool-size", type=int, default=None, help="Browsers kept alive in the shared driver pool (default: 1, or --max-in-flight for --site all)")
+    parser.add_argument("--recycle-after", type=int, default=50, help="Restart a pooled browser after this many pages")
+    parser.add_argument("--max-in-flight", type=int, default=6, help="Pages fetched concurrently across all sites (--site all)")
+    parser.add_argument("--per-domain", type=int, default=2, help="Pages fetched concurrently per domain (--site all)")
+    parser.add_argument("--rate-scale", type=float, default=1.0, help="Multiply every site's request rate (e.g. 0.5 to be twice as polite)")
+    parser.add_argument("--tabs", type=int, default=0, help="Render this many pages at once in tabs of one browser (Flipkart)")
+    parser.add_argument("--parse-workers", type=int, default=0, help="Parse pages in this many processes while the browser fetches the next one (Flipkart)")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint of an interrupted run instead of page 1")
+    parser.add_argument("--parallel", type=int, default=0, help="Run the --site all jobs in this many worker processes, one browser each")
+    parser.add_argument("--parser", choices=list(BACKENDS), default=DEFAULT_PARSER, help="HTML parser backend for listing pages")
+    parser.add_argument("--full-resources", action="store_true", help="Load images, fonts, media and trackers (disables the lean browser profile)")
+    parser.add_argument("--output-format", action="append", choices=FORMATS, help="Output file format (repeatable, default: csv and json)")
+    parser.add_argument("--compress", choices=[c for c in COMPRESSIONS if c], help="Compress the CSV/JSON/JSONL outputs")
+    parser.add_argument("--alert-drop", type=float, default=None, help="Print products whose price fell by at least this fraction since the last run (e.g. 0.1)")
+    parser.add_argument("--mongo", action="store_true", help="Also upsert every saved product into MongoDB (MONGO_URI from the environment or .env)")
+    parser.add_argument("--mongo-db", default="scraper", help="MongoDB database for --mongo")
+    parser.add_argument("--mongo-batch", type=int, default=MONGO_BATCH_SIZE, help="Upserts per bulk_write batch (--mongo)")
+    parser.add_argument("--mongo-flush-interval", type=float, default=MONGO_FLUSH_INTERVAL, help="Send a partial batch after this many seconds (--mongo)")
+    parser.add_argument("--record", metavar="ARCHIVE", help="Save every fetched page to this archive (.jsonl.gz) for --replay")
+    parser.add_argument("--replay", metavar="ARCHIVE", help="Serve pages from a recorded archive instead of the live sites, without rate limits")
 
     args = parser.parse_args()
+    if args.record and args.replay:
+        parser.error("--record and --replay are mutually exclusive")
+    if args.record and args.parallel:
+        parser.error("--record needs a single process, drop --parallel")
+    if args.site == "all" and not args.parallel and (args.tabs or args.parse_workers):
+        parser.error("--site all crawls pages concurrently without --tabs/--parse-workers; add --parallel to use them")
 
     if not os.path.exists('data'):
         os.makedirs('data')
-
-    driver = None
+    try:
+        configure_output(args.output_format, args.compress)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.alert_drop:
+        on_delta(alert_price_drops(args.alert_drop))
+    if args.mongo:
+        try:
+            # Fails early (missing pymongo or MONGO_URI) instead of after the scrape. The
+            # client is only created when the first run is saved: --parallel jobs and
+            # parse workers are forked from this process and must not inherit it.
+            configure_mongo(lazy=True, **mongo_settings(args))
+        except Exception as e:
+            parser.error(str(e))
+
+    if args.replay:
+        start_replay(args.replay)
+        args.rate_scale = REPLAY_RATE_SCALE
+    elif args.record:
+        start_recording(args.record)
+
+    if args.site == "all" and args.parallel:
+        try:
+            return run_parallel(args)
+        finally:
+            stop_replay()
+
+    configure_limiter(scale=args.rate_scale)
+    configure_parser(args.parser)
+    pool_size = args.pool_size or (args.max_in_flight if args.site == "all" else 1)
+    get_pool(size=pool_size, max_pages=args.recycle_after, lean=not args.full_resources)
 
     try:
         if args.site == "flipkart":
             print("🚀 Starting Flipkart scraper...")
-            driver = flipkart_driver_setup()
-            if args.category == "mobiles":
-                products = scrape_flipkart_mobiles(driver, pages=args.pages)
-                save_data(products, filename="data/flipkart_mobiles.csv")
-            elif args.category == "laptops":
-                products = scrape_flipkart_laptops(driver, pages=args.pages)
-                save_data(products, filename="data/flipkart_laptops.csv")
+            stream_job(f"flipkart_{args.category}", args.pages, args.resume, tabs=args.tabs,
+                       parse_workers=args.parse_workers)
 
         elif args.site == "amazon":
             print("🚀 Starting Amazon scraper...")
-            if args.category == "mobiles":
-                # driver = flipkart_driver_setup()
-                products = get_amazon_mobile_data(pages=args.pages)
-                save_data(products, filename="data/amazon_mobiles.csv")
-            elif args.category == "laptops":
-                products = get_amazon_laptop_data(pages=args.pages)
-                filename = os.path.join("data", "amazon_laptops.csv")
-                # save_amazon_laptop_data(products, filename=filename)
-                save_amazon_laptop_data(products, filename="data/amazon_laptops.csv")
+            stream_job(f"amazon_{args.category}", args.pages, args.resume)
 
         # elif args.site == "croma":
         #     print("🔍 Starting Croma scraper...")
@@ -389,23 +541,23 @@ def main():
             # croma_laptops = scrape_croma_laptops(max_scrolls=args.pages)
             # save_croma_laptop_data(croma_laptops, filename="data/croma_laptops.csv")
 
-            # Flipkart
-            driver = flipkart_driver_setup()
-            flipkart_products = scrape_flipkart_mobiles(driver, pages=args.pages)
-            save_data(flipkart_products, filename="data/flipkart_mobiles.csv")
-
-            flipkart_laptops = scrape_flipkart_laptops(driver, pages=args.pages)
-            save_data(flipkart_laptops, filename="data/flipkart_laptops.csv")
-            driver.quit()
-
-            # Amazon
-            driver = flipkart_driver_setup()
-            amazon_mobiles = get_amazon_mobile_data(driver, pages=args.pages)
-            save_data(amazon_mobiles, filename="data/amazon_mobiles.csv")
-            driver.quit()
-
-            amazon_laptops = get_amazon_laptop_data(pages=args.pages)
-            save_amazon_laptop_data(amazon_laptops, filename="data/amazon_laptops.csv")
+            # Flipkart and Amazon pages are crawled concurrently, bounded per domain
+            tasks = (flipkart_mobiles.page_tasks(args.pages) + flipkart_laptop.page_tasks(args.pages)
+                     + amazon_scraper.page_tasks(args.pages) + amazon_laptop.page_tasks(args.pages))
+            # Every finished page is checkpointed and streamed to data/<job>.stream.jsonl, nothing
+            # is kept in memory; --resume skips pages an earlier run completed
+            sinks = {job: JsonlSink(stream_path(filename)) for job, (*_, filename, _) in ALL_JOBS.items()}
+            checkpoints = {job: Checkpoint(job, resume=args.resume, sink=sinks[job]) for job in ALL_JOBS}
+            tasks = [t for t in tasks if checkpoints[t.job].pending([t.page])]
+            try:
+                run_crawl(tasks, max_in_flight=args.max_in_flight, per_domain=args.per_domain, keep=False,
+                          on_page=lambda task, products: checkpoints[task.job].record(task.page, products))
+            finally:
+                for sink in sinks.values():
+                    sink.close()
+
+            for job in ALL_JOBS:
+                save_job(job, checkpoints[job])
 
             # Reliance
             # driver = reliance_driver_setup()
@@ -417,11 +569,15 @@ def main():
             # driver.quit()
 
     finally:
-        if driver:
-            driver.quit()
+        report_all()
+        get_limiter().report()
+        report_selectors()
+        close_pool()
+        stop_replay()
+        close_mongo()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
 
 
@@ -29,7 +29,7 @@
 #     for page in range(1, pages + 1):
 #         print(f"\n🔄 Scraping Amazon Laptops Page {page}...")
 #         driver = create_driver()
-#         url = f"{base_url}&page={page}"
+#         url = f"{BASE_URL}&page={page}"
 #         driver.get(url)
 
 #         try:
@@ -83,114 +83,153 @@
 
 #     return products
 # # 
-import time
-import random
-import csv
-import os
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-
-# User-Agent List for Randomization
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.1 Safari/605.1.15",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:98.0) Gecko/20100101 Firefox/98.0",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (iPhone; CPU iPhone OS 15_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Mobile/15E148 Safari/604.1"
-]
-
-def create_driver():
-    options = Options()
-    options.add_argument("--headless=new")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument(f"user-agent={random.choice(USER_AGENTS)}")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    return driver
-
-def setup_driver(headless=True):
-    chrome_options = Options()
-    if headless:
-        chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_argument("--window-size=1920,1080")
-
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    return driver
-
-def get_amazon_laptop_data(pages=1):
-    base_url = "https://www.amazon.in/s?i=computers&rh=n%3A1375424031&s=popularity-rank&fs=true&ref=lp_1375424031_sar"
+
+from scraping.common.crawler import PageTask
+from scraping.common.dom import extract_cards
+from scraping.common.driver_setup import lease_driver
+from scraping.common.metrics import get_recorder
+from scraping.common.output import write_outputs
+from scraping.common.rate_limit import get_limiter
+from scraping.common.selector_registry import get_site
+from scraping.common.store import save_products, source_name
+
+
+BASE_URL = "https://www.amazon.in/s?i=computers&rh=n%3A1375424031&s=popularity-rank&fs=true&ref=lp_1375424031_sar"
+latency = get_recorder("amazon_laptops")
+limiter = get_limiter()
+
+# Fields read from every result card (see extract_products); attr "text" is the rendered text.
+# Selectors come from the shared registry, which tracks their hit rates.
+CARD_CSS = "div.puis-card-container"
+SELECTORS = get_site("amazon")
+CARD_FIELDS = {
+    "name": (SELECTORS["name"], "text"),
+    "price": (SELECTORS["price"], "text"),
+    "rating": (SELECTORS["rating"], "text"),
+    "reviews": (SELECTORS["reviews"], "text"),
+    "url": (SELECTORS["url"], "href"),
+    "image_url": (SELECTORS["image_url"], "src"),
+}
+
+
+def get_amazon_laptop_data(driver=None, pages=1, checkpoint=None):
+    """Same as get_amazon_mobile_data, for the laptops category"""
     all_data = []
 
-    for page in range(1, pages + 1):
+    for page in checkpoint.pending(range(1, pages + 1)) if checkpoint else range(1, pages + 1):
         print(f"\n🔄 Scraping Amazon Laptops Page {page}...")
-        driver = create_driver()
-        url = f"{base_url}&page={page}"
-        driver.get(url)
-
-        try:
-            if "captcha" in driver.current_url:
-                print("⚠️ CAPTCHA detected. Skipping page.")
-                driver.quit()
-                continue
+        url = f"{BASE_URL}&page={page}"
 
-            WebDriverWait(driver, 25).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.puis-card-container"))
-            )
+        with lease_driver(driver, url=url) as page_driver:
+            page_data = scrape_page(page_driver, url)
+        if checkpoint:
+            checkpoint.record(page, page_data)
+        if checkpoint is None or checkpoint.sink is None:
+            all_data.extend(page_data)
 
-            product_cards = driver.find_elements(By.CSS_SELECTOR, "div.puis-card-container")
+    return all_data
 
-            for card in product_cards:
-                product = {}
+def scrape_page(driver, url, by_element=False):
+    """Load one results page in the given driver and extract its product cards"""
+    page_data = []
+    limiter.wait(url)  # Per-domain politeness, adapts to CAPTCHAs and timeouts
+    driver.get(url)
+
+    try:
+        if "captcha" in driver.current_url:
+            print("⚠️ CAPTCHA detected. Skipping page.")
+            limiter.failure(url, "captcha")
+            return page_data
+
+        WebDriverWait(driver, 25).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, CARD_CSS))
+        )
+
+        latency.record_transfer(url, driver)
+        page_data = extract_products_by_element(driver) if by_element else extract_products(driver)
+
+    except TimeoutException:
+        print("⏱️ Timeout. Skipping page.")
+        limiter.failure(url, "timeout")
+        return page_data
+
+    if page_data:
+        limiter.success(url)
+    else:
+        limiter.failure(url, "empty page")
+    return page_data
+
+def extract_products(driver):
+    """Read all cards of the loaded page in one execute_script round trip"""
+    products = []
+    for raw in extract_cards(driver, CARD_CSS, CARD_FIELDS):
+        rating = raw["rating"]
+        products.append({
+            "name": raw["name"] if raw["name"] is not None else 'N/A',
+            "price": raw["price"].replace(',', '') if raw["price"] is not None else 'N/A',
+            "rating": rating.split(' ')[0] if rating is not None else 'N/A',
+            "reviews": raw["reviews"].replace(',', '') if raw["reviews"] is not None else 'N/A',
+            "url": raw["url"] if raw["url"] is not None else 'N/A',
+            "image_url": raw["image_url"] if raw["image_url"] is not None else 'N/A',
+        })
+    return products
+
+def extract_products_by_element(driver):
+    """Old extraction path: ~6 WebDriver round trips per card. Kept for benchmarks."""
+    products = []
+    product_cards = driver.find_elements(By.CSS_SELECTOR, CARD_CSS)
+    for card in product_cards:
+        product = {}
 
-                try:
-                    product['name'] = card.find_element(By.CSS_SELECTOR, "h2 span").text
-                except NoSuchElementException:
-                    product['name'] = 'N/A'
+        try:
+            product['name'] = card.find_element(By.CSS_SELECTOR, "h2 span").text
+        except NoSuchElementException:
+            product['name'] = 'N/A'
 
-                try:
-                    product['price'] = card.find_element(By.CSS_SELECTOR, "span.a-price-whole").text.replace(',', '')
-                except NoSuchElementException:
-                    product['price'] = 'N/A'
+        try:
+            product['price'] = card.find_element(By.CSS_SELECTOR, "span.a-price-whole").text.replace(',', '')
+        except NoSuchElementException:
+            product['price'] = 'N/A'
 
-                try:
-                    rating = card.find_element(By.CSS_SELECTOR, "i.a-icon-star-small").get_attribute('aria-label')
-                    product['rating'] = rating.split(' ')[0]
-                except (NoSuchElementException, AttributeError):
-                    product['rating'] = 'N/A'
+        try:
+            rating = card.find_element(By.CSS_SELECTOR, "i.a-icon-star-small span.a-icon-alt").get_attribute('textContent')
+            product['rating'] = rating.split(' ')[0]
+        except (NoSuchElementException, AttributeError):
+            product['rating'] = 'N/A'
 
-                try:
-                    product['reviews'] = card.find_element(By.CSS_SELECTOR, "span.a-size-base.s-underline-text").text.replace(',', '')
-                except NoSuchElementException:
-                    product['reviews'] = 'N/A'
+        try:
+            product['reviews'] = card.find_element(By.CSS_SELECTOR, "span.a-size-base.s-underline-text").text.replace(',', '')
+        except NoSuchElementException:
+            product['reviews'] = 'N/A'
 
-                try:
-                    product['url'] = card.find_element(By.CSS_SELECTOR, "a.a-link-normal.s-no-outline").get_attribute('href')
-                except NoSuchElementException:
-                    product['url'] = 'N/A'
+        try:
+            product['url'] = card.find_element(By.CSS_SELECTOR, "a.a-link-normal.s-no-outline").get_attribute('href')
+        except NoSuchElementException:
+            product['url'] = 'N/A'
 
-                try:
-                    product['image_url'] = card.find_element(By.CSS_SELECTOR, "img.s-image").get_attribute("src")
-                except NoSuchElementException:
-                    product['image_url'] = 'N/A'
+        try:
+            product['image_url'] = card.find_element(By.CSS_SELECTOR, "img.s-image").get_attribute("src")
+        except NoSuchElementException:
+            product['image_url'] = 'N/A'
 
-                all_data.append(product)
+        products.append(product)
 
-        except TimeoutException:
-            print("⏱️ Timeout. Skipping page.")
+    return products
 
-        driver.quit()
-        time.sleep(random.uniform(3, 6))
+def page_tasks(pages=1):
+    """One crawler task per results page; cards are read from the live DOM in the worker"""
+    def fetch(url):
+        with lease_driver(url=url) as driver:
+            return scrape_page(driver, url)
 
-    return all_data
+    return [
+        PageTask(job="amazon_laptops", page=page, url=f"{BASE_URL}&page={page}", fetch=fetch)
+        for page in range(1, pages + 1)
+    ]
 
 # def save_data(data, filename="amazon_laptops.csv"):
 #     if not data:
@@ -206,19 +245,12 @@ def get_amazon_laptop_data(pages=1):
 #         writer.writerows(data)
 
 #     print(f"✅ Data saved to {filepath}")
-def save_data(data, filename="amazon_laptops.csv"):
+def save_data(data, filename="amazon_laptops.csv", pages=None):
     if not data:
         print("⚠️ No data to save.")
         return
-
-    # Ensure the directory exists
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=data[0].keys())
-        writer.writeheader()
-        writer.writerows(data)
-
+    save_products(source_name(filename), data, pages)
+    write_outputs(data, filename)
     print(f"✅ Data saved to {filename}")
 
 
@@ -45,7 +45,7 @@
 #     for page in range(1, pages + 1):
 #         print(f"\n🔄 Scraping page {page} with rotated User-Agent...")
 #         driver = create_driver()
-#         url = f"{base_url}&page={page}"
+#         url = f"{BASE_URL}&page={page}"
 #         driver.get(url)
 
 #         try:
@@ -134,7 +134,7 @@
 #     for page in range(1, pages + 1):
 #         print(f"\n🔄 Scraping page {page} with rotated User-Agent...")
 #         driver = create_driver()
-#         url = f"{base_url}&page={page}"
+#         url = f"{BASE_URL}&page={page}"
 #         driver.get(url)
 
 #         try:
@@ -195,118 +195,174 @@
 #         time.sleep(random.uniform(3, 7))  # Add human-like delay
 
 #     return products
-import time
-import random
-import csv
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.1 Safari/605.1.15",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:98.0) Gecko/20100101 Firefox/98.0",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (iPhone; CPU iPhone OS 15_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Mobile/15E148 Safari/604.1"
-]
-
-def create_driver():
-    options = Options()
-    options.add_argument("--headless=new")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    user_agent = random.choice(USER_AGENTS)
-    options.add_argument(f"user-agent={user_agent}")
-    return webdriver.Chrome(options=options)
-
-def get_amazon_mobile_data(pages=1):
+from scraping.common.crawler import PageTask
+from scraping.common.dom import extract_cards
+from scraping.common.driver_setup import lease_driver, close_pool
+from scraping.common.metrics import get_recorder
+from scraping.common.output import write_outputs
+from scraping.common.rate_limit import get_limiter
+from scraping.common.selector_registry import get_site
+from scraping.common.store import save_products, source_name
+
+
+BASE_URL = "https://www.amazon.in/s?i=electronics&rh=n%3A1389432031&s=popularity-rank&fs=true&ref=lp_1389432031_sar"
+latency = get_recorder("amazon_mobiles")
+limiter = get_limiter()
+
+# Fields read from every result card (see extract_products); attr "text" is the rendered text.
+# Selectors come from the shared registry, which tracks their hit rates.
+CARD_CSS = "div.s-main-slot > div[data-asin]"
+SELECTORS = get_site("amazon")
+CARD_FIELDS = {
+    "name": (SELECTORS["name"], "text"),
+    "price": (SELECTORS["price"], "text"),
+    "rating": (SELECTORS["rating"], "text"),
+    "reviews": (SELECTORS["reviews"], "text"),
+    "url": (SELECTORS["url"], "href"),
+    "image_url": (SELECTORS["image_url"], "src"),
+}
+
+
+def get_amazon_mobile_data(driver=None, pages=1, checkpoint=None):
+    """Scrape `pages` results pages. With a `checkpoint` pages it already has are
+    skipped and every page is recorded to it; when it streams to a sink the
+    products go there and are not returned."""
     products = []
-    base_url = "https://www.amazon.in/s?i=electronics&rh=n%3A1389432031&s=popularity-rank&fs=true&ref=lp_1389432031_sar"
 
-    for page in range(1, pages + 1):
+    for page in checkpoint.pending(range(1, pages + 1)) if checkpoint else range(1, pages + 1):
         print(f"\n🔄 Scraping page {page} with rotated User-Agent...")
-        driver = create_driver()
-        url = f"{base_url}&page={page}"
-        driver.get(url)
+        url = f"{BASE_URL}&page={page}"
 
-        try:
-            if "captcha" in driver.current_url:
-                print("⚠️ CAPTCHA detected. Skipping this page.")
-                driver.quit()
-                continue
+        with lease_driver(driver, url=url) as page_driver:
+            page_products = scrape_page(page_driver, url, page)
+        if checkpoint:
+            checkpoint.record(page, page_products)
+        if checkpoint is None or checkpoint.sink is None:
+            products.extend(page_products)
 
-            WebDriverWait(driver, 25).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.s-main-slot > div[data-asin]"))
-            )
+    return products
 
-            product_cards = driver.find_elements(By.CSS_SELECTOR, "div.s-main-slot > div[data-asin]")
+def scrape_page(driver, url, page, by_element=False):
+    """Load one results page in the given driver and extract its product cards"""
+    products = []
+    limiter.wait(url)  # Per-domain politeness, adapts to CAPTCHAs and timeouts
+    driver.get(url)
 
-            if not product_cards:
-                print(f"⚠️ No products found on page {page}.")
-                driver.quit()
-                continue
+    try:
+        if "captcha" in driver.current_url:
+            print("⚠️ CAPTCHA detected. Skipping this page.")
+            limiter.failure(url, "captcha")
+            return products
 
-            for card in product_cards:
-                product = {}
+        WebDriverWait(driver, 25).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, CARD_CSS))
+        )
 
-                try:
-                    product['name'] = card.find_element(By.CSS_SELECTOR, "h2 span").text
-                except NoSuchElementException:
-                    product['name'] = 'N/A'
+        latency.record_transfer(page, driver)
+        products = extract_products_by_element(driver) if by_element else extract_products(driver)
 
-                try:
-                    product['price'] = card.find_element(By.CSS_SELECTOR, "span.a-price-whole").text.replace(',', '')
-                except NoSuchElementException:
-                    product['price'] = 'N/A'
+        if not products:
+            print(f"⚠️ No products found on page {page}.")
+            limiter.failure(url, "empty page")
+            return products
 
-                try:
-                    rating = card.find_element(By.CSS_SELECTOR, "i.a-icon-star-small").get_attribute('aria-label')
-                    product['rating'] = rating.split(' ')[0]
-                except (NoSuchElementException, AttributeError):
-                    product['rating'] = 'N/A'
+    except TimeoutException:
+        print(f"⏱️ Timeout on page {page}. Skipping...")
+        limiter.failure(url, "timeout")
+        return products
 
-                try:
-                    product['reviews'] = card.find_element(By.CSS_SELECTOR, "span.a-size-base.s-underline-text").text.replace(',', '')
-                except NoSuchElementException:
-                    product['reviews'] = 'N/A'
+    limiter.success(url)
+    return products
 
-                try:
-                    product['url'] = card.find_element(By.CSS_SELECTOR, "a.a-link-normal.s-no-outline").get_attribute('href')
-                except NoSuchElementException:
-                    product['url'] = 'N/A'
+def extract_products(driver):
+    """Read all cards of the loaded page in one execute_script round trip"""
+    return [clean_product(raw) for raw in extract_cards(driver, CARD_CSS, CARD_FIELDS)]
+
+def clean_product(raw):
+    """Product row from the raw CARD_FIELDS values of one card (live or saved page)"""
+    rating = raw["rating"]
+    return {
+        "name": raw["name"] if raw["name"] is not None else 'N/A',
+        "price": raw["price"].replace(',', '') if raw["price"] is not None else 'N/A',
+        "rating": rating.split(' ')[0] if rating is not None else 'N/A',
+        "reviews": raw["reviews"].replace(',', '') if raw["reviews"] is not None else 'N/A',
+        "url": raw["url"] if raw["url"] is not None else 'N/A',
+        "image_url": raw["image_url"] if raw["image_url"] is not None else 'N/A',
+    }
+
+def extract_products_by_element(driver):
+    """Old extraction path: ~6 WebDriver round trips per card. Kept for benchmarks."""
+    products = []
+    product_cards = driver.find_elements(By.CSS_SELECTOR, CARD_CSS)
+    for card in product_cards:
+        product = {}
 
-                try:
-                    product['image_url'] = card.find_element(By.CSS_SELECTOR, 'img.s-image').get_attribute('src')
-                except NoSuchElementException:
-                    product['image_url'] = 'N/A'
+        try:
+            product['name'] = card.find_element(By.CSS_SELECTOR, "h2 span").text
+        except NoSuchElementException:
+            product['name'] = 'N/A'
 
-                products.append(product)
+        try:
+            product['price'] = card.find_element(By.CSS_SELECTOR, "span.a-price-whole").text.replace(',', '')
+        except NoSuchElementException:
+            product['price'] = 'N/A'
 
-        except TimeoutException:
-            print(f"⏱️ Timeout on page {page}. Skipping...")
+        try:
+            rating = card.find_element(By.CSS_SELECTOR, "i.a-icon-star-small span.a-icon-alt").get_attribute('textContent')
+            product['rating'] = rating.split(' ')[0]
+        except (NoSuchElementException, AttributeError):
+            product['rating'] = 'N/A'
 
-        driver.quit()
-        time.sleep(random.uniform(3, 7))  # Human-like delay
+        try:
+            product['reviews'] = card.find_element(By.CSS_SELECTOR, "span.a-size-base.s-underline-text").text.replace(',', '')
+        except NoSuchElementException:
+            product['reviews'] = 'N/A'
+
+        try:
+            product['url'] = card.find_element(By.CSS_SELECTOR, "a.a-link-normal.s-no-outline").get_attribute('href')
+        except NoSuchElementException:
+            product['url'] = 'N/A'
+
+        try:
+            product['image_url'] = card.find_element(By.CSS_SELECTOR, 'img.s-image').get_attribute('src')
+        except NoSuchElementException:
+            product['image_url'] = 'N/A'
+
+        products.append(product)
 
     return products
 
+def page_tasks(pages=1):
+    """One crawler task per results page; cards are read from the live DOM in the worker"""
+    def fetch(url, page):
+        with lease_driver(url=url) as driver:
+            return scrape_page(driver, url, page)
+
+    return [
+        PageTask(job="amazon_mobiles", page=page, url=f"{BASE_URL}&page={page}",
+                 fetch=lambda url, page=page: fetch(url, page))
+        for page in range(1, pages + 1)
+    ]
+
 def save_to_csv(data, filename="data/amazon_mobiles.csv"):
     if not data:
         print("⚠️ No data to save.")
         return
-
-    keys = data[0].keys()
-    with open(filename, "w", newline="", encoding="utf-8") as output_file:
-        writer = csv.DictWriter(output_file, fieldnames=keys)
-        writer.writeheader()
-        writer.writerows(data)
+    save_products(source_name(filename), data)
+    write_outputs(data, filename)
     print(f"✅ Saved {len(data)} records to {filename}")
 
 if __name__ == "__main__":
-    scraped_data = get_amazon_mobile_data(pages=1)
-    save_to_csv(scraped_data)
+    try:
+        scraped_data = get_amazon_mobile_data(pages=1)
+        save_to_csv(scraped_data)
+    finally:
+        close_pool()
 
 
 
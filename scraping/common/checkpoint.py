@@ -0,0 +1,118 @@
+# scraping/common/checkpoint.py
+
+import json
+import os
+from datetime import datetime
+
+CHECKPOINT_DIR = os.path.join("data", "checkpoints")
+
+
+class Checkpoint:
+    """Durable progress of one crawl job, kept in data/checkpoints/<job>.jsonl.
+
+    Every finished page is appended (and fsynced) as one JSON line holding its
+    products, so a crash loses at most the page that was in flight. With `resume`
+    an existing log is replayed and `pending()` skips the pages it already has;
+    without it the log starts over. `finish()` removes the log once the job is done.
+
+    With a `sink` (an unopened JsonlSink) products are written to it instead of
+    being kept in memory or in the log: the log only holds page numbers and counts,
+    `pages` maps page -> product count, and a resume keeps the sink's records of the
+    logged pages and appends to them. `products()` is only available without a sink.
+    """
+
+    def __init__(self, job, resume=False, directory=CHECKPOINT_DIR, sink=None):
+        self.job = job
+        self.path = os.path.join(directory, f"{job}.jsonl")
+        self.pages = {}
+        self.sink = sink
+        os.makedirs(directory, exist_ok=True)
+
+        if resume and os.path.exists(self.path) and self._load():
+            print(f"💾 [{job}] Resuming: {len(self.pages)} pages done, next page {self.cursor}")
+        else:
+            self.pages = {}
+            if sink is not None:
+                sink.append = False
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"job": job, "started_at": datetime.now().isoformat(),
+                                    "stream": sink.path if sink else None}) + "\n")
+        if sink is not None:
+            sink.open()
+
+    def _load(self):
+        """Replay the log. False if it can't be resumed with this checkpoint's sink."""
+        with open(self.path, encoding="utf-8") as f:
+            lines = f.readlines()
+
+        good = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break  # torn last line from a crash mid-write
+            good.append(line if line.endswith("\n") else line + "\n")
+            if "job" in record and record.get("stream") != (self.sink.path if self.sink else None):
+                print(f"⚠️ [{self.job}] Checkpoint does not match this run's stream, starting over")
+                return False
+            if "page" in record:
+                self.pages[record["page"]] = record["count"] if self.sink else record["products"]
+
+        if self.sink is not None:
+            # The stream may hold a page that was written but not logged before a crash
+            expected = sum(self.pages.values())
+            if self.sink.keep(expected) < expected:
+                print(f"⚠️ [{self.job}] {self.sink.path} is missing logged pages, starting over")
+                return False
+
+        if good != lines:
+            # Drop the torn tail so new records start on a line of their own
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(good)
+            os.replace(tmp, self.path)
+        return True
+
+    @property
+    def cursor(self):
+        """Lowest page that has not been completed yet"""
+        page = 1
+        while page in self.pages:
+            page += 1
+        return page
+
+    @property
+    def stop_page(self):
+        """First page that came back empty (the job stops there), or None"""
+        empty = [page for page, products in self.pages.items() if not products]
+        return min(empty) if empty else None
+
+    def pending(self, pages):
+        """The pages of `pages` that still have to be fetched"""
+        stop = self.stop_page
+        return [page for page in pages if page not in self.pages and (stop is None or page < stop)]
+
+    def record(self, page, products):
+        if self.sink is None:
+            entry = {"page": page, "products": products}
+        else:
+            # The stream is the payload: written (and fsynced) first, then the page is logged
+            self.sink.write_batch(products)
+            entry = {"page": page, "count": len(products)}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.pages[page] = products if self.sink is None else len(products)
+
+    def products(self):
+        """All recorded products in page order, up to the stop page"""
+        if self.sink is not None:
+            raise RuntimeError(f"[{self.job}] products were streamed to {self.sink.path}")
+        stop = self.stop_page
+        return [p for page in sorted(self.pages) if stop is None or page <= stop
+                for p in self.pages[page]]
+
+    def finish(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,91 @@
+# scraping/common/crawler.py
+
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+from scraping.common.rate_limit import get_limiter
+
+
+@dataclass
+class PageTask:
+    """One listing page of one job (e.g. page 3 of "flipkart_mobiles").
+
+    `fetch(url)` is blocking and runs in a worker thread; `parse(raw, page)` turns
+    its result into product dicts. Leave `parse` unset when `fetch` already
+    returns products (scrapers that extract from the live DOM).
+    """
+    job: str
+    page: int
+    url: str
+    fetch: Callable
+    parse: Optional[Callable] = None
+
+    @property
+    def domain(self):
+        return urlparse(self.url).netloc
+
+
+async def crawl(tasks, max_in_flight=8, per_domain=2, on_page=None, keep=True):
+    """Run page tasks for every site at once and stream results as they finish.
+
+    At most `max_in_flight` pages are fetched in total and at most `per_domain`
+    per host. Once a page of a job comes back empty, later pages of that job
+    that have not started yet are skipped (mirrors the sequential "stop early");
+    a page that raises is logged and skipped.
+    `on_page(task, products)` is called for every finished page.
+    Returns {job: [products...]} ordered by page; with `keep=False` products are
+    only handed to `on_page` (e.g. a streaming sink) and {} is returned.
+    """
+    global_sem = asyncio.Semaphore(max_in_flight)
+    domain_sems = defaultdict(lambda: asyncio.Semaphore(per_domain))
+    last_page = {}
+    pages = defaultdict(dict)
+
+    def exhausted(task):
+        return task.page > last_page.get(task.job, float("inf"))
+
+    async def guarded(task):
+        try:
+            async with domain_sems[task.domain], global_sem:
+                if exhausted(task):
+                    return task, None
+                products = await asyncio.to_thread(task.fetch, task.url)
+            if task.parse is not None:
+                products = await asyncio.to_thread(task.parse, products, task.page)
+        except Exception as e:
+            print(f"❌ [{task.job}] page {task.page} failed: {str(e)[:100]}")
+            return task, None
+        if not products:
+            last_page[task.job] = min(task.page, last_page.get(task.job, float("inf")))
+            if task.parse is not None:
+                # A soft block; fetch-only tasks judge (and report) their own pages
+                get_limiter().failure(task.url, "empty page")
+        return task, products
+
+    started = time.perf_counter()
+    # Schedule in order so the semaphores hand out slots page by page
+    futures = [asyncio.ensure_future(guarded(t)) for t in tasks]
+    for future in asyncio.as_completed(futures):
+        task, products = await future
+        if products is None:
+            continue
+        if keep:
+            pages[task.job][task.page] = products
+        print(f"📥 [{task.job}] page {task.page}: {len(products)} products "
+              f"({time.perf_counter() - started:.1f}s)")
+        if on_page:
+            on_page(task, products)
+
+    return {
+        job: [p for page in sorted(by_page) if page <= last_page.get(job, float("inf"))
+              for p in by_page[page]]
+        for job, by_page in pages.items()
+    }
+
+
+def run_crawl(tasks, **kwargs):
+    return asyncio.run(crawl(tasks, **kwargs))
@@ -0,0 +1,153 @@
+# scraping/common/delta.py
+#
+# Change detection between runs. The store keeps a content hash (records.content_hash:
+# price, mrp, rating, reviews, availability) of every live product; a run is compared
+# against that index and only products that were inserted, changed or disappeared
+# are written and published as a delta:
+#
+#   {"run": 12, "source": "flipkart_mobiles", "op": "insert" | "update" | "delete",
+#    "key": "/p/itm...?pid=...", "record": {...}, "previous_price": 12999.0, "time": ...}
+#
+# Deltas are appended to data/deltas/<source>.jsonl, which other processes (the API)
+# tail with DeltaReader, and handed to the listeners registered with on_delta().
+
+import json
+import os
+from datetime import datetime
+
+from scraping.common.records import PRICE_KEYS, content_hash, first_of, product_key, to_number
+
+DELTA_DIR = os.path.join("data", "deltas")
+
+_listeners = []
+
+
+class Delta:
+    """Changes of one run of `source` against `index` ({key: (content_hash, price)})"""
+
+    def __init__(self, source, run_id, index):
+        self.source = source
+        self.run_id = run_id
+        self.index = index
+        self.seen = set()
+        self.inserted = []
+        self.changed = []
+        self.unchanged = []
+        self.disappeared = []
+
+    def add(self, records):
+        """Classify `records`. Returns those that are new or changed (the ones to write)."""
+        changed = []
+        for record in records:
+            key = product_key(record)
+            if key is None:
+                continue
+            digest = content_hash(record)
+            previous = self.index.get(key)
+            self.seen.add(key)
+            if previous is None:
+                self.inserted.append((key, record))
+            elif previous[0] != digest:
+                self.changed.append((key, record, previous[1]))
+            else:
+                self.unchanged.append(key)
+                continue
+            self.index[key] = (digest, to_number(first_of(record, PRICE_KEYS)))
+            changed.append(record)
+        return changed
+
+    def finish(self):
+        """Keys of the index that this run did not see. Returns them."""
+        self.disappeared = [key for key in self.index if key not in self.seen]
+        return self.disappeared
+
+    def entries(self):
+        base = {"run": self.run_id, "source": self.source}
+        for key, record in self.inserted:
+            yield {**base, "op": "insert", "key": key, "record": record}
+        for key, record, price in self.changed:
+            yield {**base, "op": "update", "key": key, "record": record, "previous_price": price}
+        for key in self.disappeared:
+            yield {**base, "op": "delete", "key": key}
+
+    def __len__(self):
+        return len(self.inserted) + len(self.changed) + len(self.disappeared)
+
+    def summary(self):
+        return (f"{len(self.inserted)} new, {len(self.changed)} changed, "
+                f"{len(self.disappeared)} gone, {len(self.unchanged)} unchanged")
+
+
+def delta_path(source, directory=DELTA_DIR):
+    return os.path.join(directory, f"{source}.jsonl")
+
+
+def on_delta(callback):
+    """Call `callback(delta)` after every saved run in this process"""
+    _listeners.append(callback)
+    return callback
+
+
+def publish(delta, directory=DELTA_DIR):
+    """Append the delta to its source's log (fsynced) and notify the listeners"""
+    if len(delta):
+        path = delta_path(delta.source, directory)
+        os.makedirs(directory, exist_ok=True)
+        now = datetime.now().isoformat()
+        with open(path, "a", encoding="utf-8") as f:
+            for entry in delta.entries():
+                f.write(json.dumps({**entry, "time": now}, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    for callback in _listeners:
+        try:
+            callback(delta)
+        except Exception as e:
+            print(f"⚠️ Delta listener {getattr(callback, '__name__', callback)} failed: {e}")
+
+
+class DeltaReader:
+    """Reads the entries appended to a source's delta log since the last call.
+    A line that is still being written is left for the next call."""
+
+    def __init__(self, source, directory=DELTA_DIR, offset=None):
+        self.path = delta_path(source, directory)
+        self.offset = self.end() if offset is None else offset
+
+    def end(self):
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self.offset += len(line)
+                entries.append(json.loads(line))
+        return entries
+
+
+def apply(products, entries):
+    """Apply delta entries to `products` ({key: record}) in place"""
+    for entry in entries:
+        if entry["op"] == "delete":
+            products.pop(entry["key"], None)
+        else:
+            products[entry["key"]] = entry["record"]
+    return products
+
+
+def alert_price_drops(min_drop=0.1):
+    """Listener that prints every product whose price fell by at least `min_drop`"""
+    def alert(delta):
+        for key, record, before in delta.changed:
+            after = to_number(first_of(record, PRICE_KEYS))
+            if before and after is not None and after <= before * (1 - min_drop):
+                title = record.get("title") or record.get("name") or key
+                print(f"📉 [{delta.source}] {title[:60]}: {before:,.0f} -> {after:,.0f} "
+                      f"(-{1 - after / before:.0%})")
+    return alert
@@ -0,0 +1,64 @@
+# scraping/common/dom.py
+#
+# Read every field of every card on a page in a single execute_script round trip,
+# instead of one WebDriver call per field per card.
+
+from scraping.common.parsing import get_backend
+
+CARD_FIELDS_JS = """
+const [cardCss, fields] = arguments;
+const read = (el, attr) => {
+    if (attr === 'text') return el.innerText.trim();
+    const raw = el.getAttribute(attr);
+    if (raw === null) return null;
+    const prop = el[attr];  // resolved value like Selenium's get_attribute (absolute href/src)
+    return typeof prop === 'string' ? prop : raw;
+};
+return Array.from(document.querySelectorAll(cardCss), card => {
+    const out = {}, hits = {};
+    for (const [name, chain, attr] of fields) {
+        let el = null;
+        hits[name] = chain.findIndex(css => (el = card.querySelector(css)) !== null);
+        out[name] = el ? read(el, attr) : null;
+    }
+    return [out, hits];
+});
+"""
+
+
+def extract_cards(driver, card_css, fields):
+    """One dict per element matching `card_css`. `fields` maps a name to (css, attr)
+    where attr "text" reads the rendered text and anything else that attribute.
+    `css` may also be a SelectorChain: its selectors are tried in order and the
+    one that matched is recorded on the chain. Missing fields come back as None."""
+    chains = {name: getattr(css, "selectors", None) or [css] for name, (css, _) in fields.items()}
+    spec = [[name, chains[name], attr] for name, (_, attr) in fields.items()]
+    cards = driver.execute_script(CARD_FIELDS_JS, card_css, spec) or []
+
+    for _, hits in cards:
+        for name, (css, _) in fields.items():
+            if hasattr(css, "record"):
+                index = hits[name]
+                css.record(chains[name][index] if index >= 0 else None)
+    return [out for out, _ in cards]
+
+
+def parse_cards(html, card_css, fields, backend=None):
+    """extract_cards() for saved HTML: the same `fields` spec, read with an HTML parser
+    backend instead of the live DOM. Text is the node's stripped text and attributes
+    come back as written (relative URLs stay relative)."""
+    b = backend or get_backend()
+    cards = []
+    for card in b.cards(html, card_css):
+        out = {}
+        for name, (css, attr) in fields.items():
+            if hasattr(css, "find"):
+                el = css.find(b, card)
+            else:
+                el = b.first(card, css)
+            if el is None:
+                out[name] = None
+            else:
+                out[name] = b.text(el).strip() if attr == "text" else b.attr(el, attr)
+        cards.append(out)
+    return cards
@@ -1,10 +1,87 @@
 # scraping/common/driver_setup.py
 
+import atexit
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from urllib.parse import urlparse
+
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
 
+from scraping.common.replay import instrument, snapshot
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+]
+
+
+# "Lean" profile: URL patterns dropped with Network.setBlockedURLs, by category.
+# The scrapers only read text and src/data-src attributes, none of this is needed.
+BLOCKED_RESOURCES = {
+    "images": ["*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.m3u8", "*.mp3", "*.ogg"],
+    "trackers": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*googlesyndication.com*", "*facebook.net*", "*connect.facebook.*",
+        "*hotjar.com*", "*clevertap*", "*wzrkt.com*", "*criteo.*", "*amazon-adsystem.com*",
+        "*fls-eu.amazon.*", "*unagi.amazon.*", "*moengage*", "*webengage*", "*branch.io*",
+    ],
+}
+BLOCKED_PATTERNS = [pattern for patterns in BLOCKED_RESOURCES.values() for pattern in patterns]
+
+# Per-site exceptions: categories (or single patterns) that must stay loaded on that host,
+# e.g. "images" for a site whose listing only renders once its images have loaded.
+SITE_ALLOWLIST = {
+    "www.flipkart.com": [],
+    "www.amazon.in": [],
+    "www.croma.com": [],
+    "www.reliancedigital.in": [],
+}
+
+
+def blocked_patterns(url=None):
+    """Blocked URL patterns for the site of `url`, minus its allowlist"""
+    allowed = set(SITE_ALLOWLIST.get(urlparse(url).netloc, [])) if url else set()
+    return [
+        pattern
+        for category, patterns in BLOCKED_RESOURCES.items() if category not in allowed
+        for pattern in patterns if pattern not in allowed
+    ]
+
+
+def block_resources(driver, url=None, force=False):
+    """Apply the lean blocking profile for the site of `url` to a live session.
+    CDP overrides are per tab, so pass `force` after switching to a new tab."""
+    patterns = blocked_patterns(url)
+    if not force and getattr(driver, "_blocked_patterns", None) == patterns:
+        return True
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        driver._blocked_patterns = patterns
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not enable resource blocking: {str(e)[:80]}")
+        return False
+
+
+@lru_cache(maxsize=1)
+def chromedriver_path():
+    """Resolve the chromedriver binary once per process instead of once per browser"""
+    return ChromeDriverManager().install()
+
+
 def setup_driver(headless=False):
     options = Options()
     if headless:
@@ -22,5 +99,189 @@ def setup_driver(headless=False):
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    driver = webdriver.Chrome(service=Service(chromedriver_path()), options=options)
     return driver
+
+
+def set_user_agent(driver, user_agent):
+    """Switch the user agent of a live session through CDP (no browser restart needed)"""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": user_agent})
+        driver._user_agent = user_agent
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not rotate user agent: {str(e)[:80]}")
+        return False
+
+
+def is_healthy(driver):
+    """Cheap round trip to check that the browser session is still alive"""
+    try:
+        driver.execute_script("return 1")
+        return True
+    except Exception:
+        return False
+
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class DriverPool:
+    """Keeps Chrome sessions alive between pages so the startup cost is paid once per worker.
+
+    Drivers are leased with `pool.lease()` and handed back automatically. A driver is
+    thrown away (and lazily replaced) when it fails a health check or has served
+    `max_pages` leases. With `rotate_user_agent` every lease gets a fresh UA via CDP.
+    With `lean` images, fonts, media and trackers are blocked (see BLOCKED_RESOURCES).
+    """
+
+    def __init__(self, size=1, headless=True, max_pages=50, rotate_user_agent=True, factory=None, lean=False):
+        self.size = size
+        self.headless = headless
+        self.max_pages = max_pages
+        self.rotate_user_agent = rotate_user_agent
+        self.lean = lean
+        self.factory = factory or (lambda: setup_driver(headless=self.headless))
+        # Idle drivers (LIFO), the page counters and the number of live drivers are
+        # guarded by one condition: a thread waiting for a driver is woken both when
+        # one is released and when one is discarded (its slot can be refilled)
+        self._idle = []
+        self._pages = {}
+        self._created = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _new_driver(self):
+        driver = self.factory()
+        driver._lean = self.lean
+        instrument(driver)  # no-op unless recording or replaying
+        with self._cond:
+            self._pages[id(driver)] = 0
+            created = self._created
+        print(f"🚗 Started browser ({created}/{self.size} in pool)")
+        return driver
+
+    def _take(self, timeout=None):
+        """An idle driver, or None once a slot for a new one has been reserved"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("DriverPool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._cond.wait(remaining)
+
+    def acquire(self, timeout=None):
+        while True:
+            driver = self._take(timeout)
+            if driver is None:
+                try:
+                    driver = self._new_driver()
+                except Exception:
+                    with self._cond:
+                        self._created -= 1
+                        self._cond.notify()
+                    raise
+
+            if is_healthy(driver):
+                break
+            print("♻️ Discarding unhealthy browser")
+            self._discard(driver)
+
+        if self.rotate_user_agent:
+            set_user_agent(driver, random.choice(USER_AGENTS))
+        return driver
+
+    def release(self, driver):
+        snapshot(driver)  # while recording, archive the page the lease ends on
+        key = id(driver)
+        with self._cond:
+            pages = self._pages[key] = self._pages.get(key, 0) + 1
+
+        if self._closed or not is_healthy(driver):
+            self._discard(driver)
+        elif self.max_pages and pages >= self.max_pages:
+            print(f"♻️ Recycling browser after {pages} pages")
+            self._discard(driver)
+        else:
+            with self._cond:
+                self._idle.append(driver)
+                self._cond.notify()
+
+    def _discard(self, driver):
+        quit_driver(driver)
+        with self._cond:
+            self._pages.pop(id(driver), None)
+            self._created -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        driver = self.acquire(timeout=timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for driver in idle:
+            self._discard(driver)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(**kwargs):
+    """Process-wide pool shared by all scrapers. kwargs only apply on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            _pool = DriverPool(**kwargs)
+        return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+atexit.register(close_pool)
+
+
+@contextmanager
+def lease_driver(driver=None, pool=None, url=None):
+    """Use the caller's driver if one was passed, otherwise lease one from the pool.
+    Either way a lean driver gets the blocking profile of the site of `url`, the one
+    it is about to visit: pool drivers carry their pool's lean setting, a caller's
+    driver is given the one of the process pool."""
+    if driver is not None:
+        if not hasattr(driver, "_lean"):
+            active = pool or _pool
+            driver._lean = bool(active and active.lean)
+        leased = nullcontext(driver)
+    else:
+        leased = (pool or get_pool()).lease()
+    with leased as driver:
+        if driver._lean:
+            block_resources(driver, url)
+        yield driver
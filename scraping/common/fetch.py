@@ -0,0 +1,125 @@
+# scraping/common/fetch.py
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from selenium.common.exceptions import TimeoutException
+
+from scraping.common.driver_setup import USER_AGENTS, lease_driver
+from scraping.common.rate_limit import get_limiter
+from scraping.common.replay import local_url, record_response
+
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENTS[0],
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-IN,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session(max_per_host=4, max_hosts=10, retries=2):
+    """requests.Session with keep-alive, gzip and at most `max_per_host` sockets per host"""
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max_per_host,
+                          pool_block=True, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+def contains_any(*markers):
+    """Build a "page is usable" check: True if any marker appears in the raw HTML"""
+    def check(html):
+        return any(marker in html for marker in markers)
+    return check
+
+
+def http_get(url, session=None, timeout=15, limiter=None):
+    """Plain HTTP fetch. Returns the HTML, or None on network errors / non-200 / CAPTCHA redirects.
+    Throttling signals (timeouts, 429/503, CAPTCHA) are reported to `limiter`.
+    While replaying (see common/replay.py) the request goes to the local archive server."""
+    try:
+        response = (session or get_session()).get(local_url(url), timeout=timeout)
+    except requests.RequestException as e:
+        print(f"🌐 HTTP fetch failed for {url}: {str(e)[:80]}")
+        if limiter:
+            limiter.failure(url, "timeout" if isinstance(e, requests.Timeout) else "network error")
+        return None
+    record_response(url, response)
+    if "captcha" in response.url.lower():
+        print(f"🌐 CAPTCHA redirect for {url}")
+        if limiter:
+            limiter.failure(url, "captcha")
+        return None
+    if response.status_code != 200:
+        print(f"🌐 HTTP {response.status_code} for {url}")
+        if limiter and response.status_code in (429, 503):
+            limiter.failure(url, f"HTTP {response.status_code}")
+        return None
+    if limiter:
+        limiter.success(url)
+    return response.text
+
+
+def default_load(driver, url):
+    driver.get(url)
+    return driver.page_source
+
+
+def fetch_html(url, ready=None, load=None, driver=None, session=None, timeout=15,
+               limiter=None, latency=None, page=None):
+    """Try a plain HTTP request first and only fall back to a pooled browser when the
+    response fails the `ready(html)` check (i.e. the page needs JavaScript).
+
+    `load(driver, url)` is the browser-side loader and must return the page HTML.
+    The page waits on `limiter` (the shared adaptive limiter by default) once; the
+    browser fallback uses the same slot and reports its outcome to the limiter too,
+    a page that still fails `ready` (soft block, empty shell) as a failure.
+    With `latency` the fetch time of `page` is recorded, excluding politeness waits.
+    Returns a tuple of (html, "http" | "selenium").
+    """
+    limiter = limiter or get_limiter()
+    limiter.wait(url)
+    started = time.perf_counter()
+    html = http_get(url, session=session, timeout=timeout, limiter=limiter)
+    elapsed = time.perf_counter() - started
+    source = "http"
+
+    if html is None or (ready is not None and not ready(html)):
+        print(f"🧭 Falling back to browser for {url}")
+        source = "selenium"
+        started = time.perf_counter()
+        try:
+            with lease_driver(driver, url=url) as page_driver:
+                html = (load or default_load)(page_driver, url)
+        except TimeoutException:
+            limiter.failure(url, "browser timeout")
+            raise
+        finally:
+            elapsed += time.perf_counter() - started
+        if ready is None or ready(html):
+            limiter.success(url)
+        else:
+            limiter.failure(url, "page not ready")
+
+    if latency:
+        latency.record(page, elapsed)
+    return html, source
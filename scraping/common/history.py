@@ -0,0 +1,171 @@
+# scraping/common/history.py
+#
+# Append-only price history: one row per product each time a run finds it new or
+# changed (product key, time, price, mrp, rating, review count), stored column by
+# column next to the SQLite store.
+#
+#   data/history/<source>/<YYYY-MM-DD>/part-<HHMMSS>-<n>.parquet   (pyarrow installed)
+#   data/history/<source>/<YYYY-MM-DD>/part-<HHMMSS>-<n>/*.npy     (NumPy only)
+#
+# A part is written once and never rewritten; every save adds a new one. Rows in a
+# part are sorted by product key, and the key column is dictionary-encoded (Parquet
+# dictionary pages / an array of unique keys plus int32 codes), so reading one
+# product's history skips whole days, row groups or code ranges instead of scanning.
+#
+# Times are UTC throughout: observations are stored as UTC epoch milliseconds, day
+# directories are UTC dates, and product_history() returns timezone-aware UTC
+# datetimes. Naive datetimes passed in (observed_at, since) are taken as local time.
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from scraping.common.records import MRP_KEYS, PRICE_KEYS, first_of, product_key, review_count, to_number
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+HISTORY_DIR = os.environ.get("SCRAPER_HISTORY", os.path.join("data", "history"))
+# Small row groups so the min/max statistics of the key column narrow a read down
+ROW_GROUP_SIZE = 1024
+VALUE_COLUMNS = ("price", "mrp", "rating", "reviews")
+
+
+def _utc(moment):
+    """`moment` as an aware UTC datetime; a naive one is local time"""
+    return moment.astimezone(timezone.utc)
+
+
+def _columns(records):
+    """Sorted rows of `records` as {column: list}; records without a key are skipped"""
+    rows = []
+    for record in records:
+        key = product_key(record)
+        if key is None:
+            continue
+        rows.append((key, to_number(first_of(record, PRICE_KEYS)), to_number(first_of(record, MRP_KEYS)),
+                     to_number(record.get("rating")), review_count(record.get("reviews"))))
+    rows.sort(key=lambda row: row[0])
+    return dict(zip(("product_key",) + VALUE_COLUMNS, map(list, zip(*rows)))) if rows else None
+
+
+def _write_parquet(path, columns, observed_ms):
+    table = pa.table({
+        "product_key": pa.array(columns["product_key"], pa.string()).dictionary_encode(),
+        "observed_at": pa.array([observed_ms] * len(columns["product_key"]), pa.timestamp("ms", tz="UTC")),
+        "price": pa.array(columns["price"], pa.float64()),
+        "mrp": pa.array(columns["mrp"], pa.float64()),
+        "rating": pa.array(columns["rating"], pa.float64()),
+        "reviews": pa.array([None if r is None else int(r) for r in columns["reviews"]], pa.int64()),
+    })
+    # Written under a temporary name so readers never see a half-written part
+    pq.write_table(table, path + ".tmp", row_group_size=ROW_GROUP_SIZE, compression="zstd")
+    os.rename(path + ".tmp", path + ".parquet")
+
+
+def _write_npy(path, columns, observed_ms):
+    keys, codes = np.unique(np.array(columns["product_key"], dtype=str), return_inverse=True)
+    arrays = {
+        "keys": keys,
+        "codes": codes.astype(np.int32),
+        "observed_at": np.full(len(codes), observed_ms, dtype=np.int64),
+        "price": np.array(columns["price"], dtype=np.float64),
+        "mrp": np.array(columns["mrp"], dtype=np.float64),
+        "rating": np.array(columns["rating"], dtype=np.float64),
+        "reviews": np.array([-1 if r is None else r for r in columns["reviews"]], dtype=np.int64),
+    }
+    tmp = path + ".tmp"
+    os.makedirs(tmp)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp, name + ".npy"), array)
+    os.rename(tmp, path)
+
+
+def append_history(source, records, observed_at=None, directory=HISTORY_DIR):
+    """Append one observation per record (as of `observed_at`, default now) to the
+    history of `source`. Returns the part written, or None if no record had a key."""
+    columns = _columns(records)
+    if columns is None:
+        return None
+    observed_at = _utc(observed_at) if observed_at else datetime.now(timezone.utc)
+    observed_ms = int(observed_at.timestamp() * 1000)
+
+    day_dir = os.path.join(directory, source, observed_at.strftime("%Y-%m-%d"))
+    os.makedirs(day_dir, exist_ok=True)
+    stem = f"part-{observed_at:%H%M%S}"
+    n = 0
+    while any(os.path.exists(os.path.join(day_dir, f"{stem}-{n}{ext}")) for ext in ("", ".parquet", ".tmp")):
+        n += 1
+    path = os.path.join(day_dir, f"{stem}-{n}")
+
+    if pq is not None:
+        _write_parquet(path, columns, observed_ms)
+        return path + ".parquet"
+    _write_npy(path, columns, observed_ms)
+    return path
+
+
+def _read_parquet(path, key):
+    table = pq.read_table(path, filters=[("product_key", "==", key)], columns=["observed_at", *VALUE_COLUMNS])
+    return [
+        # Parts written before the column carried tz="UTC" hold the same UTC epoch values
+        {"observed_at": row["observed_at"].replace(tzinfo=timezone.utc), **{c: row[c] for c in VALUE_COLUMNS}}
+        for row in table.to_pylist()
+    ]
+
+
+def _read_npy(path, key):
+    keys = np.load(os.path.join(path, "keys.npy"), mmap_mode="r")
+    code = np.searchsorted(keys, key)
+    if code == len(keys) or keys[code] != key:
+        return []
+    # Codes are sorted, so this product's rows are one contiguous slice
+    codes = np.load(os.path.join(path, "codes.npy"), mmap_mode="r")
+    start, end = np.searchsorted(codes, code, "left"), np.searchsorted(codes, code, "right")
+    columns = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r")[start:end]
+               for name in ("observed_at",) + VALUE_COLUMNS}
+    rows = []
+    for i in range(end - start):
+        row = {"observed_at": datetime.fromtimestamp(columns["observed_at"][i] / 1000, timezone.utc)}
+        for name in ("price", "mrp", "rating"):
+            value = float(columns[name][i])
+            row[name] = None if np.isnan(value) else value
+        reviews = int(columns["reviews"][i])
+        row["reviews"] = None if reviews < 0 else reviews
+        rows.append(row)
+    return rows
+
+
+def product_history(source, key, since=None, directory=HISTORY_DIR):
+    """Every observation of product `key` in `source` (oldest first), optionally only
+    those at or after `since`: [{observed_at (UTC), price, mrp, rating, reviews}]"""
+    source_dir = os.path.join(directory, source)
+    if not os.path.isdir(source_dir):
+        return []
+    since = _utc(since) if since else None
+    # A day early: older parts were filed under local dates
+    first_day = (since - timedelta(days=1)).strftime("%Y-%m-%d") if since else ""
+
+    rows = []
+    for day in sorted(os.listdir(source_dir)):
+        if day < first_day:
+            continue
+        day_dir = os.path.join(source_dir, day)
+        for part in sorted(os.listdir(day_dir)):
+            path = os.path.join(day_dir, part)
+            if part.endswith(".parquet"):
+                if pq is None:
+                    print(f"⚠️ Skipping {path}: pyarrow is not installed")
+                    continue
+                rows.extend(_read_parquet(path, key))
+            elif not part.endswith(".tmp") and os.path.isdir(path):
+                rows.extend(_read_npy(path, key))
+
+    rows.sort(key=lambda row: row["observed_at"])
+    if since:
+        rows = [row for row in rows if row["observed_at"] >= since]
+    return rows
@@ -0,0 +1,108 @@
+# scraping/common/metrics.py
+
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+
+_recorders = {}
+_lock = threading.Lock()
+
+# Bytes are transferSize from Resource Timing: a lower bound, cross-origin
+# responses without Timing-Allow-Origin report 0.
+PAGE_TRANSFER_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? nav.transferSize : 0;
+for (const r of resources) bytes += r.transferSize || 0;
+return {
+    bytes: bytes,
+    requests: resources.length + 1,
+    load_ms: nav && nav.loadEventEnd ? Math.round(nav.loadEventEnd - nav.startTime) : null,
+    dom_ready_ms: nav ? Math.round(nav.domContentLoadedEventEnd - nav.startTime) : null
+};
+"""
+
+
+def page_transfer_stats(driver):
+    try:
+        return driver.execute_script(PAGE_TRANSFER_JS)
+    except Exception as e:
+        print(f"⚠️ Could not read page transfer stats: {str(e)[:80]}")
+        return None
+
+
+class LatencyRecorder:
+    """Collects per-page timings for one scraper so runs can be compared in numbers"""
+
+    def __init__(self, name):
+        self.name = name
+        self.samples = []
+        self.transfers = []
+
+    @contextmanager
+    def time(self, page):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(page, time.perf_counter() - start)
+
+    def record(self, page, seconds):
+        self.samples.append((page, seconds))
+
+    def record_transfer(self, page, driver):
+        """Record bytes transferred and page-load time of the page loaded in `driver`"""
+        stats = page_transfer_stats(driver)
+        if stats:
+            self.transfers.append((page, stats))
+            print(f"📦 [{self.name}] page {page}: {stats['bytes'] / 1024:.0f} KB in "
+                  f"{stats['requests']} requests, load {stats['load_ms']} ms")
+        return stats
+
+    def summary(self):
+        values = sorted(s for _, s in self.samples)
+        stats = self._transfer_summary()
+        if not values:
+            return {"pages": 0, **stats}
+        return {
+            "pages": len(values),
+            "mean_s": round(statistics.fmean(values), 3),
+            "p50_s": round(values[len(values) // 2], 3),
+            "p95_s": round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+            "max_s": round(values[-1], 3),
+            "total_s": round(sum(values), 3),
+            **stats,
+        }
+
+    def _transfer_summary(self):
+        if not self.transfers:
+            return {}
+        total = sum(t["bytes"] for _, t in self.transfers)
+        loads = [t["load_ms"] for _, t in self.transfers if t["load_ms"] is not None]
+        return {
+            "bytes_total": total,
+            "bytes_per_page": total // len(self.transfers),
+            "load_ms_mean": round(statistics.fmean(loads)) if loads else None,
+        }
+
+    def report(self):
+        stats = self.summary()
+        if stats["pages"]:
+            print(f"⏱️ [{self.name}] {stats['pages']} pages, mean {stats['mean_s']}s, "
+                  f"p50 {stats['p50_s']}s, p95 {stats['p95_s']}s, max {stats['max_s']}s")
+        if stats.get("bytes_total"):
+            print(f"📦 [{self.name}] {stats['bytes_total'] / 1048576:.1f} MB transferred, "
+                  f"{stats['bytes_per_page'] / 1024:.0f} KB/page, mean load {stats['load_ms_mean']} ms")
+        return stats
+
+
+def get_recorder(name):
+    with _lock:
+        if name not in _recorders:
+            _recorders[name] = LatencyRecorder(name)
+        return _recorders[name]
+
+
+def report_all():
+    return {name: recorder.report() for name, recorder in _recorders.items()}
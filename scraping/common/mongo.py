@@ -0,0 +1,228 @@
+# scraping/common/mongo.py
+#
+# Optional MongoDB copy of every saved run: one document per (source, product_key)
+# in <db>.products, upserted with unordered bulk_write batches from a background
+# thread. The scraper only appends to a bounded queue of batches; when MongoDB
+# falls behind, the queue fills up and write() blocks, so the scraper slows down
+# instead of buffering without limit.
+#
+#   python run_scraper.py --site flipkart --mongo     (MONGO_URI from the env or .env)
+#
+# Any pymongo-compatible client can be passed in (configure_mongo(client=...)),
+# e.g. mongomock.MongoClient() to run without a server.
+
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from scraping.common.records import (IMAGE_KEYS, TITLE_KEYS, URL_KEYS, content, first_of,
+                                     product_key)
+
+try:
+    from pymongo import ASCENDING, MongoClient, UpdateOne
+except ImportError:
+    MongoClient = None
+
+ENV_FILE = ".env"
+DEFAULT_DATABASE = "scraper"
+BATCH_SIZE = 500
+# A partial batch is sent after this many seconds without filling up
+FLUSH_INTERVAL = 2.0
+# Batches waiting for the database before write() blocks
+MAX_PENDING = 4
+
+
+def mongo_uri(env_file=ENV_FILE):
+    """MONGO_URI from the environment, else from the .env file"""
+    uri = os.environ.get("MONGO_URI")
+    if uri or not os.path.exists(env_file):
+        return uri
+    with open(env_file, encoding="utf-8") as f:
+        for line in f:
+            name, sep, value = line.strip().partition("=")
+            if sep and name.strip() == "MONGO_URI":
+                return value.strip().strip("'\"")
+    return None
+
+
+class MongoWriter:
+    """Upserts product records into `collection` in batches of `batch_size`,
+    sent by a background thread at least every `flush_interval` seconds"""
+
+    def __init__(self, client, database=DEFAULT_DATABASE, collection="products", batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self.collection = client[database][collection]
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.errors = 0
+        self._client = client
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        # Held by the writer thread while it sends a partial batch it took itself,
+        # which never goes through the queue that flush() joins
+        self._partial_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self.ensure_indexes()
+        self._thread = threading.Thread(target=self._run, name="mongo-writer", daemon=True)
+        self._thread.start()
+
+    def ensure_indexes(self):
+        self.collection.create_index([("source", ASCENDING), ("product_key", ASCENDING)], unique=True)
+        self.collection.create_index([("source", ASCENDING), ("last_seen", ASCENDING)])
+
+    def _operation(self, source, record, now, run_id):
+        key = product_key(record)
+        if key is None:
+            return None
+        fields = {
+            "title": first_of(record, TITLE_KEYS),
+            "url": first_of(record, URL_KEYS),
+            "image_url": first_of(record, IMAGE_KEYS),
+            **content(record),
+            "data": record,
+            "last_seen": now,
+            "last_run": run_id,
+        }
+        return UpdateOne({"source": source, "product_key": key},
+                         {"$set": fields, "$setOnInsert": {"first_seen": now}, "$inc": {"observations": 1}},
+                         upsert=True)
+
+    def write(self, source, records, run_id=None):
+        """Queue upserts for `records`. Blocks while MAX_PENDING batches are waiting."""
+        if self._closed:
+            raise RuntimeError("MongoWriter is closed")
+        now = datetime.now(timezone.utc)
+        operations = [op for op in (self._operation(source, r, now, run_id) for r in records) if op]
+        with self._buffer_lock:
+            self._buffer.extend(operations)
+            batches = []
+            while len(self._buffer) >= self.batch_size:
+                batches.append(self._buffer[:self.batch_size])
+                del self._buffer[:self.batch_size]
+        for batch in batches:
+            self._queue.put(batch)
+
+    def _take_partial(self):
+        with self._buffer_lock:
+            batch, self._buffer = self._buffer, []
+        return batch
+
+    def _send_partial(self):
+        with self._partial_lock:
+            batch = self._take_partial()
+            if batch:
+                self._send(batch)
+
+    def _send(self, batch):
+        try:
+            result = self.collection.bulk_write(batch, ordered=False)
+            self.written += result.upserted_count + result.modified_count
+        except Exception as e:
+            # BulkWriteError lists the failed operations; unordered, the rest was applied.
+            # Anything else (connection lost) costs the whole batch. The thread keeps going.
+            failed = len((getattr(e, "details", None) or {}).get("writeErrors", [])) or len(batch)
+            self.errors += failed
+            print(f"⚠️ MongoDB: {failed} of {len(batch)} upserts failed: {str(e)[:100]}")
+        self._last_flush = time.monotonic()
+
+    def _run(self):
+        while True:
+            try:
+                batch = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._send_partial()
+                continue
+            if batch is None:
+                self._queue.task_done()
+                return
+            self._send(batch)
+            self._queue.task_done()
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._send_partial()
+
+    def flush(self):
+        """Send the partial batch and wait until everything queued is written"""
+        partial = self._take_partial()
+        if partial:
+            self._queue.put(partial)
+        self._queue.join()
+        # The timer may have taken the partial batch just before us
+        with self._partial_lock:
+            pass
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        print(f"🍃 MongoDB: {self.written} products written to {self.collection.full_name}"
+              + (f", {self.errors} failed" if self.errors else ""))
+
+
+_writer = None
+# (uri, kwargs) of a lazy configure_mongo(), built into a writer on first use
+_pending = None
+_writer_lock = threading.Lock()
+
+
+def check_mongo(uri=None):
+    """The URI MongoDB output would use; raises if it can't be used at all"""
+    if MongoClient is None:
+        raise RuntimeError("MongoDB output needs the pymongo package")
+    uri = uri or mongo_uri()
+    if not uri or not uri.startswith(("mongodb://", "mongodb+srv://")):
+        raise RuntimeError("Set MONGO_URI (in the environment or .env) to a mongodb:// URI")
+    return uri
+
+
+def configure_mongo(uri=None, client=None, lazy=False, **kwargs):
+    """Send every save_products() run to MongoDB as well. `client` (any pymongo-
+    compatible client) wins over `uri`, which defaults to MONGO_URI.
+
+    With `lazy` only the settings are checked and kept; the client and the writer
+    thread are created by the first get_mongo(). Neither MongoClient nor threads
+    survive a fork, so a process that starts worker processes (--parallel, parse
+    workers) should configure lazily and only save after they are gone."""
+    global _writer, _pending
+    if MongoClient is None:
+        raise RuntimeError("MongoDB output needs the pymongo package")
+    if client is None:
+        uri = check_mongo(uri)
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+        if lazy and client is None:
+            _pending = (uri, kwargs)
+            return None
+        _pending = None
+        _writer = MongoWriter(client or MongoClient(uri), **kwargs)
+        return _writer
+
+
+def get_mongo():
+    """The configured writer, or None when MongoDB output is off"""
+    global _writer, _pending
+    if _writer is None and _pending is not None:
+        with _writer_lock:
+            if _writer is None and _pending is not None:
+                uri, kwargs = _pending
+                _writer = MongoWriter(MongoClient(uri), **kwargs)
+                _pending = None
+    return _writer
+
+
+def close_mongo():
+    global _writer, _pending
+    with _writer_lock:
+        _pending = None
+        if _writer is not None:
+            _writer.close()
+            _writer = None
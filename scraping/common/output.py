@@ -0,0 +1,192 @@
+# scraping/common/output.py
+#
+# One writer for every scraper's output files. Each record is serialized once:
+# its JSON text is shared by the .json and .jsonl outputs and its flattened cells
+# by the CSV (and Parquet) output. Everything is written to <file>.tmp and renamed
+# into place on close, so app.py and other readers see either the previous file
+# or the complete new one, never a half-written file.
+#
+#   data/flipkart_mobiles.csv[.gz|.zst]  .json[.gz|.zst]  .jsonl[.gz|.zst]  .parquet
+#
+# Pick formats / compression with SCRAPER_OUTPUT_FORMATS=csv,json,jsonl,parquet and
+# SCRAPER_OUTPUT_COMPRESSION=gzip|zstd, or configure_output().
+
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+FORMATS = ("csv", "json", "jsonl", "parquet")
+COMPRESSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+_formats = tuple(os.environ.get("SCRAPER_OUTPUT_FORMATS", "csv,json").split(","))
+_compression = os.environ.get("SCRAPER_OUTPUT_COMPRESSION") or None
+
+
+def configure_output(formats=None, compression=None):
+    """Default formats and compression of every OutputWriter in this process"""
+    global _formats, _compression
+    formats = tuple(formats or _formats)
+    for fmt in formats:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}', choose from {', '.join(FORMATS)}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compression}', choose from gzip, zstd")
+    if compression == "zstd" and zstandard is None:
+        raise ValueError("zstd output needs the zstandard package")
+    if "parquet" in formats and pq is None:
+        raise ValueError("Parquet output needs the pyarrow package")
+    _formats, _compression = formats, compression
+
+
+def _open(path, compression, encoding="utf-8"):
+    """Text file for writing, compressed by `compression`"""
+    if compression == "gzip":
+        return gzip.open(path, "wt", encoding=encoding, newline="")
+    if compression == "zstd":
+        raw = zstandard.ZstdCompressor(level=10).stream_writer(open(path, "wb"))
+        return io.TextIOWrapper(raw, encoding=encoding, newline="")
+    return open(path, "w", encoding=encoding, newline="")
+
+
+def _cell(value):
+    """CSV/Parquet cell: lists joined with ", ", dicts as JSON, the rest as is"""
+    if isinstance(value, (list, tuple)):
+        return ", ".join(map(str, value))
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+class OutputWriter:
+    """Writes records to `filename` (any extension; its stem names every output) in
+    `formats`. `columns` fixes the CSV/Parquet columns; otherwise they are every key
+    seen, in order of appearance. `paths` overrides single outputs: {"json": path}."""
+
+    def __init__(self, filename, formats=None, compression=None, columns=None, paths=None,
+                 csv_encoding="utf-8"):
+        self.formats = tuple(formats or _formats)
+        self.compression = compression or _compression
+        stem = os.path.splitext(filename)[0]
+        suffix = COMPRESSIONS[self.compression]
+        self.paths = {fmt: f"{stem}.{fmt}" + ("" if fmt == "parquet" else suffix) for fmt in self.formats}
+        self.paths.update({fmt: path for fmt, path in (paths or {}).items() if fmt in self.formats})
+        self.columns = list(columns or [])
+        self.fixed_columns = columns is not None
+        self.csv_encoding = csv_encoding
+        self.count = 0
+        self._files = {}
+        self._tmp = {}
+
+    def open(self):
+        for fmt, path in self.paths.items():
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._tmp[fmt] = path + ".tmp"
+        if "json" in self.formats:
+            self._files["json"] = _open(self._tmp["json"], self.compression)
+            self._files["json"].write("[")
+        if "jsonl" in self.formats:
+            self._files["jsonl"] = _open(self._tmp["jsonl"], self.compression)
+        if "csv" in self.formats:
+            # The header is only known at the end: rows go to a scratch file first
+            self._files["csv"] = tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+            self._csv = csv.writer(self._files["csv"])
+        if "parquet" in self.formats:
+            self._parquet = []
+        return self
+
+    def write(self, record):
+        if "json" in self._files or "jsonl" in self._files:
+            text = json.dumps(record, ensure_ascii=False, default=str)
+            if "json" in self._files:
+                self._files["json"].write((",\n" if self.count else "\n") + text)
+            if "jsonl" in self._files:
+                self._files["jsonl"].write(text + "\n")
+        if "csv" in self._files or "parquet" in self.formats:
+            if not self.fixed_columns:
+                self.columns.extend(k for k in record if k not in self.columns)
+            row = [_cell(record.get(c)) for c in self.columns]
+            if "csv" in self._files:
+                self._csv.writerow(row)
+            if "parquet" in self.formats:
+                self._parquet.append(row)
+        self.count += 1
+
+    def write_batch(self, records):
+        for record in records:
+            self.write(record)
+
+    def _finish_csv(self, scratch):
+        # Rows written before a column first appeared are just shorter
+        with _open(self._tmp["csv"], self.compression, self.csv_encoding) as f:
+            csv.writer(f).writerow(self.columns)
+            scratch.seek(0)
+            for line in scratch:
+                f.write(line)
+
+    def _finish_parquet(self):
+        columns = {}
+        for i, name in enumerate(self.columns):
+            values = [row[i] if i < len(row) else None for row in self._parquet]
+            try:
+                columns[name] = pa.array(values)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Mixed types (12999 and "₹12,999"): keep the column as text
+                columns[name] = pa.array([None if v is None else str(v) for v in values], pa.string())
+        pq.write_table(pa.table(columns), self._tmp["parquet"], compression=self.compression or "snappy")
+
+    def close(self):
+        """Complete every output and move it into place"""
+        if "json" in self._files:
+            self._files["json"].write("\n]\n")
+        for fmt, f in self._files.items():
+            if fmt == "csv":
+                self._finish_csv(f)
+            f.close()
+        self._files = {}
+        if "parquet" in self.formats:
+            self._finish_parquet()
+            self._parquet = None
+        for fmt, path in self.paths.items():
+            os.replace(self._tmp[fmt], path)
+        self._tmp = {}
+
+    def abort(self):
+        """Drop the unfinished outputs; the previous files stay untouched"""
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        for tmp in self._tmp.values():
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self._tmp = {}
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_outputs(records, filename, **kwargs):
+    """Write `records` (any iterable) with one OutputWriter. Returns {format: path}."""
+    with OutputWriter(filename, **kwargs) as writer:
+        writer.write_batch(records)
+    print(f"💾 {writer.count} records written to {', '.join(writer.paths.values())}")
+    return writer.paths
@@ -0,0 +1,157 @@
+# scraping/common/parsing.py
+#
+# Pluggable HTML parser backends for the listing parsers. Every backend offers the
+# same small node API (cards / first / first_of / all / text / attr / html), so a
+# scraper's field extraction is written once and runs on any of them.
+#
+# Pick one with SCRAPER_HTML_PARSER=lxml|html.parser|selectolax or configure_parser().
+
+import os
+import re
+import threading
+from functools import lru_cache
+from importlib.util import find_spec
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+DEFAULT_PARSER = os.environ.get("SCRAPER_HTML_PARSER", "lxml")
+
+
+@lru_cache(maxsize=256)
+def compiled(css):
+    """Selectors are compiled once per process instead of on every select() call"""
+    return soupsieve.compile(css)
+
+
+class SoupBackend:
+    """BeautifulSoup with the "lxml" or "html.parser" tree builder"""
+
+    def __init__(self, features):
+        self.name = features
+        self.features = features
+
+    def cards(self, html, css, strainers=()):
+        """All elements matching `css`. With `strainers` (SoupStrainers) the tree is
+        built only from the first strainer that keeps any cards, which skips most of
+        the page; the full document is parsed only if none of them does."""
+        for strainer in strainers:
+            found = compiled(css).select(BeautifulSoup(html, self.features, parse_only=strainer))
+            if found:
+                return found
+        return compiled(css).select(BeautifulSoup(html, self.features))
+
+    def first(self, node, css):
+        return compiled(css).select_one(node)
+
+    def all(self, node, css):
+        return compiled(css).select(node)
+
+    def text(self, node):
+        return node.get_text()
+
+    def own_text(self, node):
+        """Text of the node itself, not of nested elements (bs4's .string, else the
+        direct text children)"""
+        return node.string or "".join(node.find_all(string=True, recursive=False))
+
+    def attr(self, node, name):
+        return node.get(name)
+
+    def html(self, node):
+        return str(node)
+
+    def first_of(self, node, *selectors):
+        """First match of the first selector that matches (keeps fallback order)"""
+        for css in selectors:
+            found = self.first(node, css)
+            if found is not None:
+                return found
+        return None
+
+    def first_matching(self, node, css, pattern):
+        """First element matching `css` whose own text matches the compiled regex
+        `pattern`. Only its own text: a wrapper around the matching element (or the
+        whole card) must not match."""
+        for element in self.all(node, css):
+            if pattern.search(self.own_text(element)):
+                return element
+        return None
+
+
+class SelectolaxBackend(SoupBackend):
+    """selectolax (lexbor): a C parser, no tree scoping needed"""
+
+    def __init__(self):
+        self.name = "selectolax"
+
+    def cards(self, html, css, strainers=()):
+        return LexborHTMLParser(html).css(css)
+
+    def first(self, node, css):
+        return node.css_first(css)
+
+    def all(self, node, css):
+        return node.css(css)
+
+    def text(self, node):
+        return node.text()
+
+    def own_text(self, node):
+        return node.text(deep=False)
+
+    def attr(self, node, name):
+        return node.attributes.get(name)
+
+    def html(self, node):
+        return node.html
+
+
+BACKENDS = {
+    "lxml": lambda: SoupBackend("lxml"),
+    "html.parser": lambda: SoupBackend("html.parser"),
+    "selectolax": SelectolaxBackend,
+}
+
+_backends = {}
+_parser = DEFAULT_PARSER
+_lock = threading.Lock()
+
+
+def available_backends():
+    return [name for name in BACKENDS
+            if name == "html.parser"
+            or (name == "lxml" and find_spec("lxml") is not None)
+            or (name == "selectolax" and LexborHTMLParser is not None)]
+
+
+def get_backend(name=None):
+    """Backend by name (default: the configured one). Falls back to html.parser,
+    which ships with Python, when the requested one is not installed."""
+    name = name or _parser
+    with _lock:
+        if name not in _backends:
+            if name not in available_backends():
+                print(f"⚠️ HTML parser '{name}' not available, using html.parser")
+                _backends[name] = BACKENDS["html.parser"]()
+            else:
+                _backends[name] = BACKENDS[name]()
+        return _backends[name]
+
+
+def configure_parser(name):
+    global _parser
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser '{name}', choose from {', '.join(BACKENDS)}")
+    _parser = name
+    return get_backend(name)
+
+
+def text_pattern(*words):
+    """Case-insensitive "contains any of `words`" regex for first_matching()"""
+    return re.compile("|".join(re.escape(w) for w in words), re.IGNORECASE)
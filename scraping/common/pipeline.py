@@ -0,0 +1,70 @@
+# scraping/common/pipeline.py
+#
+# Producer/consumer page loop: the calling thread keeps fetching pages (browser or
+# HTTP) while the HTML of earlier pages is parsed in worker processes, so a
+# CPU-bound BeautifulSoup parse no longer holds up the next navigation.
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from scraping.common.parsing import configure_parser, get_backend
+
+
+def scrape_pages_pipelined(pages, fetch, parse, workers=2, max_pending=None, checkpoint=None, on_empty=None):
+    """Run `fetch(page)` -> html for each page on this thread and `parse(html, page)`
+    in a pool of `workers` processes. `parse` must be a module-level function.
+
+    At most `max_pending` (default 2 x workers) snapshots wait for a parser; the
+    fetch loop blocks beyond that. Once a parsed page comes back without products
+    no further pages are fetched and `on_empty(page)` is called. Pages already in `checkpoint` are skipped and
+    parsed pages are recorded to it. Returns all products in page order, or [] when
+    the checkpoint streams them to its sink.
+    """
+    max_pending = max_pending or workers * 2
+    streamed = checkpoint is not None and checkpoint.sink is not None
+    results = dict(checkpoint.pages) if checkpoint and not streamed else {}
+    last_page = (checkpoint.stop_page if checkpoint else None) or float("inf")
+    if checkpoint:
+        pages = checkpoint.pending(pages)
+    pending = {}
+
+    def collect(block):
+        nonlocal last_page
+        if block:
+            wait(pending, return_when=FIRST_COMPLETED)
+        for future in [f for f in pending if f.done()]:
+            page = pending.pop(future)
+            try:
+                products = future.result()
+            except Exception as e:
+                print(f"Error parsing page {page}: {str(e)[:100]}")
+                continue
+            if not streamed:
+                results[page] = products
+            if checkpoint:
+                checkpoint.record(page, products)
+            print(f"Page {page} complete - Valid products: {len(products)}")
+            if not products:
+                print(f"No valid products found on page {page}. Stopping early.")
+                if on_empty:
+                    on_empty(page)
+                last_page = min(last_page, page)
+
+    # Workers use the same HTML parser backend as this process
+    with ProcessPoolExecutor(max_workers=workers, initializer=configure_parser,
+                             initargs=(get_backend().name,)) as executor:
+        for page in pages:
+            collect(block=len(pending) >= max_pending)
+            if page > last_page:
+                break
+            print(f"\nScraping page {page}")
+            try:
+                html = fetch(page)
+            except Exception as e:
+                print(f"Error scraping page {page}: {str(e)[:100]}")
+                continue
+            pending[executor.submit(parse, html, page)] = page
+
+        while pending:
+            collect(block=True)
+
+    return [p for page in sorted(results) if page <= last_page for p in results[page]]
@@ -0,0 +1,124 @@
+# scraping/common/rate_limit.py
+
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+# Requests per second per site. `rate` is the starting point, AIMD keeps it
+# between `min_rate` and `max_rate`; `burst` is the token bucket size.
+SITE_LIMITS = {
+    "www.flipkart.com": {"rate": 0.5, "min_rate": 0.1, "max_rate": 2.0, "burst": 2},
+    "www.amazon.in": {"rate": 0.2, "min_rate": 0.05, "max_rate": 0.5, "burst": 1},
+    "www.croma.com": {"rate": 0.3, "min_rate": 0.05, "max_rate": 1.0, "burst": 1},
+    "www.reliancedigital.in": {"rate": 0.25, "min_rate": 0.05, "max_rate": 1.0, "burst": 1},
+}
+DEFAULT_LIMIT = {"rate": 0.3, "min_rate": 0.05, "max_rate": 1.0, "burst": 1}
+
+
+class TokenBucket:
+    """Token bucket whose refill rate adapts AIMD-style: +`increase` req/s after
+    every clean response, x`decrease` after a CAPTCHA, timeout or empty page."""
+
+    def __init__(self, rate, min_rate, max_rate, burst=1, increase=0.02, decrease=0.5):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.failures = 0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take a token and return how long the caller has to wait for it.
+        Tokens can go negative so concurrent callers queue up behind each other."""
+        self._refill(time.monotonic())
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def success(self):
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def failure(self):
+        self._refill(time.monotonic())
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.tokens = min(self.tokens, 0)  # no bursting right after being throttled
+        self.failures += 1
+
+
+class RateLimiter:
+    """Per-domain adaptive limiter shared by every scraper in the process.
+
+    Call `wait(url)` before each request, then `success(url)` or
+    `failure(url, reason)` depending on what came back. `scale` multiplies all
+    configured rates (e.g. 0.5 to be twice as polite).
+    """
+
+    def __init__(self, limits=None, default=None, scale=1.0, jitter=0.2):
+        self.limits = limits or SITE_LIMITS
+        self.default = default or DEFAULT_LIMIT
+        self.scale = scale
+        self.jitter = jitter
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, url):
+        domain = urlparse(url).netloc
+        if domain not in self._buckets:
+            config = dict(self.limits.get(domain, self.default))
+            for key in ("rate", "min_rate", "max_rate"):
+                config[key] *= self.scale
+            self._buckets[domain] = TokenBucket(**config)
+        return self._buckets[domain]
+
+    def wait(self, url):
+        with self._lock:
+            bucket = self._bucket(url)
+            delay = bucket.reserve()
+            if delay:
+                delay += random.uniform(0, self.jitter / bucket.rate)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def success(self, url):
+        with self._lock:
+            self._bucket(url).success()
+
+    def failure(self, url, reason=""):
+        with self._lock:
+            bucket = self._bucket(url)
+            bucket.failure()
+        print(f"🐢 Backing off {urlparse(url).netloc} ({reason}): now {bucket.rate:.2f} req/s")
+
+    def report(self):
+        with self._lock:
+            for domain, bucket in self._buckets.items():
+                print(f"🚦 {domain}: {bucket.rate:.2f} req/s, {bucket.failures} back-offs")
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter(**kwargs):
+    """Process-wide limiter. kwargs only apply on first use (see configure_limiter)."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(**kwargs)
+        return _limiter
+
+
+def configure_limiter(scale=1.0):
+    limiter = get_limiter()
+    with limiter._lock:
+        limiter.scale = scale
+        limiter._buckets.clear()
+    return limiter
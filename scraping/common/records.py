@@ -0,0 +1,85 @@
+# scraping/common/records.py
+#
+# Reading the scrapers' product dicts in one way: every scraper names and formats
+# its fields a little differently ("title" vs "name", 12999 vs "₹12,999.00").
+
+import hashlib
+import json
+import re
+from urllib.parse import parse_qs, urlparse
+
+# The same field goes by different names in different scrapers
+TITLE_KEYS = ("title", "name")
+URL_KEYS = ("product_url", "url")
+IMAGE_KEYS = ("image_url", "image")
+PRICE_KEYS = ("price", "current_price")
+MRP_KEYS = ("mrp", "original_price")
+AVAILABILITY_KEYS = ("availability", "in_stock")
+# Query parameters that identify a product (everything else is tracking)
+ID_PARAMS = ("pid",)
+ASIN_RE = re.compile(r"/(?:dp|gp/product)/([A-Z0-9]{10})")
+NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+# Flipkart: "1,23,456 Ratings & 5,432 Reviews"
+REVIEWS_RE = re.compile(r"([\d,]+)\s*Reviews", re.I)
+
+
+def first_of(record, keys):
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, "", "N/A", "No URL", "No Image", "No Title"):
+            return value
+    return None
+
+
+def product_key(record):
+    """Stable identity of a product within a source: the Amazon ASIN, else the URL
+    path plus identifying query parameters, else the lower-cased title"""
+    url = first_of(record, URL_KEYS)
+    if url:
+        asin = ASIN_RE.search(url)
+        if asin:
+            return f"asin:{asin.group(1)}"
+        parsed = urlparse(url)
+        params = parse_qs(parsed.query)
+        ids = "&".join(f"{p}={params[p][0]}" for p in ID_PARAMS if p in params)
+        return parsed.path + (f"?{ids}" if ids else "")
+    title = first_of(record, TITLE_KEYS)
+    return f"title:{title.strip().lower()}" if title else None
+
+
+def to_number(value):
+    """12999, "12,999", "₹51,290.00" and "4.3 out of 5" -> float; None when there is no number"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = NUMBER_RE.search(value.replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def review_count(value):
+    """Number of reviews from a count or a "... Ratings & N Reviews" text"""
+    if isinstance(value, str):
+        match = REVIEWS_RE.search(value)
+        if match:
+            return float(match.group(1).replace(",", ""))
+    return to_number(value)
+
+
+def content(record):
+    """What change detection compares between runs: price, mrp, rating, review count
+    and availability, normalised so "₹12,999" and 12999 are the same price"""
+    availability = first_of(record, AVAILABILITY_KEYS)
+    if isinstance(availability, bool):
+        availability = "in stock" if availability else "out of stock"
+    return {
+        "price": to_number(first_of(record, PRICE_KEYS)),
+        "mrp": to_number(first_of(record, MRP_KEYS)),
+        "rating": to_number(record.get("rating")),
+        "reviews": review_count(record.get("reviews")),
+        "availability": str(availability).strip().lower() if availability is not None else None,
+    }
+
+
+def content_hash(record):
+    return hashlib.blake2b(json.dumps(content(record), sort_keys=True).encode(), digest_size=8).hexdigest()
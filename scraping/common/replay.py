@@ -0,0 +1,255 @@
+# scraping/common/replay.py
+#
+# Record/replay of everything the scrapers fetch, so a full run can be repeated
+# offline, deterministically and without politeness delays (CI, profiling).
+#
+#   record: every plain HTTP response (status, headers, body) and the final DOM of
+#           every page a pooled browser visited go into a gzip-compressed JSONL archive
+#   replay: a local HTTP server serves that archive and http_get / pooled browsers
+#           are pointed at it: https://host/path?q -> http://127.0.0.1:port/<channel>/https/host/path?q
+#
+# HTTP and browser responses are kept apart ("http" / "browser" channel): a page whose
+# raw HTML failed the ready check and was then rendered replays the same way.
+# Browser snapshots are served with their <script> tags removed so the captured DOM
+# is what the scraper sees, without page JS re-rendering it or calling out.
+#
+#   python run_scraper.py --site all --record data/archives/all.jsonl.gz
+#   python run_scraper.py --site all --replay data/archives/all.jsonl.gz
+#   python -m scraping.common.replay serve data/archives/all.jsonl.gz
+
+import argparse
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# Child processes (run_scraper --parallel) find a running replay server through this
+REPLAY_ENV = "SCRAPER_REPLAY_URL"
+# Limiter scale while replaying: the local server needs no politeness
+REPLAY_RATE_SCALE = 1000.0
+# Dropped from recorded headers: the body is stored decoded and re-sent whole
+SKIP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+SCRIPT_RE = re.compile(r"<script\b(?![^>]*application/(?:ld\+)?json)[^>]*>.*?</script>", re.I | re.S)
+
+
+class Archive:
+    """Append-only gzip JSONL of responses: {channel, url, status, headers, body, time}"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def record(self, channel, url, status, headers, body):
+        entry = {
+            "channel": channel,
+            "url": url,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in SKIP_HEADERS},
+            "body": body,
+            "time": time.time(),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = gzip.open(self.path, "at", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+
+    def entries(self):
+        """{(channel, url): entry}, the last response wins. A run that was killed
+        mid-write leaves a truncated gzip stream; everything before it is kept."""
+        entries = {}
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    entries[(entry["channel"], entry["url"])] = entry
+        except (EOFError, gzip.BadGzipFile):
+            pass
+        return entries
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ReplayServer:
+    """Serves an archive on 127.0.0.1 in a background thread"""
+
+    def __init__(self, path, port=0):
+        self.entries = Archive(path).entries()
+        for entry in self.entries.values():
+            if entry["channel"] == "browser":
+                entry["body"] = SCRIPT_RE.sub("", entry["body"])
+        self.misses = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.serve(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        print(f"📼 Replaying {len(self.entries)} responses on {self.url}")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self.misses:
+            print(f"📼 {len(self.misses)} requests were not in the archive, e.g. {self.misses[0]}")
+
+    def serve(self, request):
+        channel, _, rest = request.path.lstrip("/").partition("/")
+        scheme, _, rest = rest.partition("/")
+        url = f"{scheme}://{rest}"
+        other = "http" if channel == "browser" else "browser"
+        entry = (self.entries.get((channel, url)) or self.entries.get((other, url))
+                 or self.entries.get((channel, url.rstrip("/"))))
+        if entry is None:
+            self.misses.append(url)
+            request.send_error(404, "Not in archive")
+            return
+
+        body = entry["body"].encode("utf-8")
+        request.send_response(entry["status"])
+        for name, value in entry["headers"].items():
+            if name.lower() != "content-type":
+                request.send_header(name, value)
+        request.send_header("Content-Type", "text/html; charset=utf-8")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+
+_archive = None
+_server = None
+_replay_url = os.environ.get(REPLAY_ENV)
+
+
+def start_recording(path):
+    global _archive
+    _archive = Archive(path)
+    print(f"📼 Recording responses to {path}")
+    return _archive
+
+
+def start_replay(path, port=0):
+    global _server, _replay_url
+    _server = ReplayServer(path, port).start()
+    _replay_url = os.environ[REPLAY_ENV] = _server.url
+    return _server
+
+
+def stop():
+    global _archive, _server, _replay_url
+    if _archive is not None:
+        _archive.close()
+        _archive = None
+    if _server is not None:
+        _server.stop()
+        _server = None
+        _replay_url = None
+        os.environ.pop(REPLAY_ENV, None)
+
+
+def active():
+    return _archive is not None or _replay_url is not None
+
+
+def recording():
+    return _archive is not None
+
+
+def local_url(url, channel="http"):
+    """Where to fetch `url` from: the replay server while replaying, else `url` itself"""
+    if _replay_url is None:
+        return url
+    parsed = urlparse(url)
+    local = f"{_replay_url}/{channel}/{parsed.scheme}/{parsed.netloc}{parsed.path or '/'}"
+    return local + (f"?{parsed.query}" if parsed.query else "")
+
+
+def record_response(url, response):
+    """Archive a requests.Response for `url` (no-op unless recording)"""
+    if _archive is not None:
+        _archive.record("http", url, response.status_code, dict(response.headers), response.text)
+
+
+def record_page(url, html):
+    """Archive the DOM of a browser page (no-op unless recording)"""
+    if _archive is not None and url and html is not None:
+        _archive.record("browser", url, 200, {}, html)
+
+
+def snapshot(driver):
+    """Archive the current page of an instrumented driver before it moves on"""
+    url = getattr(driver, "_replay_page", None)
+    if _archive is None or not url:
+        return
+    driver._replay_page = None
+    try:
+        record_page(url, driver.page_source)
+    except Exception as e:
+        print(f"📼 Could not snapshot {url}: {str(e)[:80]}")
+
+
+def instrument(driver):
+    """Route driver.get through the archive: while recording the page is snapshotted
+    when the driver navigates away (or goes back to the pool), so the archive holds
+    the fully loaded DOM; while replaying the URL is rewritten to the local server."""
+    if not active() or getattr(driver, "_replay_get", None):
+        return driver
+    original_get = driver.get
+
+    def get(url):
+        snapshot(driver)
+        driver._replay_page = url
+        original_get(local_url(url, "browser"))
+
+    driver._replay_get = original_get
+    driver.get = get
+    return driver
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or serve a recorded archive")
+    parser.add_argument("command", choices=["list", "serve"])
+    parser.add_argument("archive")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for (channel, url), entry in sorted(Archive(args.archive).entries().items()):
+            print(f"{entry['status']} {channel:<8} {len(entry['body']):>9,} {url}")
+        return
+
+    server = ReplayServer(args.archive, args.port).start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
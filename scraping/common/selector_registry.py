@@ -0,0 +1,154 @@
+# scraping/common/selector_registry.py
+#
+# Every CSS selector the scrapers use for a product field, per site, in one place.
+# A field is a fallback chain: selectors are tried in order until one matches.
+# Chains keep hit counts and periodically move the selector that matches most
+# often to the front; a "fallback" (a catch-all such as a bare "img") always
+# stays last so reordering never changes which element a catch-all would pick.
+
+import json
+import os
+import threading
+
+from scraping.common.parsing import compiled
+
+SELECTORS = {
+    "flipkart_mobiles": {
+        "title": ["div.KzDlHZ", "div._4rR01T", "a.s1Q9rs", "a.IRpwTa"],
+        "price": ["div._30jeq3", "div._30jeq3._1_WHN1", "div.Nx9bqj"],
+        "rating": {"try": ["div.XQDdHH", "div._3LWZlK"], "fallback": "div[class*='rating' i]"},
+        "reviews": ["span.Wphh3N", "span._2_R_DZ"],
+        # "+" in a class name has to be escaped, or it reads as a sibling combinator
+        "specs": ["li.J\\+igdf, li.rgWa7D, li._3YhLQA"],
+        "delivery": ["div.yiggsN", "div._3tcB5a"],
+        "link": ["a.CGtC98", "a._1fQZEK", "a.IRpwTa"],
+        "image": {"try": ["img.DByuf4", "img._396cs4"], "fallback": "img"},
+    },
+    "flipkart_laptops": {
+        "link": ["a.CGtC98"],
+        "image": ["img"],
+        "price": ["div.Nx9bqj._4b5DiR"],
+        "rating": ["div.XQDdHH"],
+        "specs": ["li.J\\+igdf", "ul.gUuXy- li"],
+    },
+    # Shared by amazon_scraper (mobiles) and amazon_laptop
+    "amazon": {
+        "name": ["h2 span"],
+        "price": ["span.a-price-whole"],
+        # Text of the icon's screen-reader label: "4.0 out of 5 stars"
+        "rating": ["i.a-icon-star-small span.a-icon-alt"],
+        "reviews": ["span.a-size-base.s-underline-text"],
+        "url": ["a.a-link-normal.s-no-outline"],
+        "image_url": ["img.s-image"],
+    },
+}
+
+
+class SelectorChain:
+    """Ordered fallback selectors for one field of one site, with hit statistics"""
+
+    def __init__(self, site, field, selectors, fallback=None, reorder_every=50):
+        self.site = site
+        self.field = field
+        self.fallback = fallback
+        self.reorder_every = reorder_every
+        self._order = list(selectors)
+        self.hits = dict.fromkeys(self.selectors, 0)
+        self.misses = 0
+        self.lookups = 0
+        self._lock = threading.Lock()
+        for css in self.selectors:
+            compiled(css)  # fail fast on a bad selector, and warm the cache
+
+    @property
+    def selectors(self):
+        return self._order + ([self.fallback] if self.fallback else [])
+
+    def record(self, css):
+        """Count a lookup that matched `css` (None for a miss)"""
+        with self._lock:
+            self.lookups += 1
+            if css is None:
+                self.misses += 1
+            else:
+                self.hits[css] += 1
+            if self.lookups % self.reorder_every == 0:
+                # Stable sort: ties keep the registry order
+                self._order = sorted(self._order, key=lambda s: -self.hits[s])
+
+    def find(self, backend, node):
+        """First match of the first selector in the chain that matches, or None"""
+        for css in self.selectors:
+            found = backend.first(node, css)
+            if found is not None:
+                self.record(css)
+                return found
+        self.record(None)
+        return None
+
+    def find_all(self, backend, node):
+        """All matches of the first selector in the chain that matches anything"""
+        for css in self.selectors:
+            found = backend.all(node, css)
+            if found:
+                self.record(css)
+                return found
+        self.record(None)
+        return []
+
+    def stats(self):
+        return {
+            "order": self.selectors,
+            "lookups": self.lookups,
+            "hits": dict(self.hits),
+            "misses": self.misses,
+        }
+
+
+def _build(selectors):
+    registry = {}
+    for site, fields in selectors.items():
+        registry[site] = {}
+        for field, spec in fields.items():
+            if isinstance(spec, dict):
+                chain = SelectorChain(site, field, spec["try"], fallback=spec.get("fallback"))
+            else:
+                chain = SelectorChain(site, field, spec)
+            registry[site][field] = chain
+    return registry
+
+
+# Compiled once at import
+REGISTRY = _build(SELECTORS)
+# Registry order of each chain, to report chains that reordered themselves
+SELECTORS_FIRST = {site: {field: chain.selectors[0] for field, chain in fields.items()}
+                   for site, fields in REGISTRY.items()}
+
+
+def get_site(site):
+    """{field: SelectorChain} for one site"""
+    return REGISTRY[site]
+
+
+def selector_stats():
+    return {site: {field: chain.stats() for field, chain in fields.items()}
+            for site, fields in REGISTRY.items()}
+
+
+def report_selectors(path=os.path.join("data", "selector_stats.json")):
+    """Print fields that missed or whose order changed, and dump all counters to `path`"""
+    stats = selector_stats()
+    for site, fields in stats.items():
+        for field, s in fields.items():
+            if not s["lookups"]:
+                continue
+            leader = max(s["hits"], key=s["hits"].get)
+            if s["misses"] or s["order"][0] != SELECTORS_FIRST[site][field]:
+                print(f"🎯 [{site}.{field}] {s['lookups']} lookups, {s['misses']} misses, "
+                      f"best {leader} ({s['hits'][leader]} hits)")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+    return stats
+
@@ -0,0 +1,81 @@
+# scraping/common/sink.py
+#
+# Streaming output: every page's products are appended to a newline-delimited JSON
+# file (data/<name>.stream.jsonl) as soon as the page is parsed, flushed and fsynced per
+# batch, so nothing has to be kept in memory until the end of a run and a crash
+# leaves every finished page on disk. CSV / JSON exports are made afterwards by
+# reading the stream back one record at a time (scraping/common/output.py).
+
+import json
+import os
+
+
+def stream_path(filename):
+    """data/flipkart_mobiles.csv -> data/flipkart_mobiles.stream.jsonl (apart from
+    the .jsonl output file written from it)"""
+    return os.path.splitext(filename)[0] + ".stream.jsonl"
+
+
+class JsonlSink:
+    """Append-only JSONL file of product records: open() / write_batch() / close()"""
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append
+        self.count = 0
+        self._file = None
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a" if self.append else "w", encoding="utf-8")
+        return self
+
+    def keep(self, count):
+        """Cut the (closed) file after its first `count` complete records, dropping a
+        torn or unacknowledged tail, and append from there on. Returns the records
+        kept, fewer than `count` if the file is shorter."""
+        kept, end = 0, 0
+        if os.path.exists(self.path):
+            with open(self.path, "r+b") as f:
+                for line in f:
+                    if kept == count or not line.endswith(b"\n"):
+                        break
+                    kept += 1
+                    end += len(line)
+                f.truncate(end)
+        self.append = True
+        self.count = kept
+        return kept
+
+    def write_batch(self, records):
+        """Append `records` (one page) and make them durable before returning"""
+        if self._file is None:
+            self.open()
+        lines = [json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records]
+        self._file.writelines(lines)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.count += len(lines)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_jsonl(path):
+    """Records of a JSONL stream, one at a time. Stops at a torn last line."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️ {path}: stopping at a truncated record")
+                return
+
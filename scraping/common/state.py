@@ -0,0 +1,154 @@
+# scraping/common/state.py
+#
+# Product data from the JSON state that server-rendered listing pages embed for
+# hydration (window.__INITIAL_STATE__ = {...}, <script id="__NEXT_DATA__">, ...).
+# The blob is found with a plain string search and decoded in place with
+# JSONDecoder.raw_decode, which stops at the end of the JSON value: no DOM tree,
+# no regex over a multi-MB script body, and whatever JS follows is never read.
+#
+# Browser snapshots (driver.page_source) usually lack the blob because the page
+# deletes it after hydrating, so this mostly pays off on the plain HTTP path.
+
+import json
+
+STATE_MARKERS = (
+    "window.__INITIAL_STATE__",
+    "window.__PRELOADED_STATE__",
+    "window.__INITIAL_DATA__",
+    'id="__NEXT_DATA__"',
+)
+# How far past a marker the value may start (covers `= `, `type="application/json">`)
+MAX_GAP = 200
+
+_decoder = json.JSONDecoder()
+
+
+def _decode_after(html, pos):
+    """Decode the JSON value (or JSON.parse("...") string) starting shortly after `pos`"""
+    end = min(len(html), pos + MAX_GAP)
+    i = pos
+    while i < end:
+        try:
+            if html.startswith("JSON.parse(", i):
+                raw, _ = _decoder.raw_decode(html, i + len("JSON.parse("))
+                return json.loads(raw)
+            if html[i] in "{[":
+                return _decoder.raw_decode(html, i)[0]
+        except (ValueError, TypeError):
+            return None
+        i += 1
+    return None
+
+
+def find_state(html, markers=STATE_MARKERS):
+    """The first state blob after any of `markers` that decodes, or None"""
+    for marker in markers:
+        start = html.find(marker)
+        while start != -1:
+            state = _decode_after(html, start + len(marker))
+            if isinstance(state, (dict, list)):
+                return state
+            start = html.find(marker, start + 1)
+    return None
+
+
+def dig(node, *path, default=None):
+    """node[path[0]][path[1]]... with `default` for any missing key or index"""
+    for key in path:
+        try:
+            node = node[key]
+        except (KeyError, IndexError, TypeError):
+            return default
+    return default if node is None else node
+
+
+def walk(state, match):
+    """Every dict in `state` for which match(d) is true, in document order.
+    Matched dicts are not searched any further."""
+    stack = [state]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if match(node):
+                yield node
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+# Per-site state layouts: how to recognise a product entry and how to read it into
+# one neutral record (title, price, mrp, rating, ratings, reviews, specs, url,
+# image_url, in_stock). Each scraper maps that record to its own product shape.
+
+def _flipkart_product(info):
+    image = dig(info, "media", "images", 0, "url")
+    if image:
+        image = image.replace("{@width}", "416").replace("{@height}", "416").replace("{@quality}", "70")
+    url = info.get("baseUrl")
+    return {
+        "title": dig(info, "titles", "title"),
+        "price": dig(info, "pricing", "finalPrice", "value"),
+        "mrp": dig(info, "pricing", "mrp", "value"),
+        "rating": dig(info, "rating", "average"),
+        "ratings": dig(info, "rating", "count"),
+        "reviews": dig(info, "rating", "reviewCount"),
+        "specs": info.get("keySpecs") or [],
+        "url": "https://www.flipkart.com" + url if url else info.get("smartUrl"),
+        "image_url": image,
+        "in_stock": dig(info, "availability", "displayState", default="IN_STOCK") == "IN_STOCK",
+    }
+
+
+def _fynd_product(item):
+    images = [m.get("url") for m in item.get("medias") or [] if m.get("type", "image") == "image"]
+    return {
+        "title": item.get("name"),
+        "price": dig(item, "price", "effective", "min"),
+        "mrp": dig(item, "price", "marked", "min"),
+        "rating": item.get("rating"),
+        "ratings": item.get("rating_count"),
+        "reviews": item.get("review_count"),
+        "specs": [],
+        "url": "https://www.reliancedigital.in/product/" + item["slug"],
+        "image_url": images[0] if images else None,
+        "in_stock": item.get("sellable", True),
+    }
+
+
+STATE_SCHEMAS = {
+    # pageDataV4 -> widget.data.products[].productInfo.value
+    "flipkart": (lambda d: "titles" in d and "pricing" in d, _flipkart_product),
+    # Fynd storefront (Reliance Digital) listing items
+    "fynd": (lambda d: "slug" in d and "price" in d and "medias" in d, _fynd_product),
+}
+
+
+def state_products(html, schema):
+    """Neutral product records from the page's state blob using STATE_SCHEMAS[schema].
+    Records without a title or price, and repeats of a product shown in several
+    widgets, are dropped. Empty if the page has no blob."""
+    state = find_state(html)
+    if state is None:
+        return []
+    match, read = STATE_SCHEMAS[schema]
+    products, seen = [], set()
+    for entry in walk(state, match):
+        try:
+            record = read(entry)
+        except (KeyError, TypeError, AttributeError):
+            continue
+        if not record["title"] or record["price"] is None or record["url"] in seen:
+            continue
+        seen.add(record["url"])
+        products.append(record)
+    return products
+
+
+def products_ready(schema, *card_markers):
+    """Build a "page is usable" check for fetch_html: True if any card marker appears
+    in the raw HTML or the page's state blob holds products of `schema`. A state
+    marker alone is not enough: error and consent pages embed empty blobs too."""
+    def check(html):
+        return any(marker in html for marker in card_markers) or bool(state_products(html, schema))
+    return check
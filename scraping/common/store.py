@@ -0,0 +1,268 @@
+# scraping/common/store.py
+#
+# SQLite product store shared by every scraper and the API. Each save is one run:
+# products hold the latest version of every product per source, observations keep
+# every price/rating seen. WAL mode lets the API read while a scraper writes.
+#
+# A run only writes the products whose content hash changed and refreshes last_seen
+# of the rest; products a complete run did not see are marked disappeared
+# (scraping/common/delta.py).
+#
+# Scrapers keep their own product dict shapes; the full record is stored as JSON and
+# the common columns (title, url, price, rating, ...) are normalised from it.
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from itertools import islice
+
+from scraping.common.delta import Delta, publish
+from scraping.common.history import append_history
+from scraping.common.mongo import get_mongo
+from scraping.common.records import (IMAGE_KEYS, PRICE_KEYS, TITLE_KEYS, URL_KEYS, content_hash, first_of, product_key,
+                                     to_number)
+
+DB_PATH = os.environ.get("SCRAPER_DB", os.path.join("data", "products.db"))
+BATCH_SIZE = 500
+# Records per store/history write in save_products (one history part each)
+SAVE_CHUNK = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    products INTEGER,
+    pages INTEGER
+);
+CREATE TABLE IF NOT EXISTS products (
+    source TEXT NOT NULL,
+    product_key TEXT NOT NULL,
+    title TEXT,
+    url TEXT,
+    image_url TEXT,
+    price REAL,
+    rating REAL,
+    data TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    last_run INTEGER,
+    content_hash TEXT,
+    disappeared_at TEXT,
+    PRIMARY KEY (source, product_key)
+);
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER REFERENCES runs(id),
+    source TEXT NOT NULL,
+    product_key TEXT NOT NULL,
+    observed_at TEXT NOT NULL,
+    price REAL,
+    rating REAL
+);
+CREATE INDEX IF NOT EXISTS idx_observations_product ON observations(source, product_key);
+CREATE INDEX IF NOT EXISTS idx_observations_time ON observations(observed_at);
+"""
+
+UPSERT_PRODUCT = """
+INSERT INTO products (source, product_key, title, url, image_url, price, rating, data, first_seen, last_seen, last_run,
+                      content_hash)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, product_key) DO UPDATE SET
+    title = excluded.title, url = excluded.url, image_url = excluded.image_url,
+    price = excluded.price, rating = excluded.rating, data = excluded.data,
+    last_seen = excluded.last_seen, last_run = excluded.last_run,
+    content_hash = excluded.content_hash, disappeared_at = NULL
+"""
+
+MARK_DISAPPEARED = """
+UPDATE products SET disappeared_at = ?, last_run = ? WHERE source = ? AND product_key = ?
+"""
+
+MARK_SEEN = """
+UPDATE products SET last_seen = ?, last_run = ? WHERE source = ? AND product_key = ?
+"""
+
+# Columns added after the first release; older databases get them on open
+MIGRATIONS = {"products": [("content_hash", "TEXT"), ("disappeared_at", "TEXT")], "runs": [("pages", "INTEGER")]}
+
+INSERT_OBSERVATION = """
+INSERT INTO observations (run_id, source, product_key, observed_at, price, rating)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+class ProductStore:
+    """One SQLite connection shared by the threads of a process"""
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()
+
+    def _migrate(self):
+        for table, columns in MIGRATIONS.items():
+            existing = {row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            for name, kind in columns:
+                if name not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {kind}")
+        self._conn.commit()
+
+    def start_run(self, source):
+        with self._lock, self._conn:
+            cursor = self._conn.execute("INSERT INTO runs (source, started_at) VALUES (?, ?)",
+                                        (source, datetime.now().isoformat()))
+            return cursor.lastrowid
+
+    def finish_run(self, run_id, count, pages=None):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE runs SET finished_at = ?, products = ?, pages = ? WHERE id = ?",
+                               (datetime.now().isoformat(), count, pages, run_id))
+
+    def save(self, source, records, run_id=None):
+        """Upsert `records` (scraper product dicts) into products and add one observation
+        each, BATCH_SIZE rows per executemany. Records without a key are skipped.
+        Returns the number of records stored. save_products() passes only the records
+        whose content changed."""
+        now = datetime.now().isoformat()
+        products, observations = [], []
+        for record in records:
+            key = product_key(record)
+            if key is None:
+                continue
+            price, rating = to_number(first_of(record, PRICE_KEYS)), to_number(record.get("rating"))
+            products.append((source, key, first_of(record, TITLE_KEYS), first_of(record, URL_KEYS),
+                             first_of(record, IMAGE_KEYS), price, rating,
+                             json.dumps(record, ensure_ascii=False, default=str), now, now, run_id,
+                             content_hash(record)))
+            observations.append((run_id, source, key, now, price, rating))
+
+        with self._lock, self._conn:
+            for start in range(0, len(products), BATCH_SIZE):
+                self._conn.executemany(UPSERT_PRODUCT, products[start:start + BATCH_SIZE])
+                self._conn.executemany(INSERT_OBSERVATION, observations[start:start + BATCH_SIZE])
+        return len(products)
+
+    def products(self, source=None):
+        """Latest record of every product that has not disappeared (as the scraper
+        produced it), oldest first"""
+        query, args = "SELECT data FROM products WHERE disappeared_at IS NULL", []
+        if source:
+            query += " AND source = ?"
+            args.append(source)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY first_seen, rowid", args).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def content_index(self, source):
+        """{product_key: (content_hash, price)} of the live products of `source`"""
+        with self._lock:
+            rows = self._conn.execute("SELECT product_key, content_hash, price FROM products "
+                                      "WHERE source = ? AND disappeared_at IS NULL", (source,)).fetchall()
+        return {row["product_key"]: (row["content_hash"], row["price"]) for row in rows}
+
+    def mark_seen(self, source, keys, run_id=None):
+        """Refresh last_seen of products a run found unchanged, BATCH_SIZE per executemany"""
+        now = datetime.now().isoformat()
+        rows = [(now, run_id, source, key) for key in keys]
+        with self._lock, self._conn:
+            for start in range(0, len(rows), BATCH_SIZE):
+                self._conn.executemany(MARK_SEEN, rows[start:start + BATCH_SIZE])
+
+    def mark_disappeared(self, source, keys, run_id=None):
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany(MARK_DISAPPEARED, [(now, run_id, source, key) for key in keys])
+
+    def latest_run(self, source):
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM runs WHERE source = ? AND finished_at IS NOT NULL "
+                                     "ORDER BY id DESC LIMIT 1", (source,)).fetchone()
+        return row["id"] if row else None
+
+    def latest_pages(self, source):
+        """Pages covered by the latest finished run of `source` that reported them"""
+        with self._lock:
+            row = self._conn.execute("SELECT pages FROM runs WHERE source = ? AND finished_at IS NOT NULL "
+                                     "AND pages IS NOT NULL ORDER BY id DESC LIMIT 1", (source,)).fetchone()
+        return row["pages"] if row else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store(path=None):
+    """Process-wide store. `path` only applies on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProductStore(path or DB_PATH)
+        return _store
+
+
+def close_store():
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+
+
+def save_products(source, records, pages=None):
+    """Store one scraper run of `source` (any iterable of records): only products that
+    are new or whose content changed are written (and appended to the price history),
+    the rest only get last_seen refreshed, and the delta is published. With MongoDB
+    output configured every record is also upserted there (scraping/common/mongo.py).
+
+    Products the run no longer lists are marked disappeared only if the run looks
+    complete: it found products and covered at least as many listing `pages` as the
+    previous run that reported them. Returns the run id."""
+    store = get_store()
+    mongo = get_mongo()
+    previous_pages = store.latest_pages(source)
+    run_id = store.start_run(source)
+    delta = Delta(source, run_id, store.content_index(source))
+    observed_at = datetime.now()
+    # Chunked so a streamed run (read_jsonl) is never held in memory whole
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, SAVE_CHUNK))
+        if not chunk:
+            break
+        if mongo is not None:
+            # Blocks while MongoDB is behind
+            mongo.write(source, chunk, run_id)
+        changed = delta.add(chunk)
+        store.save(source, changed, run_id)
+        append_history(source, changed, observed_at)
+    store.mark_seen(source, delta.unchanged, run_id)
+    if not delta.seen:
+        print(f"⚠️ [{source}] The run found no products, not marking any as disappeared")
+    elif pages is not None and previous_pages is not None and pages < previous_pages:
+        print(f"⚠️ [{source}] The run covered {pages} pages (previous run: {previous_pages}), "
+              f"not marking any products as disappeared")
+    else:
+        store.mark_disappeared(source, delta.finish(), run_id)
+    store.finish_run(run_id, len(delta.seen), pages)
+    print(f"🗄️ [{source}] {len(delta.seen)} products in {store.path} (run {run_id}): {delta.summary()}")
+    publish(delta)
+    return run_id
+
+
+def source_name(filename):
+    """data/flipkart_mobiles.csv -> flipkart_mobiles"""
+    return os.path.splitext(os.path.basename(filename))[0]
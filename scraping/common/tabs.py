@@ -0,0 +1,199 @@
+# scraping/common/tabs.py
+#
+# Page-level parallelism inside one browser: K tabs load different pages at the
+# same time and whichever finishes first is harvested, so K pages in flight cost
+# one Chrome process instead of K.
+
+import time
+
+from scraping.common.driver_setup import block_resources, lease_driver, set_user_agent
+from scraping.common.rate_limit import get_limiter
+from scraping.common.replay import local_url, record_page, recording
+
+NAVIGATE_JS = "window.location.href = arguments[0];"
+
+CSS_READY_JS = """
+return document.readyState === 'complete'
+    && document.querySelectorAll(arguments[0]).length >= arguments[1];
+"""
+
+
+def css_ready(css, min_count=1):
+    """Build a tab readiness check: document loaded and at least `min_count` elements match `css`"""
+    def check(driver):
+        return driver.execute_script(CSS_READY_JS, css, min_count)
+    return check
+
+
+def page_source(driver, key):
+    return driver.page_source
+
+
+class TabPool:
+    """K tabs of one driver that load URLs concurrently.
+
+    Navigation is started from JavaScript so it returns immediately; busy tabs are
+    then polled round-robin with `ready(driver)` and the first ready one is
+    harvested with `harvest(driver, key)` and handed the next URL. Chromedriver
+    still waits for a tab's own navigation before running commands in it, so a
+    poll may block on a slow tab, but the other tabs keep loading meanwhile.
+    """
+
+    def __init__(self, driver, tabs=4, timeout=30, poll=0.2, limiter=None):
+        self.driver = driver
+        self.size = tabs
+        self.timeout = timeout
+        self.poll = poll
+        self.limiter = limiter or get_limiter()
+        self._home = None
+        self._handles = []
+        self._prepared = set()
+        self._stopped = False
+
+    def open(self):
+        self._home = self.driver.current_window_handle
+        self._handles = [self._home]
+        self._prepared = {self._home}
+        for _ in range(self.size - 1):
+            self.driver.switch_to.new_window("tab")
+            self._handles.append(self.driver.current_window_handle)
+        print(f"🗂️ Opened {len(self._handles)} tabs")
+        return self
+
+    def close(self):
+        for handle in self._handles:
+            if handle == self._home:
+                continue
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except Exception:
+                pass
+        if self._home:
+            self.driver.switch_to.window(self._home)
+        self._handles = []
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stop(self):
+        """Stop handing out URLs; tabs that are already loading are still harvested"""
+        self._stopped = True
+
+    def _prepare(self, url):
+        """CDP overrides are per tab: carry the pool's UA and blocking profile over"""
+        user_agent = getattr(self.driver, "_user_agent", None)
+        if user_agent:
+            set_user_agent(self.driver, user_agent)
+        if getattr(self.driver, "_lean", False):
+            block_resources(self.driver, url, force=True)
+
+    def _dispatch(self, handle, key, url):
+        self.limiter.wait(url)
+        self.driver.switch_to.window(handle)
+        if handle not in self._prepared:
+            self._prepare(url)
+            self._prepared.add(handle)
+        self.driver.execute_script(NAVIGATE_JS, local_url(url, "browser"))
+        return key, url, time.perf_counter()
+
+    def load(self, jobs, ready, harvest=page_source, latency=None):
+        """Yield (key, result) for every (key, url) of `jobs`, in completion order.
+        A tab that is not ready within `timeout` seconds (or fails to harvest)
+        yields (key, None). With `latency` the dispatch-to-ready time is recorded."""
+        jobs = iter(jobs)
+        self._stopped = False
+        free = list(reversed(self._handles))
+        busy = {}
+
+        while True:
+            while free and not self._stopped:
+                job = next(jobs, None)
+                if job is None:
+                    break
+                handle = free.pop()
+                busy[handle] = self._dispatch(handle, *job)
+            if not busy:
+                return
+
+            for handle, (key, url, started) in list(busy.items()):
+                self.driver.switch_to.window(handle)
+                try:
+                    done = ready(self.driver)
+                except Exception:
+                    done = False
+
+                if done:
+                    if latency:
+                        latency.record(key, time.perf_counter() - started)
+                    try:
+                        result = harvest(self.driver, key)
+                        if recording():
+                            record_page(url, self.driver.page_source)
+                        self.limiter.success(url)
+                    except Exception as e:
+                        print(f"❌ Harvesting {url} failed: {str(e)[:80]}")
+                        result = None
+                elif time.perf_counter() - started > self.timeout:
+                    print(f"⏱️ Tab timed out on {url}")
+                    self.limiter.failure(url, "tab timeout")
+                    result = None
+                else:
+                    continue
+
+                del busy[handle]
+                free.append(handle)
+                yield key, result
+                break  # refill the freed tab before polling the others again
+            else:
+                time.sleep(self.poll)
+
+
+def scrape_pages_in_tabs(urls, ready, parse, harvest=page_source, driver=None, tabs=4,
+                         timeout=30, latency=None, checkpoint=None):
+    """Load {page: url} in `tabs` tabs of one browser (the given driver or a pooled one)
+    and run `parse(html, page)` on each page as it arrives.
+
+    Like the sequential scrapers, no new pages are started once a page comes back
+    without products, and that page is reported to the limiter as a failure. Pages already in `checkpoint` are skipped and every parsed
+    page is recorded to it. Returns all products in page order, or [] when the
+    checkpoint streams them to its sink.
+    """
+    results = {}
+    last_page = float("inf")
+    streamed = checkpoint is not None and checkpoint.sink is not None
+    if checkpoint:
+        if not streamed:
+            results = dict(checkpoint.pages)
+        last_page = checkpoint.stop_page or last_page
+        pending = checkpoint.pending(urls)
+        urls = {page: url for page, url in urls.items() if page in pending}
+    if not urls:
+        return [p for page in sorted(results) if page <= last_page for p in results[page]]
+
+    first_url = next(iter(urls.values()))
+    with lease_driver(driver, url=first_url) as tab_driver, TabPool(tab_driver, tabs, timeout) as pool:
+        for page, html in pool.load(urls.items(), ready, harvest, latency=latency):
+            if html is None:
+                continue
+            try:
+                products = parse(html, page)
+            except Exception as e:
+                print(f"Error parsing page {page}: {str(e)[:100]}")
+                continue
+            if not streamed:
+                results[page] = products
+            if checkpoint:
+                checkpoint.record(page, products)
+            print(f"Page {page} complete - Valid products: {len(products)}")
+
+            if not products:
+                print(f"No valid products found on page {page}. Not starting later pages.")
+                pool.limiter.failure(urls[page], "empty page")
+                last_page = min(last_page, page)
+                pool.stop()
+
+    return [p for page in sorted(results) if page <= last_page for p in results[page]]
@@ -0,0 +1,222 @@
+# scraping/common/waits.py
+#
+# Waits that return as soon as the page content is ready instead of sleeping a
+# fixed amount. Politeness between requests is handled by common/rate_limit.py.
+
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Counts fetch/XHR requests that are still running. Installed through CDP so it is
+# in place before any page script runs.
+NETWORK_TRACKER_JS = """
+(() => {
+    if (window.__scraperInflight !== undefined) return;
+    window.__scraperInflight = 0;
+    const done = () => { window.__scraperInflight = Math.max(0, window.__scraperInflight - 1); };
+    const origFetch = window.fetch;
+    if (origFetch) {
+        window.fetch = function () {
+            window.__scraperInflight++;
+            return origFetch.apply(this, arguments).finally(done);
+        };
+    }
+    const origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__scraperInflight++;
+        this.addEventListener('loadend', done);
+        return origSend.apply(this, arguments);
+    };
+})();
+"""
+
+NETWORK_STATE_JS = """
+return [window.__scraperInflight || 0, performance.getEntriesByType('resource').length];
+"""
+
+# True once every <img> inside the matched cards carries a real URL (not a
+# lazy-load placeholder), which is all the scrapers need from images.
+IMAGES_SETTLED_JS = """
+const imgs = document.querySelectorAll(arguments[0]);
+for (const img of imgs) {
+    const src = img.getAttribute('src') || img.getAttribute('data-src') || '';
+    if (!src || src.startsWith('data:')) return false;
+}
+return true;
+"""
+
+
+def install_network_tracker(driver):
+    """Register the in-flight request counter for every document this driver loads"""
+    if getattr(driver, "_network_tracker", False):
+        return True
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_TRACKER_JS})
+        driver._network_tracker = True
+    except Exception as e:
+        print(f"⚠️ Network tracker unavailable: {str(e)[:80]}")
+        driver._network_tracker = False
+    return driver._network_tracker
+
+
+def wait_for_stable_count(driver, css, timeout=15, stable_for=0.5, poll=0.1, min_count=1):
+    """Wait until at least `min_count` elements match `css` and the count has not
+    changed for `stable_for` seconds. Returns the final count."""
+    state = {"count": -1, "since": time.monotonic()}
+
+    def stable(d):
+        count = d.execute_script("return document.querySelectorAll(arguments[0]).length", css)
+        now = time.monotonic()
+        if count != state["count"]:
+            state["count"], state["since"] = count, now
+            return False
+        return count >= min_count and now - state["since"] >= stable_for
+
+    WebDriverWait(driver, timeout, poll_frequency=poll).until(stable)
+    return state["count"]
+
+
+def wait_for_network_idle(driver, idle_for=0.5, timeout=10, poll=0.1):
+    """Wait until no fetch/XHR is running and no new resources started for `idle_for`
+    seconds. Needs install_network_tracker() before navigation for the XHR part;
+    without it only the resource-timing count is watched. Returns False on timeout."""
+    state = {"last": None, "since": time.monotonic()}
+
+    def idle(d):
+        inflight, resources = d.execute_script(NETWORK_STATE_JS)
+        now = time.monotonic()
+        if inflight or resources != state["last"]:
+            state["last"], state["since"] = resources, now
+            return False
+        return now - state["since"] >= idle_for
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll).until(idle)
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_images_settled(driver, css="img", timeout=5, poll=0.1):
+    """Wait until lazy images matched by `css` have swapped placeholders for real URLs.
+    Returns False on timeout (the listing is still usable, images may be missing)."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll).until(
+            lambda d: d.execute_script(IMAGES_SETTLED_JS, css)
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+# Scrolls the whole page top to bottom in viewport steps so every lazy card
+# renders once; async so the sweep runs in the browser without per-step RPCs.
+SCROLL_SWEEP_JS = """
+const [delay, done] = [arguments[0], arguments[arguments.length - 1]];
+const step = Math.max(400, window.innerHeight);
+let y = 0;
+const timer = setInterval(() => {
+    window.scrollTo(0, y);
+    y += step;
+    if (y >= document.body.scrollHeight) {
+        clearInterval(timer);
+        window.scrollTo(0, document.body.scrollHeight);
+        done(document.body.scrollHeight);
+    }
+}, delay);
+"""
+
+FIELDS_FILLED_JS = """
+const [cardCss, fieldCss] = arguments;
+const cards = document.querySelectorAll(cardCss);
+let missing = 0;
+for (const card of cards) {
+    const el = card.querySelector(fieldCss);
+    if (!el || !el.textContent.trim()) missing++;
+}
+return missing;
+"""
+
+
+def scroll_sweep(driver, step_delay=0.1, timeout=60):
+    """Scroll through the whole page once, pausing `step_delay` seconds per viewport"""
+    driver.set_script_timeout(timeout)
+    return driver.execute_async_script(SCROLL_SWEEP_JS, int(step_delay * 1000))
+
+
+def wait_for_fields_filled(driver, card_css, field_css, timeout=10, poll=0.2):
+    """Wait until every card matching `card_css` has non-empty text in `field_css`
+    (e.g. lazily rendered prices). Returns False on timeout, some cards may be blank."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll).until(
+            lambda d: d.execute_script(FIELDS_FILLED_JS, card_css, field_css) == 0
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+# Resolves with the number of cards added since `since` once no card has been added
+# for `quietMs` and no fetch/XHR is in flight (when the network tracker is installed).
+# The observer is attached before the scroll/click that triggers loading, and the
+# count is taken against `since`, so cards that landed before the call still count.
+# Quiet time only counts once loading has started (a new card, a taller page or a
+# request in flight), so a lazy load that kicks in late is not taken for the end of
+# the list; if nothing starts within `graceMs` the list is complete and it resolves 0.
+NEW_CARDS_JS = """
+const [cardCss, since, scroll, button, quietMs, graceMs, timeoutMs, done] = arguments;
+const count = () => document.querySelectorAll(cardCss).length;
+const start = since === null ? count() : since;
+const height = document.body.scrollHeight;
+let started = count() > start;
+let arrived = false;
+const observer = new MutationObserver(mutations => {
+    for (const m of mutations) {
+        for (const n of m.addedNodes) {
+            if (n.nodeType === 1 && (n.matches(cardCss) || n.querySelector(cardCss))) {
+                arrived = started = true;
+                return;
+            }
+        }
+    }
+});
+observer.observe(document.body, {childList: true, subtree: true});
+const finish = () => {
+    observer.disconnect();
+    clearInterval(tick);
+    clearTimeout(grace);
+    clearTimeout(limit);
+    done(count() - start);
+};
+const tick = setInterval(() => {
+    const busy = (window.__scraperInflight || 0) > 0;
+    started = started || busy || document.body.scrollHeight !== height;
+    if (!started || arrived || busy) {
+        arrived = false;
+        return;
+    }
+    finish();
+}, quietMs);
+const grace = setTimeout(() => {
+    if (!started && !(window.__scraperInflight > 0) && document.body.scrollHeight === height) finish();
+}, graceMs);
+const limit = setTimeout(finish, timeoutMs);
+if (scroll) window.scrollTo(0, document.body.scrollHeight);
+if (button) button.click();
+"""
+
+
+def wait_for_new_cards(driver, card_css, since=None, scroll=False, click=None, quiet=0.5, timeout=10,
+                       grace=None):
+    """Trigger the next batch of an infinite list (`scroll` to the bottom and/or `click`
+    a WebElement such as a "View More" button) and wait until cards stop arriving:
+    `quiet` seconds without a new `card_css` node (and no fetch/XHR running if
+    install_network_tracker() was called), counted from the first new card, page
+    growth or request. If none of those starts within `grace` seconds (default
+    2 × `quiet`) the list is taken as complete. Returns how many cards were added
+    since `since` (default: the count when called), 0 once the list is complete."""
+    grace = 2 * quiet if grace is None else grace
+    driver.set_script_timeout(timeout + 5)
+    return driver.execute_async_script(NEW_CARDS_JS, card_css, since, scroll, click,
+                                       int(quiet * 1000), int(grace * 1000), int(timeout * 1000))
@@ -533,147 +533,176 @@
 # df.to_csv(output_file, index=False)
 # print(f"Scraped {len(laptop_data)} laptop products.")
 # print(f"Data saved to {output_file}")
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import ElementClickInterceptedException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
-import time
 import pandas as pd
 import os
-import json
-# Set up Selenium WebDriver
-options = webdriver.ChromeOptions()
-options.add_argument("--headless")
-options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-
-# URL to scrape
-url = "https://www.croma.com/searchB?q=laptop%3Arelevance&text=laptop"
-driver.get(url)
-time.sleep(3)
-
-laptop_data = []
-seen_products = set()  # Store unique product URLs to avoid duplicates
-
-# Scraping loop
-while True:
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    products = soup.find_all("div", class_="cp-product typ-plp plp-srp-typ")
-
-    for product in products:
-        try:
-            title_elem = product.select_one("h3.product-title a")
-            title = title_elem.text.strip() if title_elem else "N/A"
-            product_url = title_elem["href"] if title_elem else "N/A"
-
-            # Use product URL as unique key
-            unique_key = product_url.strip()
-            if unique_key in seen_products:
-                continue
-            seen_products.add(unique_key)
-
-            image_elem = product.select_one("div.product-img img")
-            image_url = image_elem["data-src"] if image_elem else "N/A"
-            current_price_elem = product.select_one("span.amount.plp-srp-new-amount")
-            current_price = current_price_elem.text.strip() if current_price_elem else "N/A"
-            original_price_elem = product.select_one("span.amount#old-price")
-            original_price = original_price_elem.text.strip() if original_price_elem else "N/A"
-            discount_elem = product.select_one("span.discount.discount-newsearch-plp")
-            discount = discount_elem.text.strip() if discount_elem else "N/A"
-            rating_elem = product.select_one("span.rating-text")
-            rating = rating_elem.text.strip().split()[0] if rating_elem else "N/A"
-            reviews_elem = product.select_one("span.rating-text-icon span span")
-            reviews = reviews_elem.text.strip() if reviews_elem else "N/A"
-            offer_elem = product.select_one("span.tagsForPlp")
-            offer = offer_elem.text.strip() if offer_elem else "N/A"
-            delivery_elem = product.select_one("span.delivery-text-msg span")
-            delivery = delivery_elem.text.strip() if delivery_elem else "N/A"
-
-            entry = {
-                "title": title,
-                "product_url": product_url,
-                "image_url": image_url,
-                "current_price": current_price,
-                "original_price": original_price,
-                "discount": discount,
-                "rating": rating,
-                "reviews": reviews,
-                "offer": offer,
-                "delivery": delivery
-            }
-
-            laptop_data.append(entry)
-
-            if len(laptop_data) >= 1000:
+
+from scraping.common.driver_setup import get_pool, lease_driver, close_pool
+from scraping.common.output import write_outputs
+from scraping.common.rate_limit import get_limiter
+from scraping.common.store import save_products, source_name
+from scraping.common.waits import install_network_tracker, wait_for_new_cards
+
+SEARCH_URL = "https://www.croma.com/searchB?q=laptop%3Arelevance&text=laptop"
+CARD_CSS = "div.cp-product.typ-plp.plp-srp-typ"
+
+# outerHTML of the cards after the first `arguments[1]`, i.e. only those appended
+# since the last read; the page is never serialized as a whole
+NEW_CARDS_JS = """
+const cards = document.querySelectorAll(arguments[0]);
+const out = [];
+for (let i = arguments[1]; i < cards.length; i++) out.push(cards[i].outerHTML);
+return [cards.length, out];
+"""
+
+
+def read_new_cards(driver, watermark):
+    """Parse the cards appended after index `watermark`. Returns (new watermark, cards)."""
+    count, html = driver.execute_script(NEW_CARDS_JS, CARD_CSS, watermark)
+    if count < watermark:
+        # List was re-rendered from scratch; start over, seen_products drops duplicates
+        return read_new_cards(driver, 0)
+    soup = BeautifulSoup("".join(html), "html.parser")
+    return count, soup.find_all("div", class_="cp-product typ-plp plp-srp-typ")
+
+
+def parse_product(product):
+    title_elem = product.select_one("h3.product-title a")
+    title = title_elem.text.strip() if title_elem else "N/A"
+    product_url = title_elem["href"] if title_elem else "N/A"
+
+    image_elem = product.select_one("div.product-img img")
+    image_url = image_elem["data-src"] if image_elem else "N/A"
+    current_price_elem = product.select_one("span.amount.plp-srp-new-amount")
+    current_price = current_price_elem.text.strip() if current_price_elem else "N/A"
+    original_price_elem = product.select_one("span.amount#old-price")
+    original_price = original_price_elem.text.strip() if original_price_elem else "N/A"
+    discount_elem = product.select_one("span.discount.discount-newsearch-plp")
+    discount = discount_elem.text.strip() if discount_elem else "N/A"
+    rating_elem = product.select_one("span.rating-text")
+    rating = rating_elem.text.strip().split()[0] if rating_elem else "N/A"
+    reviews_elem = product.select_one("span.rating-text-icon span span")
+    reviews = reviews_elem.text.strip() if reviews_elem else "N/A"
+    offer_elem = product.select_one("span.tagsForPlp")
+    offer = offer_elem.text.strip() if offer_elem else "N/A"
+    delivery_elem = product.select_one("span.delivery-text-msg span")
+    delivery = delivery_elem.text.strip() if delivery_elem else "N/A"
+
+    return {
+        "title": title,
+        "product_url": product_url,
+        "image_url": image_url,
+        "current_price": current_price,
+        "original_price": original_price,
+        "discount": discount,
+        "rating": rating,
+        "reviews": reviews,
+        "offer": offer,
+        "delivery": delivery
+    }
+
+
+def scrape_croma_laptops(driver=None, max_products=1000, max_stalls=3):
+    """Click "View More" until `max_products` laptops are collected. After each click
+    only the newly appended cards are read, so a click costs the same at card 20 and 980."""
+    laptop_data = []
+    seen_products = set()  # Store unique product URLs to avoid duplicates
+    watermark = 0
+    stalls = 0
+
+    with lease_driver(driver, url=SEARCH_URL) as driver:
+        get_limiter().wait(SEARCH_URL)
+        install_network_tracker(driver)
+        driver.get(SEARCH_URL)
+        WebDriverWait(driver, 15).until(
+            lambda d: d.execute_script("return document.querySelectorAll(arguments[0]).length", CARD_CSS) > 0
+        )
+
+        while True:
+            watermark, products = read_new_cards(driver, watermark)
+            print(f"[Croma] {len(products)} new cards ({watermark} listed)")
+
+            for product in products:
+                try:
+                    entry = parse_product(product)
+
+                    # Use product URL as unique key
+                    unique_key = entry["product_url"].strip()
+                    if unique_key in seen_products:
+                        continue
+                    seen_products.add(unique_key)
+
+                    laptop_data.append(entry)
+
+                    if len(laptop_data) >= max_products:
+                        break
+
+                except Exception as e:
+                    print(f"Error processing product: {e}")
+                    continue
+
+            if len(laptop_data) >= max_products:
+                print(f"Reached {max_products} products.")
+                break
+
+            # Click "View More" and wait until its batch has finished arriving
+            try:
+                view_more_btn = driver.find_element(By.CLASS_NAME, "btn-viewmore")
+                if not view_more_btn.is_displayed():
+                    print("No more View More button visible.")
+                    break
+                added = wait_for_new_cards(driver, CARD_CSS, since=watermark, click=view_more_btn, quiet=0.3)
+            except (NoSuchElementException, ElementClickInterceptedException):
+                print("No more 'View More' button or error clicking it.")
                 break
 
-        except Exception as e:
-            print(f"Error processing product: {e}")
-            continue
+            if added:
+                stalls = 0
+            else:
+                stalls += 1
+                print(f"[Croma] View More loaded nothing ({stalls}/{max_stalls})")
+                if stalls >= max_stalls:
+                    break
+
+    return laptop_data
 
-    if len(laptop_data) >= 1000:
-        print("Reached 1000 products.")
-        break
 
-    # Try clicking "View More"
+def save_data(laptop_data, filename=None):
+    # Convert output path to absolute
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    output_dir = os.path.abspath(os.path.join(script_dir, "..", "data"))
+    os.makedirs(output_dir, exist_ok=True)
+
+    output_csv = filename or os.path.join(output_dir, "croma_laptops.csv")
+
+    save_products(source_name(output_csv), laptop_data)
+
+    # Written to a temp file and renamed, so a failed save keeps the previous files
+    # (no separate backup copy needed). BOM so Excel opens the CSV as UTF-8.
     try:
-        view_more_btn = driver.find_element(By.CLASS_NAME, "btn-viewmore")
-        if view_more_btn.is_displayed():
-            driver.execute_script("arguments[0].click();", view_more_btn)
-            time.sleep(3)
-        else:
-            print("No more View More button visible.")
-            break
-    except (NoSuchElementException, ElementClickInterceptedException):
-        print("No more 'View More' button or error clicking it.")
-        break
-
-# Close browser
-driver.quit()
-
-# Save data
-# output_dir = os.path.join(os.path.dirname(__file__), "..", "data")
-# os.makedirs(output_dir, exist_ok=True)
-# output_file = os.path.join(output_dir, "croma_laptops.csv")
+        paths = write_outputs(laptop_data, output_csv, csv_encoding="utf-8-sig")
+        for path in paths.values():
+            print(f"[✔] Saved to: {path}")
+    except Exception as e:
+        print(f"[✘] Save Failed: {e}")
 
-# df = pd.DataFrame(laptop_data)
-# df.to_csv(output_file, index=False)
-# print(f"Scraped {len(laptop_data)} laptop products.")
-# print(f"Data saved to {output_file}")
-import json
 
-# Convert output path to absolute
-script_dir = os.path.dirname(os.path.abspath(__file__))
-output_dir = os.path.abspath(os.path.join(script_dir, "..", "data"))
-os.makedirs(output_dir, exist_ok=True)
+if __name__ == "__main__":
+    get_pool(headless=True)
+    try:
+        laptop_data = scrape_croma_laptops(max_products=1000)
+    finally:
+        close_pool()
 
-output_csv = os.path.join(output_dir, "croma_laptops.csv")
-backup_csv = os.path.join(script_dir, "croma_laptops_backup.csv")
-json_file = os.path.join(output_dir, "croma_laptops.json")
+    save_data(laptop_data)
 
-# Save CSV with fallback
-try:
+    # Print DataFrame summary
     df = pd.DataFrame(laptop_data)
-    df.to_csv(output_csv, index=False, encoding="utf-8-sig")
-    df.to_csv(backup_csv, index=False, encoding="utf-8-sig")
-    print(f"[✔] CSV saved to: {output_csv}")
-    print(f"[✔] Backup CSV saved to: {backup_csv}")
-except Exception as e:
-    print(f"[✘] CSV Save Failed: {e}")
-
-# Redundant JSON Save
-try:
-    with open(json_file, "w", encoding="utf-8") as jf:
-        json.dump(laptop_data, jf, indent=2, ensure_ascii=False)
-    print(f"[✔] JSON backup saved to: {json_file}")
-except Exception as e:
-    print(f"[✘] JSON Save Failed: {e}")
-
-# Print DataFrame summary
-print("\n=== First 3 Products ===")
-print(df.head(3))
-print("\n=== Last 3 Products ===")
-print(df.tail(3))
-print(f"\nTotal Products: {len(df)}")
+    print("\n=== First 3 Products ===")
+    print(df.head(3))
+    print("\n=== Last 3 Products ===")
+    print(df.tail(3))
+    print(f"\nTotal Products: {len(df)}")
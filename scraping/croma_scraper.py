@@ -156,10 +156,29 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
+import os
 import time
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-import csv
+from selenium.webdriver.chrome.service import Service
+
+from scraping.common.dom import extract_cards
+from scraping.common.driver_setup import chromedriver_path, get_pool, lease_driver, close_pool
+from scraping.common.output import write_outputs
+from scraping.common.rate_limit import get_limiter
+from scraping.common.store import save_products, source_name
+from scraping.common.waits import install_network_tracker, scroll_sweep, wait_for_fields_filled, wait_for_new_cards
+
+CATALOG_URL = "https://www.croma.com/phones-wearables/c/1"
+CARD_CSS = "div.cp-product.typ-plp.plp-srp-typ"
+CARD_FIELDS = {
+    "name": ("h3.product-title.plp-prod-title", "text"),
+    "price": ("span.amount.plp-srp-new-amount", "text"),
+    "url": ("a[href^='/']", "href"),
+    "rating": ("span.rating-text", "text"),
+    "image": ("img", "src"),
+}
+
 def setup_driver():
     options = Options()
     options.add_argument("--disable-blink-features=AutomationControlled")
@@ -167,61 +186,102 @@ def setup_driver():
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_argument("--disable-infobars")
     options.add_argument("--disable-notifications")
-    driver = webdriver.Chrome(options=options)
+    driver = webdriver.Chrome(service=Service(chromedriver_path()), options=options)
     return driver
 
 def save_data(products, filename="data/croma_limited.csv"):
     if not products:
         print("[Croma] No data to save.")
         return
-    keys = products[0].keys()
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=keys)
-        writer.writeheader()
-        writer.writerows(products)
+    save_products(source_name(filename), products)
+    write_outputs(products, filename)
     print(f"[Croma] Saved {len(products)} products to {filename}")
 
-def scrape_croma_products(driver, max_products=1000):
-    driver.get("https://www.croma.com/phones-wearables/c/1")
-    products = []
+def scrape_croma_products(driver=None, max_products=1000, bulk=True):
+    """Keep clicking "View More" until `max_products` cards are listed, then extract them.
+    `bulk` resolves lazy content with one scroll sweep and reads every card in a
+    single script; bulk=False uses the old scroll-and-wait per card."""
+    with lease_driver(driver, url=CATALOG_URL) as driver:
+        get_limiter().wait(CATALOG_URL)
+        install_network_tracker(driver)
+        driver.get(CATALOG_URL)
+
+        print("[Croma] Initial page load...")
+        WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, CARD_CSS)))
+
+        previous_count = len(driver.find_elements(By.CSS_SELECTOR, CARD_CSS))
+
+        max_retries = 5
+        retries = 0
+
+        while retries < max_retries:
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+
+            try:
+                view_more = WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "button.btn-viewmore"))
+                )
+                ActionChains(driver).move_to_element(view_more).click().perform()
+                print("[Croma] Clicked View More")
+                retries = 0
+                # Next batch is in once cards stop arriving, no fixed sleep
+                wait_for_new_cards(driver, CARD_CSS, since=previous_count, quiet=0.3)
+            except Exception as e:
+                print(f"[Croma] View More error: {str(e)[:60]}")
+                retries += 1
+
+            current_count = len(driver.find_elements(By.CSS_SELECTOR, CARD_CSS))
+            print(f"[Croma] Current products: {current_count}")
+
+            if current_count >= max_products:
+                print(f"[Croma] Reached max limit of {max_products} products.")
+                break
 
-    print("[Croma] Initial page load...")
-    time.sleep(3)
+            if current_count == previous_count:
+                retries += 1
+            previous_count = current_count
 
-    previous_count = 0
-    max_retries = 5
-    retries = 0
+        if bulk:
+            products = extract_products(driver, max_products)
+        else:
+            products = extract_products_by_card(driver, max_products)
 
-    while retries < max_retries:
-        for _ in range(3):
-            driver.execute_script("window.scrollBy(0, 800)")
-            time.sleep(1)
+        save_data(products)
+        return products
 
-        try:
-            view_more = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "button.btn-viewmore"))
-            )
-            ActionChains(driver).move_to_element(view_more).click().perform()
-            print("[Croma] Clicked View More")
-            retries = 0
-            time.sleep(2)
-        except Exception as e:
-            print(f"[Croma] View More error: {str(e)[:60]}")
-            retries += 1
+def extract_products(driver, max_products):
+    """Resolve lazy prices with one scroll sweep, then read all cards in one round trip"""
+    scroll_sweep(driver, step_delay=0.1)
+    if not wait_for_fields_filled(driver, CARD_CSS, CARD_FIELDS["price"][0], timeout=10):
+        print("[Croma] Some prices did not render, those cards are skipped")
 
-        current_products = driver.find_elements(By.CSS_SELECTOR, "div.cp-product.typ-plp.plp-srp-typ")
-        print(f"[Croma] Current products: {len(current_products)}")
+    # Saved for debugging and as the offline benchmark's page (benchmarks/offline_suite.py)
+    os.makedirs("debug", exist_ok=True)
+    with open("debug/croma_page_1.html", "w", encoding="utf-8") as f:
+        f.write(driver.page_source)
 
-        if len(current_products) >= max_products:
-            print(f"[Croma] Reached max limit of {max_products} products.")
-            break
+    cards = extract_cards(driver, CARD_CSS, CARD_FIELDS)[:max_products]
+    products = [p for p in map(clean_product, cards) if p]
 
-        if len(current_products) == previous_count:
-            retries += 1
-        previous_count = len(current_products)
+    print(f"[Croma] Extracted {len(products)} products")
+    return products
 
-    # Final scraping of the visible product cards
-    product_cards = driver.find_elements(By.CSS_SELECTOR, "div.cp-product.typ-plp.plp-srp-typ")[:max_products]
+def clean_product(raw):
+    """Product row from the raw CARD_FIELDS values of one card, None without a name or price"""
+    if not raw["name"] or not raw["price"]:
+        return None
+    return {
+        'name': raw["name"],
+        'price': raw["price"].replace('₹', '').replace(',', '').strip(),
+        'url': raw["url"],
+        'rating': raw["rating"].split()[0] if raw["rating"] else 'N/A',
+        'image': raw["image"],
+    }
+
+def extract_products_by_card(driver, max_products):
+    """Old path: scroll each card into view and wait for its price (slow, ~0.5 s per card)"""
+    products = []
+    product_cards = driver.find_elements(By.CSS_SELECTOR, CARD_CSS)[:max_products]
     print(f"[Croma] Scraping {len(product_cards)} products...")
 
     for card in product_cards:
@@ -250,13 +310,12 @@ def scrape_croma_products(driver, max_products=1000):
         except Exception as e:
             print(f"[Croma] Partial extraction error: {str(e)[:50]}")
 
-    save_data(products)
     return products
 if __name__ == "__main__":
-    driver = setup_driver()
+    get_pool(factory=setup_driver, rotate_user_agent=False)
     try:
-        scrape_croma_products(driver, max_products=1000)  # Adjust max_products if needed
+        scrape_croma_products(max_products=1000)  # Adjust max_products if needed
     finally:
-        driver.quit()
+        close_pool()
 
 
@@ -1,50 +1,61 @@
 import os
-import csv
-import time
-import random
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from bs4 import SoupStrainer
 
+from scraping.common.driver_setup import get_pool, close_pool
+from scraping.common.checkpoint import Checkpoint
+from scraping.common.crawler import PageTask
 
-def setup_driver():
-    options = Options()
-    options.add_argument('--headless')
-    options.add_argument('--disable-gpu')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--window-size=1920,1080')
-    driver = webdriver.Chrome(options=options)
-    return driver
+from scraping.common.fetch import fetch_html
+from scraping.common.metrics import get_recorder
+from scraping.common.output import write_outputs
+from scraping.common.parsing import get_backend
+from scraping.common.pipeline import scrape_pages_pipelined
+from scraping.common.rate_limit import get_limiter
+from scraping.common.selector_registry import get_site
+from scraping.common.state import products_ready, state_products
 
 
+from scraping.common.store import save_products, source_name
+from scraping.common.tabs import css_ready, scrape_pages_in_tabs
+from scraping.common.waits import install_network_tracker, wait_for_images_settled, wait_for_network_idle, wait_for_stable_count
 
+LISTING_READY = products_ready("flipkart", "tUxRFH")
+SEARCH_URL = "https://www.flipkart.com/search?q=laptop&page={}"
+CARD_CSS = "div.tUxRFH"
+CARD_STRAINERS = [SoupStrainer("div", class_="tUxRFH")]
+SELECTORS = get_site("flipkart_laptops")
 
-def scrape_product(item):
+
+latency = get_recorder("flipkart_laptops")
+
+
+def scrape_product(item, backend=None):
+    b = backend or get_backend()
     try:
         # Title and product URL
-        link_tag = item.select_one("a.CGtC98")
-        title_tag = item.select_one("img")
-        title = title_tag['alt'].strip() if title_tag and 'alt' in title_tag.attrs else "No Title"
-        product_url = f"https://www.flipkart.com{link_tag['href']}" if link_tag and 'href' in link_tag.attrs else "No URL"
+        link_tag = SELECTORS["link"].find(b, item)
+        title_tag = SELECTORS["image"].find(b, item)
+        alt = b.attr(title_tag, "alt") if title_tag else None
+        title = alt.strip() if alt is not None else "No Title"
+        href = b.attr(link_tag, "href") if link_tag else None
+        product_url = f"https://www.flipkart.com{href}" if href is not None else "No URL"
 
         # Image URL
-        image_url = title_tag['src'] if title_tag and 'src' in title_tag.attrs else "No Image"
+        src = b.attr(title_tag, "src") if title_tag else None
+        image_url = src if src is not None else "No Image"
 
         # Price
-        price_tag = item.select_one("div.Nx9bqj._4b5DiR")
-        price = price_tag.text.strip().replace("₹", "").replace(",", "") if price_tag else "0"
+        price_tag = SELECTORS["price"].find(b, item)
+        price = b.text(price_tag).strip().replace("₹", "").replace(",", "") if price_tag else "0"
 
         # # Rating
-        rating_tag = item.select_one("div.XQDdHH")
-        rating = rating_tag.text.strip() if rating_tag else "No Rating"
+        rating_tag = SELECTORS["rating"].find(b, item)
+        rating = b.text(rating_tag).strip() if rating_tag else "No Rating"
         
 
         # Specs (sometimes inside ul tag)
-        specs_tags = item.select("ul.gUuXy- li")
-        specs = [li.text.strip() for li in specs_tags] if specs_tags else []
+        specs_tags = SELECTORS["specs"].find_all(b, item)
+        specs = [b.text(li).strip() for li in specs_tags] if specs_tags else []
 
         return {
             'title': title,
@@ -60,79 +71,146 @@ def scrape_product(item):
         return None
 
 
-def scrape_flipkart_laptops(driver, pages=40):
-    all_products = []
-
-    for page in range(1, pages + 1):
-        url = f"https://www.flipkart.com/search?q=laptop&page={page}"
-        print(f"\nScraping page {page}: {url}")
-
-        try:
-            driver.get(url)
-            print("Page title:", driver.title)
-            time.sleep(3 + random.uniform(1, 2))
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.tUxRFH"))
-            )
-            time.sleep(2)
-
-            if not os.path.exists('debug'):
-                os.makedirs('debug')
-            with open(f'debug/page_laptop_{page}.html', 'w', encoding='utf-8') as f:
-                f.write(driver.page_source)
-
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            listings = soup.select("div.tUxRFH")
-            print(f"Found {len(listings)} product containers")
-
-            if listings:
-                with open(f'debug/product_sample_laptop_{page}.html', 'w', encoding='utf-8') as f:
-                    f.write(str(listings[0]))
-
-            page_products = []
-            for idx, item in enumerate(listings, 1):
-                product = scrape_product(item)
-                if product:
-                    page_products.append(product)
-                    print(f"[Page {page}] Product {idx}: {product['title'][:30]}... (₹{product['price']})")
+def state_product(record):
+    """Same product shape as scrape_product, from a scraping.common.state record"""
+    return {
+        'title': record["title"],
+        'price': str(int(record["price"])),
+        'rating': str(record["rating"]) if record["rating"] else "No Rating",
+        'specs': record["specs"],
+        'product_url': record["url"] or "No URL",
+        'image_url': record["image_url"] or "No Image"
+    }
+
+
+def load_listing_page(driver, url, page):
+    """Open a search page in the browser and return its HTML once the listing is rendered"""
+    install_network_tracker(driver)
+    driver.get(url)
+    print("Page title:", driver.title)
+    wait_for_stable_count(driver, "div.tUxRFH", timeout=15)
+    return harvest_listing_page(driver, page)
+
+
+def harvest_listing_page(driver, page):
+    """Scroll a rendered search page so lazy content loads, then return its HTML"""
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    wait_for_network_idle(driver, idle_for=0.5, timeout=5)
+    wait_for_images_settled(driver, "div.tUxRFH img", timeout=3)
+    latency.record_transfer(page, driver)
+    return driver.page_source
+
+
+def fetch_listing_page(url, page, driver=None):
+    # Politeness comes from the shared per-domain limiter inside fetch_html and is
+    # not counted in the recorded latency
+    html, source = fetch_html(url, ready=LISTING_READY, driver=driver, latency=latency, page=page,
+                              load=lambda d, u: load_listing_page(d, u, page))
+    print(f"Fetched page {page} via {source}")
+    return html
+
+
+def parse_listing_page(html, page):
+    if not os.path.exists('debug'):
+        os.makedirs('debug')
+    with open(f'debug/page_laptop_{page}.html', 'w', encoding='utf-8') as f:
+        f.write(html)
+
+    # Embedded state first, the card selectors only for pages without it
+    page_products = [state_product(record) for record in state_products(html, "flipkart")]
+    if page_products:
+        print(f"Found {len(page_products)} products in the page state")
+        return page_products
+
+    backend = get_backend()
+    listings = backend.cards(html, CARD_CSS, strainers=CARD_STRAINERS)
+    print(f"Found {len(listings)} product containers")
+
+    if listings:
+        with open(f'debug/product_sample_laptop_{page}.html', 'w', encoding='utf-8') as f:
+            f.write(backend.html(listings[0]))
+
+    page_products = []
+    for idx, item in enumerate(listings, 1):
+        product = scrape_product(item, backend)
+        if product:
+            page_products.append(product)
+            print(f"[Page {page}] Product {idx}: {product['title'][:30]}... (₹{product['price']})")
+    return page_products
+
+
+def scrape_flipkart_laptops(driver=None, pages=40, tabs=0, resume=False, parse_workers=0, checkpoint=None):
+    """Same as scrape_flipkart_mobiles: HTTP first with a browser fallback, or with
+    `tabs` > 1 all pages rendered in that many tabs of a single browser, or with
+    `parse_workers` > 0 parsed in worker processes while the next page is fetched.
+    A caller's `checkpoint` is used instead of a fresh one and left for the caller to
+    finish; when it streams to a sink the products go there and are not returned."""
+    own = checkpoint is None
+    if own:
+        checkpoint = Checkpoint("flipkart_laptops", resume=resume)
+    if tabs > 1:
+        all_products = scrape_pages_in_tabs(
+            {page: SEARCH_URL.format(page) for page in range(1, pages + 1)},
+            ready=css_ready("div.tUxRFH"), parse=parse_listing_page, harvest=harvest_listing_page,
+            driver=driver, tabs=tabs, latency=latency, checkpoint=checkpoint)
+    elif parse_workers > 0:
+        all_products = scrape_pages_pipelined(
+            range(1, pages + 1), fetch=lambda page: fetch_listing_page(SEARCH_URL.format(page), page, driver=driver),
+            parse=parse_listing_page, workers=parse_workers, checkpoint=checkpoint,
+            on_empty=lambda page: get_limiter().failure(SEARCH_URL.format(page), "empty page"))
+    else:
+        all_products = checkpoint.products() if checkpoint.sink is None else []
+        for page in checkpoint.pending(range(1, pages + 1)):
+            url = SEARCH_URL.format(page)
+            print(f"\nScraping page {page}: {url}")
+
+            try:
+                html = fetch_listing_page(url, page, driver=driver)
+                page_products = parse_listing_page(html, page)
+                checkpoint.record(page, page_products)
+                if checkpoint.sink is None:
+                    all_products.extend(page_products)
+                print(f"Page {page} complete - Valid products: {len(page_products)}")
+                if not page_products:
+                    print(f"No valid products found on page {page}. Stopping early.")
+                    get_limiter().failure(url, "empty page")
+                    break
+
+            except Exception as e:
+                print(f"Error scraping page {page}: {str(e)[:100]}")
+                continue
+
+    if own:
+        checkpoint.finish()
+    latency.report()
+    return all_products
 
-            all_products.extend(page_products)
-            print(f"Page {page} complete - Valid products: {len(page_products)}")
-            if not page_products:
-                print(f"No valid products found on page {page}. Stopping early.")
-                break
 
-        except Exception as e:
-            print(f"Error scraping page {page}: {str(e)[:100]}")
-            continue
-
-    return all_products
+def page_tasks(pages=40):
+    """One crawler task per search page, for scraping.common.crawler.crawl"""
+    return [
+        PageTask(job="flipkart_laptops", page=page, url=SEARCH_URL.format(page),
+                 fetch=lambda url, page=page: fetch_listing_page(url, page),
+                 parse=parse_listing_page)
+        for page in range(1, pages + 1)
+    ]
 
 
 def save_data(data, filename='flipkart_laptops.csv'):
     if not data:
         print("No data to save.")
         return
-
-    keys = data[0].keys()
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=keys)
-        writer.writeheader()
-        for row in data:
-            row['specs'] = ', '.join(row['specs'])  # Join specs list for CSV
-            writer.writerow(row)
-
+    save_products(source_name(filename), data)
+    # Specs lists are joined with ", " in the CSV (the records are left as they are)
+    write_outputs(data, filename)
     print(f"\nSaved {len(data)} products to {filename}")
 
 
 
 if __name__ == "__main__":
-    driver = setup_driver()
+    get_pool(headless=True)
     try:
-        data = scrape_flipkart_laptops(driver, pages=3)
+        data = scrape_flipkart_laptops(pages=3)
         save_data(data, filename='flipkart_laptops.csv')
     finally:
-        driver.quit()
+        close_pool()
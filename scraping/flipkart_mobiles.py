@@ -1,142 +1,194 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from datetime import datetime
-import time
-import pandas as pd
 import os
 import json
-import random
-
-def setup_driver():
-    options = Options()
-    # Uncomment for headless mode (useful for automated servers)
-    # options.add_argument('--headless')  
-    options.add_argument('--disable-gpu')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--window-size=1920,1080')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
-    # Ignore SSL errors (more comprehensive)
-    options.add_argument('--ignore-certificate-errors')
-    options.add_argument('--ignore-ssl-errors')
-    options.add_argument('--incognito')
-
-    # Set realistic user agent
-    user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    options.add_argument(f'user-agent={user_agent}')
-    
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    return driver
 
-def scrape_flipkart_mobiles(driver, pages=40):
-    all_products = []
-    
-    for page in range(1, pages + 1):
-        url = f"https://www.flipkart.com/search?q=mobiles&page={page}"
-        print(f"\nScraping page {page}: {url}")
-        
-        try:
-            driver.get(url)
-            print("Page title:", driver.title)
-            time.sleep(3 + random.uniform(1, 2))  # 3 to 5 seconds delay to mimic human browsing
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            # Wait for product containers to load, improved selector
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div[data-id], div._1AtVbE, div._2kHMtA"))
-            )
-            time.sleep(2)  # Additional delay for stability
-            
-            # Save page source for debugging
-            if not os.path.exists('debug'):
-                os.makedirs('debug')
-            with open(f'debug/page_{page}.html', 'w', encoding='utf-8') as f:
-                f.write(driver.page_source)
-            
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            
-            # Find all potential product containers
-            listings = soup.select("div[data-id], div._1AtVbE, div._2kHMtA, div._1xHGtK")
-            print(f"Found {len(listings)} product containers")
-            
-            # Debug: Save first product container HTML
-            if listings:
-                with open(f'debug/product_sample_{page}.html', 'w', encoding='utf-8') as f:
-                    f.write(str(listings[0]))
-            
-            # Extract data from each product
-            page_products = []
-            for idx, item in enumerate(listings, 1):
-                product = scrape_product(item)
-                if product:
-                    page_products.append(product)
-                    print(f"[Page {page}] Product {idx}: {product['title'][:30]}... (₹{product['price']})")
-            
-            all_products.extend(page_products)
-            print(f"Page {page} complete - Valid products: {len(page_products)}")
-            if not page_products:
-                print(f"No valid products found on page {page}. Stopping early.")
-                break
-            
-        except Exception as e:
-            print(f"Error scraping page {page}: {str(e)[:100]}")
-            continue
-    
+from scraping.common.driver_setup import get_pool, close_pool
+from scraping.common.checkpoint import Checkpoint
+from scraping.common.crawler import PageTask
+
+from scraping.common.fetch import fetch_html
+from scraping.common.metrics import get_recorder
+from scraping.common.output import write_outputs
+from scraping.common.parsing import get_backend, text_pattern
+from scraping.common.pipeline import scrape_pages_pipelined
+from scraping.common.rate_limit import get_limiter
+from scraping.common.selector_registry import get_site
+from scraping.common.state import products_ready, state_products
+
+
+from scraping.common.store import save_products, source_name
+from scraping.common.tabs import css_ready, scrape_pages_in_tabs
+from scraping.common.waits import install_network_tracker, wait_for_images_settled, wait_for_network_idle, wait_for_stable_count
+
+# Title classes of a rendered product card or an embedded state blob; if the raw HTML
+# has none of them the page needs JS
+LISTING_READY = products_ready("flipkart", "KzDlHZ", "_4rR01T", "s1Q9rs", "IRpwTa")
+SEARCH_URL = "https://www.flipkart.com/search?q=mobiles&page={}"
+LISTING_CSS = "div[data-id], div._1AtVbE, div._2kHMtA"
+# Parsed product containers; the strainers let the tree builder keep only those
+CARD_CSS = "div[data-id], div._1AtVbE, div._2kHMtA, div._1xHGtK"
+CARD_STRAINERS = [
+    SoupStrainer("div", attrs={"data-id": True}),
+    SoupStrainer("div", class_=["_1AtVbE", "_2kHMtA", "_1xHGtK"]),
+]
+# Field selectors (fallback chains ordered by hit rate) live in the shared registry
+SELECTORS = get_site("flipkart_mobiles")
+# Fallbacks when none of the known review/delivery classes are present
+REVIEWS_TEXT = text_pattern("ratings", "reviews")
+DELIVERY_TEXT = text_pattern("delivery")
+
+latency = get_recorder("flipkart_mobiles")
+
+def load_listing_page(driver, url, page):
+    """Open a search page in the browser and return its HTML once the listing is rendered"""
+    install_network_tracker(driver)
+    driver.get(url)
+    print("Page title:", driver.title)
+    # Wait for product containers to load and stop changing, then for lazy content
+    wait_for_stable_count(driver, LISTING_CSS, timeout=15)
+    return harvest_listing_page(driver, page)
+
+def harvest_listing_page(driver, page):
+    """Scroll a rendered search page so lazy content loads, then return its HTML"""
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    wait_for_network_idle(driver, idle_for=0.5, timeout=5)
+    wait_for_images_settled(driver, "div[data-id] img", timeout=3)
+    latency.record_transfer(page, driver)
+    return driver.page_source
+
+def fetch_listing_page(url, page, driver=None):
+    # Politeness comes from the shared per-domain limiter inside fetch_html and is
+    # not counted in the recorded latency
+    html, source = fetch_html(url, ready=LISTING_READY, driver=driver, latency=latency, page=page,
+                              load=lambda d, u: load_listing_page(d, u, page))
+    print(f"Fetched page {page} via {source}")
+    return html
+
+def parse_listing_page(html, page):
+    """Parse every product container of a search page's HTML"""
+    # Save page source for debugging
+    if not os.path.exists('debug'):
+        os.makedirs('debug')
+    with open(f'debug/page_{page}.html', 'w', encoding='utf-8') as f:
+        f.write(html)
+
+    # Server-rendered pages carry every product in their state blob; the CSS path
+    # below is only needed when there is none (e.g. browser snapshots)
+    page_products = [state_product(record) for record in state_products(html, "flipkart")]
+    if page_products:
+        print(f"Found {len(page_products)} products in the page state")
+        return page_products
+
+    backend = get_backend()
+
+    # Find all potential product containers, building the tree only for them
+    listings = backend.cards(html, CARD_CSS, strainers=CARD_STRAINERS)
+    print(f"Found {len(listings)} product containers")
+
+    # Debug: Save first product container HTML
+    if listings:
+        with open(f'debug/product_sample_{page}.html', 'w', encoding='utf-8') as f:
+            f.write(backend.html(listings[0]))
+
+    # Extract data from each product
+    page_products = []
+    for idx, item in enumerate(listings, 1):
+        product = scrape_product(item, backend)
+        if product:
+            page_products.append(product)
+            print(f"[Page {page}] Product {idx}: {product['title'][:30]}... (₹{product['price']})")
+    return page_products
+
+def scrape_flipkart_mobiles(driver=None, pages=40, tabs=0, resume=False, parse_workers=0, checkpoint=None):
+    """Scrape search pages over plain HTTP, falling back to a browser (the given driver,
+    or one leased from the shared pool) when the HTML comes back without products.
+    With `tabs` > 1 pages are rendered concurrently in that many tabs of one browser.
+    With `parse_workers` > 0 pages are parsed in that many processes while the next
+    page is fetched. Finished pages are checkpointed; `resume` continues an interrupted run.
+    A caller's `checkpoint` is used instead of a fresh one and left for the caller to
+    finish; when it streams to a sink the products go there and are not returned."""
+    own = checkpoint is None
+    if own:
+        checkpoint = Checkpoint("flipkart_mobiles", resume=resume)
+    if tabs > 1:
+        all_products = scrape_pages_in_tabs(
+            {page: SEARCH_URL.format(page) for page in range(1, pages + 1)},
+            ready=css_ready(LISTING_CSS), parse=parse_listing_page, harvest=harvest_listing_page,
+            driver=driver, tabs=tabs, latency=latency, checkpoint=checkpoint)
+    elif parse_workers > 0:
+        all_products = scrape_pages_pipelined(
+            range(1, pages + 1), fetch=lambda page: fetch_listing_page(SEARCH_URL.format(page), page, driver=driver),
+            parse=parse_listing_page, workers=parse_workers, checkpoint=checkpoint,
+            on_empty=lambda page: get_limiter().failure(SEARCH_URL.format(page), "empty page"))
+    else:
+        all_products = checkpoint.products() if checkpoint.sink is None else []
+        for page in checkpoint.pending(range(1, pages + 1)):
+            url = SEARCH_URL.format(page)
+            print(f"\nScraping page {page}: {url}")
+
+            try:
+                html = fetch_listing_page(url, page, driver=driver)
+                page_products = parse_listing_page(html, page)
+                checkpoint.record(page, page_products)
+                if checkpoint.sink is None:
+                    all_products.extend(page_products)
+                print(f"Page {page} complete - Valid products: {len(page_products)}")
+                if not page_products:
+                    print(f"No valid products found on page {page}. Stopping early.")
+                    get_limiter().failure(url, "empty page")
+                    break
+
+            except Exception as e:
+                print(f"Error scraping page {page}: {str(e)[:100]}")
+                continue
+
+    if own:
+        checkpoint.finish()
+    latency.report()
     return all_products
-def scrape_product(item):
+
+
+def scrape_product(item, backend=None):
     """Extract data from a single product item, including image and link"""
+    b = backend or get_backend()
     try:
-        title = (item.select_one("div.KzDlHZ") or 
-                 item.select_one("div._4rR01T") or
-                 item.select_one("a.s1Q9rs") or
-                 item.select_one("a.IRpwTa"))
+        title = SELECTORS["title"].find(b, item)
         
-        price = (item.select_one("div._30jeq3") or
-                 item.select_one("div._30jeq3._1_WHN1") or
-                 item.select_one("div.Nx9bqj"))
+        price = SELECTORS["price"].find(b, item)
         
-        rating = (item.select_one("div.XQDdHH") or
-                  item.select_one("div._3LWZlK") or
-                  item.find('div', {'class': lambda x: x and 'rating' in x.lower()}))
+        rating = SELECTORS["rating"].find(b, item)
         
-        reviews = (item.select_one("span.Wphh3N") or
-                   item.select_one("span._2_R_DZ") or
-                   item.find('span', text=lambda x: x and ('ratings' in x.lower() or 'reviews' in x.lower())))
+        reviews = (SELECTORS["reviews"].find(b, item) or
+                   b.first_matching(item, "span", REVIEWS_TEXT))
         
-        specs = [li.text for li in item.select("li.J+igdf, li.rgWa7D, li._3YhLQA")]
+        specs = [b.text(li) for li in SELECTORS["specs"].find_all(b, item)]
         
-        delivery = (item.select_one("div.yiggsN") or
-                    item.select_one("div._3tcB5a") or
-                    item.find('div', text=lambda x: x and 'delivery' in x.lower()))
+        delivery = (SELECTORS["delivery"].find(b, item) or
+                    b.first_matching(item, "div", DELIVERY_TEXT))
         
         # Product link
-        a_tag = item.select_one("a.CGtC98") or item.select_one("a._1fQZEK") or item.select_one("a.IRpwTa")
-        product_url = "https://www.flipkart.com" + a_tag["href"] if a_tag and a_tag.has_attr("href") else None
+        a_tag = SELECTORS["link"].find(b, item)
+        href = b.attr(a_tag, "href") if a_tag else None
+        product_url = "https://www.flipkart.com" + href if href else None
 
         # Image URL (including support for lazy loading)
-        img_tag = item.select_one("img.DByuf4") or item.select_one("img._396cs4") or item.find("img")
+        img_tag = SELECTORS["image"].find(b, item)
         image_url = None
         if img_tag:
-            image_url = img_tag.get("src") or img_tag.get("data-src")
+            image_url = b.attr(img_tag, "src") or b.attr(img_tag, "data-src")
 
         if not title or not price:
             return None
 
         return {
             "timestamp": datetime.now().isoformat(),
-            "title": title.text.strip(),
-            "price": int(price.text.replace("₹", "").replace(",", "").strip()),
-            "rating": float(rating.text.strip().split()[0]) if rating else None,
-            "reviews": reviews.text.strip() if reviews else None,
+            "title": b.text(title).strip(),
+            "price": int(b.text(price).replace("₹", "").replace(",", "").strip()),
+            "rating": float(b.text(rating).strip().split()[0]) if rating else None,
+            "reviews": b.text(reviews).strip() if reviews else None,
             "specifications": " | ".join(specs) if specs else None,
-            "delivery": delivery.text.strip() if delivery else None,
+            "delivery": b.text(delivery).strip() if delivery else None,
             "product_url": product_url,
             "image_url": image_url
         }
@@ -144,29 +196,47 @@ def scrape_product(item):
         print(f"Error parsing product: {str(e)[:100]}")
         return None
 
+def state_product(record):
+    """Same product shape as scrape_product, from a scraping.common.state record"""
+    reviews = None
+    if record["ratings"] is not None:
+        reviews = f"{record['ratings']} Ratings & {record['reviews'] or 0} Reviews"
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "title": record["title"],
+        "price": int(record["price"]),
+        "rating": float(record["rating"]) if record["rating"] else None,
+        "reviews": reviews,
+        "specifications": " | ".join(record["specs"]) or None,
+        "delivery": None,
+        "product_url": record["url"],
+        "image_url": record["image_url"]
+    }
+
+
+def page_tasks(pages=40):
+    """One crawler task per search page, for scraping.common.crawler.crawl"""
+    return [
+        PageTask(job="flipkart_mobiles", page=page, url=SEARCH_URL.format(page),
+                 fetch=lambda url, page=page: fetch_listing_page(url, page),
+                 parse=parse_listing_page)
+        for page in range(1, pages + 1)
+    ]
 
 def save_data(data, filename='flipkart_mobiles.csv'):
+    save_products(source_name(filename), data)
     try:
-        df = pd.DataFrame(data)
-        
-        # Save to CSV
-        df.to_csv(filename, index=False)
-        print(f"\nSaved {len(data)} products to {filename}")
-        
-        # Also save as JSON for debugging
-        json_file = filename.replace('.csv', '.json')
-        df.to_json(json_file, orient='records', indent=2)
-        print(f"Data also saved as {json_file} for inspection")
-        
+        # CSV plus JSON for inspection (or the formats configured in common/output.py)
+        write_outputs(data, filename)
     except Exception as e:
         print(f"Failed to save data: {e}")
 
 if __name__ == "__main__":
     print("Starting Flipkart Mobile Scraper...")
     
-    driver = setup_driver()
+    get_pool(headless=False)
     try:
-        data = scrape_flipkart_mobiles(driver, pages=3)
+        data = scrape_flipkart_mobiles(pages=3)
         if data:
             save_data(data)
             print("\nScraping completed successfully!")
@@ -176,7 +246,7 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"\nScraping failed: {e}")
     finally:
-        driver.quit()
+        close_pool()
         print("Driver closed.")
         print("Starting Flipkart Electronics Scraper...")
 
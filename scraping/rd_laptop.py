@@ -456,10 +456,19 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 import time
-import csv
 import os
 import random
 
+from scraping.common.checkpoint import Checkpoint
+from scraping.common.driver_setup import get_pool, lease_driver, close_pool
+
+from scraping.common.output import write_outputs
+from scraping.common.rate_limit import get_limiter
+from scraping.common.store import save_products, source_name
+from scraping.common.waits import install_network_tracker, wait_for_new_cards
+
+limiter = get_limiter()
+
 def create_driver(headless=False):
     options = uc.ChromeOptions()
     
@@ -504,87 +513,96 @@ def handle_popups(driver):
     except:
         pass
 
-def scrape_laptops(driver, max_pages=50):
-    product_data = []
+def scrape_laptops(driver=None, max_pages=50, resume=False):
+    # Pages are checkpointed as soon as they are scraped and `resume` picks up after a
+    # crash. Empty pages (scrape_page swallows errors) are not recorded, so they are retried.
+    checkpoint = Checkpoint("rd_laptops", resume=resume)
+    product_data = checkpoint.products()
     base_url = "https://www.reliancedigital.in/collection/popular-laptops?page="
     
-    for page_num in range(1, max_pages + 1):
+    for page_num in checkpoint.pending(range(1, max_pages + 1)):
         url = f"{base_url}{page_num}"
         print(f"\nScraping page {page_num}/{max_pages} - {url}")
-        
-        try:
-            # Load page with retry mechanism
-            retry_count = 0
-            while retry_count < 3:
-                try:
-                    driver.get(url)
-                    WebDriverWait(driver, 15).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "div.product-card"))
-                    )
-                    break
-                except (TimeoutException, WebDriverException) as e:
-                    retry_count += 1
-                    print(f"Retry {retry_count} for page load")
-                    if retry_count == 3:
-                        raise
-                    time.sleep(5)
-            
-            # Handle popups
-            handle_popups(driver)
-            
-            # Scroll to load all products
-            last_height = driver.execute_script("return document.body.scrollHeight")
-            while True:
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-                new_height = driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
-            
-            # Find all product cards
-            products = driver.find_elements(By.CSS_SELECTOR, "div.product-card")
-            print(f"Found {len(products)} products on page {page_num}")
-            
-            for product in products:
-                try:
-                    # Extract title
-                    title = product.find_element(By.CSS_SELECTOR, "div.product-card-title").text.strip()
-                    
-                    # Extract price
-                    price = product.find_element(By.CSS_SELECTOR, "div.price").text.strip()
-                    
-                    # Extract MRP
-                    mrp = product.find_element(By.CSS_SELECTOR, "div.mrp-amount").text.strip()
-                    
-                    # Extract URL
-                    product_url = product.find_element(By.CSS_SELECTOR, "a.product-card-image").get_attribute('href')
-                    
-                    # Extract image URL
-                    image = product.find_element(By.CSS_SELECTOR, "img.fy__img").get_attribute('src')
-                    
-                    product_data.append({
-                        "title": title,
-                        "price": price,
-                        "mrp": mrp,
-                        "url": product_url,
-                        "image_url": image,
-                        "page": page_num
-                    })
-                except Exception as e:
-                    print(f"Error extracting product: {str(e)[:100]}")
-            
-            # Random delay between pages to mimic human behavior
-            time.sleep(random.uniform(3, 7))
-            
-        except Exception as e:
-            print(f"Error during scraping page {page_num}: {str(e)[:200]}")
-            driver.save_screenshot(f"error_page_{page_num}.png")
-            print(f"Saved error screenshot as error_page_{page_num}.png")
-            continue
+
+        with lease_driver(driver, url=url) as page_driver:
+            page_data = scrape_page(page_driver, url, page_num)
+        if page_data:
+            checkpoint.record(page_num, page_data)
+
+        product_data.extend(page_data)
     
+    checkpoint.finish()
     return product_data
 
+def scrape_page(driver, url, page_num):
+    page_data = []
+    try:
+        # Load page with retry mechanism
+        retry_count = 0
+        while retry_count < 3:
+            # Shared per-domain limiter; it slows down after every failed attempt
+            limiter.wait(url)
+            try:
+                install_network_tracker(driver)
+                driver.get(url)
+                WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.product-card"))
+                )
+                limiter.success(url)
+                break
+            except (TimeoutException, WebDriverException) as e:
+                retry_count += 1
+                limiter.failure(url, "page load failed")
+                print(f"Retry {retry_count} for page load")
+                if retry_count == 3:
+                    raise
+        
+        # Handle popups
+        handle_popups(driver)
+        
+        # Scroll until a scroll brings in no new product cards
+        while wait_for_new_cards(driver, "div.product-card", scroll=True, quiet=0.5):
+            pass
+        
+        # Find all product cards
+        products = driver.find_elements(By.CSS_SELECTOR, "div.product-card")
+        print(f"Found {len(products)} products on page {page_num}")
+        
+        for product in products:
+            try:
+                # Extract title
+                title = product.find_element(By.CSS_SELECTOR, "div.product-card-title").text.strip()
+                
+                # Extract price
+                price = product.find_element(By.CSS_SELECTOR, "div.price").text.strip()
+                
+                # Extract MRP
+                mrp = product.find_element(By.CSS_SELECTOR, "div.mrp-amount").text.strip()
+                
+                # Extract URL
+                product_url = product.find_element(By.CSS_SELECTOR, "a.product-card-image").get_attribute('href')
+                
+                # Extract image URL
+                image = product.find_element(By.CSS_SELECTOR, "img.fy__img").get_attribute('src')
+                
+                page_data.append({
+                    "title": title,
+                    "price": price,
+                    "mrp": mrp,
+                    "url": product_url,
+                    "image_url": image,
+                    "page": page_num
+                })
+            except Exception as e:
+                print(f"Error extracting product: {str(e)[:100]}")
+        
+    except Exception as e:
+        print(f"Error during scraping page {page_num}: {str(e)[:200]}")
+        driver.save_screenshot(f"error_page_{page_num}.png")
+        print(f"Saved error screenshot as error_page_{page_num}.png")
+    
+    return page_data
+
 def save_to_csv(data, filename="laptops.csv"):
     if not data:
         print("No data to save")
@@ -592,23 +610,18 @@ def save_to_csv(data, filename="laptops.csv"):
     
     os.makedirs("data", exist_ok=True)
     filepath = os.path.join("data", filename)
-    
-    with open(filepath, "w", newline="", encoding="utf-8") as f:
-        fieldnames = ["title", "price", "mrp", "url", "image_url", "page"]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
+    save_products(source_name(filepath), data)
+    write_outputs(data, filepath, columns=["title", "price", "mrp", "url", "image_url", "page"])
     
     print(f"\nSaved {len(data)} products to {filepath}")
 
 if __name__ == "__main__":
-    driver = None
     try:
         print("Starting browser...")
-        driver = create_driver()
+        get_pool(factory=create_driver, rotate_user_agent=False)
         
         print("Scraping laptop data across 5 pages...")
-        products = scrape_laptops(driver, max_pages=50)
+        products = scrape_laptops(max_pages=50)
         
         print("\nSaving results...")
         save_to_csv(products)
@@ -616,9 +629,5 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"Fatal error: {e}")
     finally:
-        if driver:
-            print("Closing browser...")
-            try:
-                driver.quit()
-            except:
-                pass  # Ignore quit errors
\ No newline at end of file
+        print("Closing browser...")
+        close_pool()
\ No newline at end of file
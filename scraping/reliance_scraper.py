@@ -66,55 +66,127 @@
 #         driver.quit()
 
 
-import time
-import csv
-import json
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.chrome.service import Service
+
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+
+from scraping.common.driver_setup import chromedriver_path, get_pool, close_pool
+from scraping.common.fetch import fetch_html
+from scraping.common.metrics import get_recorder
+from scraping.common.output import write_outputs
+from scraping.common.state import products_ready, state_products
+from scraping.common.store import save_products, source_name
+from scraping.common.tabs import css_ready, scrape_pages_in_tabs
+from scraping.common.waits import wait_for_stable_count
+
+BASE_URL = "https://www.reliancedigital.in"
+# Product cards of the collection pages: current markup, then the older one
+CARD_CSS = "div.card-wrapper, div.card-info-container"
+# Older collection pages wrap cards in card-info-container, current ones in card-wrapper
+CARDS_READY = products_ready("fynd", "card-info-container", "card-wrapper")
+latency = get_recorder("reliance")
 
 def setup_driver():
     options = Options()
     options.add_argument("--headless")
     options.add_argument("--window-size=1920,1080")
-    driver = webdriver.Chrome(options=options)
+    driver = webdriver.Chrome(service=Service(chromedriver_path()), options=options)
     return driver
-def scrape_reliance_5g_smartphones(driver, pages=30):
+
+def load_page(driver, url):
+    """Browser fallback: render the collection page and hand back its HTML"""
+    driver.get(url)
+    wait_for_stable_count(driver, CARD_CSS, timeout=15)
+    return harvest_page(driver, url)
+
+def harvest_page(driver, url):
+    latency.record_transfer(url, driver)
+    return driver.page_source
+
+def price_text(value):
+    return f"₹{value:,.2f}" if value is not None else None
+
+def read_card_wrapper(card):
+    """Every field of a current-markup product card (div.card-wrapper)"""
+    link = card.select_one("a.card-wrapper__body")
+    mrp = card.select_one(".card-wrapper__amount span")
+    offer = card.select_one(".card-offer")
+    image = card.select_one("img")
+    return {
+        "title": card.select_one(".card-title").get_text(strip=True),
+        "price": card.select_one(".card-discount-price").get_text(strip=True),
+        "mrp": mrp.get_text(strip=True) if mrp else None,
+        "discount": offer.get_text(strip=True) if offer else None,
+        "url": urljoin(BASE_URL, link["href"]) if link else None,
+        "image_url": image["src"] if image else None,
+        "availability": "Out of Stock" if card.select_one(".out-of-stock") else "In Stock"
+    }
+
+def parse_5g_page(html):
+    # Products from the storefront's embedded state when the page has it
+    records = state_products(html, "fynd")
+    if records:
+        return [{
+            "title": r["title"],
+            "price": price_text(r["price"]),
+            "mrp": price_text(r["mrp"]),
+            "availability": "In Stock" if r["in_stock"] else "Out of Stock"
+        } for r in records]
+
+    soup = BeautifulSoup(html, "lxml")
+    products = []
+
+    for card in soup.select("div.card-wrapper"):
+        try:
+            fields = read_card_wrapper(card)
+            products.append({key: fields[key] for key in ("title", "price", "mrp", "availability")})
+        except Exception as e:
+            print(f"Error scraping product: {e}")
+
+    for card in soup.select("div.card-info-container"):
+        try:
+            title = card.select_one(".product-card-title").get_text(strip=True)
+            price = card.select_one(".price").get_text(strip=True)
+
+            mrp_tag = card.select_one(".mrp-amount")
+            mrp = mrp_tag.get_text(strip=True) if mrp_tag else None
+
+            stock_tag = card.select_one(".out-of-stock")
+            availability = stock_tag.get_text(strip=True) if stock_tag else "In Stock"
+
+            products.append({
+                "title": title,
+                "price": price,
+                "mrp": mrp,
+                "availability": availability
+            })
+        except Exception as e:
+            print(f"Error scraping product: {e}")
+
+    return products
+
+def scrape_reliance_5g_smartphones(driver=None, pages=30, tabs=0):
     base_url = "https://www.reliancedigital.in/collection/5g-smartphones-250422?page_no={}&page_size=12&page_type=number"
+    if tabs > 1:
+        # One browser, `tabs` pages rendering at once
+        return scrape_pages_in_tabs(
+            {page: base_url.format(page) for page in range(1, pages + 1)},
+            ready=css_ready(CARD_CSS), parse=lambda html, page: parse_5g_page(html),
+            harvest=lambda d, page: harvest_page(d, base_url.format(page)),
+            driver=driver, tabs=tabs, latency=latency)
+
     all_products = []
 
     for page in range(1, pages + 1):
         print(f"[Reliance 5G] Scraping page {page}...")
-        driver.get(base_url.format(page))
-        time.sleep(3)  # Let the page load fully
-
-        product_cards = driver.find_elements(By.CSS_SELECTOR, "div.card-info-container")
-
-        for card in product_cards:
-            try:
-                title = card.find_element(By.CSS_SELECTOR, ".product-card-title").text.strip()
-                price = card.find_element(By.CSS_SELECTOR, ".price").text.strip()
-
-                try:
-                    mrp = card.find_element(By.CSS_SELECTOR, ".mrp-amount").text.strip()
-                except:
-                    mrp = None
-
-                try:
-                    availability = card.find_element(By.CSS_SELECTOR, ".out-of-stock").text.strip()
-                except:
-                    availability = "In Stock"
-
-                all_products.append({
-                    "title": title,
-                    "price": price,
-                    "mrp": mrp,
-                    "availability": availability
-                })
-            except Exception as e:
-                print(f"Error scraping product: {e}")
+        html, source = fetch_html(base_url.format(page), ready=CARDS_READY, driver=driver,
+                                  load=load_page, latency=latency, page=page)
+        page_products = parse_5g_page(html)
+        print(f"[Reliance 5G] Page {page}: {len(page_products)} products via {source}")
+        all_products.extend(page_products)
 
     return all_products
 
@@ -146,41 +218,63 @@ def scrape_reliance_5g_smartphones(driver, pages=30):
 #                 print(f"Error scraping a product: {e}")
 
 #     return all_products
-def scrape_reliance_best_selling(driver, pages=30):
+def parse_best_selling_page(html):
+    records = state_products(html, "fynd")
+    if records:
+        return [{
+            "title": r["title"],
+            "price": price_text(r["price"]),
+            "mrp": price_text(r["mrp"]),
+            "discount": f"{round((1 - r['price'] / r['mrp']) * 100)}% OFF" if r["mrp"] else None,
+            "url": r["url"],
+            "image_url": r["image_url"]
+        } for r in records]
+
+    soup = BeautifulSoup(html, "lxml")
+    products = []
+
+    for card in soup.select("div.card-wrapper"):
+        try:
+            fields = read_card_wrapper(card)
+            products.append({key: fields[key] for key in ("title", "price", "mrp", "discount", "url", "image_url")})
+        except Exception as e:
+            print(f"Error scraping a product: {e}")
+
+    for card in soup.select("div.card-info-container"):
+        try:
+            title = card.select_one(".product-card-title").get_text(strip=True)
+            price = card.select_one(".price-container .price").get_text(strip=True)
+            mrp = card.select_one(".mrp-amount").get_text(strip=True)
+            discount = card.select_one(".discount").get_text(strip=True)
+
+            # Extract URL and image
+            product_url = urljoin(BASE_URL, card.select_one("a[class*='product-card']")["href"])
+            image_url = card.select_one("img")["src"]
+
+            products.append({
+                "title": title,
+                "price": price,
+                "mrp": mrp,
+                "discount": discount,
+                "url": product_url,
+                "image_url": image_url
+            })
+        except Exception as e:
+            print(f"Error scraping a product: {e}")
+
+    return products
+
+def scrape_reliance_best_selling(driver=None, pages=30):
     base_url = "https://www.reliancedigital.in/collection/best-selling-phones-250422?page_no={}&page_size=12&page_type=number"
     all_products = []
 
     for page in range(1, pages + 1):
         print(f"[Reliance] Scraping Page {page}...")
-        driver.get(base_url.format(page))
-        time.sleep(4)
-
-        product_cards = driver.find_elements(By.CSS_SELECTOR, "div.card-info-container")
-
-        for card in product_cards:
-            try:
-                title = card.find_element(By.CSS_SELECTOR, ".product-card-title").text.strip()
-                price = card.find_element(By.CSS_SELECTOR, ".price-container .price").text.strip()
-                mrp = card.find_element(By.CSS_SELECTOR, ".mrp-amount").text.strip()
-                discount = card.find_element(By.CSS_SELECTOR, ".discount").text.strip()
-
-                # Extract URL and image
-                link_element = card.find_element(By.XPATH, ".//a[contains(@class, 'product-card')]")
-                product_url = link_element.get_attribute("href")
-
-                image_element = card.find_element(By.CSS_SELECTOR, "img")
-                image_url = image_element.get_attribute("src")
-
-                all_products.append({
-                    "title": title,
-                    "price": price,
-                    "mrp": mrp,
-                    "discount": discount,
-                    "url": product_url,
-                    "image_url": image_url
-                })
-            except Exception as e:
-                print(f"Error scraping a product: {e}")
+        html, source = fetch_html(base_url.format(page), ready=CARDS_READY, driver=driver,
+                                  load=load_page, latency=latency, page=page)
+        page_products = parse_best_selling_page(html)
+        print(f"[Reliance] Page {page}: {len(page_products)} products via {source}")
+        all_products.extend(page_products)
 
     return all_products
 
@@ -194,24 +288,17 @@ def scrape_reliance_best_selling(driver, pages=30):
 #     # Save to JSON
 #     with open(json_filename, "w", encoding="utf-8") as f:
 #         json.dump(data, f, indent=2, ensure_ascii=False)
-def save_data(data, csv_filename, json_filename):
-    # Save to CSV
-    keys = ["title", "price", "mrp", "discount", "url", "image_url"]
-    with open(csv_filename, "w", newline='', encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=keys)
-        writer.writeheader()
-        writer.writerows(data)
-
-    # Save to JSON
-    with open(json_filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def save_data(data, csv_filename, json_filename=None):
+    save_products(source_name(csv_filename), data)
+    write_outputs(data, csv_filename, columns=["title", "price", "mrp", "discount", "url", "image_url"],
+                  paths={"json": json_filename} if json_filename else None)
  
 
 if __name__ == "__main__":
-    driver = setup_driver()
+    get_pool(factory=setup_driver)
     try:
-        products = scrape_reliance_best_selling(driver, pages=30)
+        products = scrape_reliance_best_selling(pages=30)
         save_data(products, "data/reliance_mobiles.csv", "data/reliance_mobiles.json")
         print(f"\n✅ Scraped and saved {len(products)} products from Reliance Digital.")
     finally:
-        driver.quit()
+        close_pool()
@@ -1,10 +1,14 @@
 # scraping/run_scraper.py
 
 import argparse
-from common.driver_setup import setup_driver
+from scraping.common.driver_setup import get_pool, close_pool
+from scraping.common.parsing import BACKENDS, DEFAULT_PARSER, configure_parser
+from scraping.common.selector_registry import report_selectors
+
+
 from scraping.flipkart_mobiles import scrape_flipkart_mobiles
 
-from scraping.flipkart_laptop import scrape_flipkart_electronics
+from scraping.flipkart_laptop import scrape_flipkart_laptops
 
 def main():
     parser = argparse.ArgumentParser(description="Flipkart Scraper")
@@ -12,18 +16,24 @@ def main():
     parser.add_argument("--electronics", action="store_true", help="Scrape electronics")
     parser.add_argument("--pages", type=int, default=2, help="Number of pages to scrape")
     parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
+    parser.add_argument("--tabs", type=int, default=0, help="Render this many pages at once in tabs of one browser")
+    parser.add_argument("--parse-workers", type=int, default=0, help="Parse pages in worker processes while the next one is fetched")
+    parser.add_argument("--parser", choices=list(BACKENDS), default=DEFAULT_PARSER, help="HTML parser backend")
+    parser.add_argument("--full-resources", action="store_true", help="Don't block images, fonts, media and trackers")
     args = parser.parse_args()
 
-    driver = setup_driver(headless=args.headless)
+    configure_parser(args.parser)
+    get_pool(headless=args.headless, lean=not args.full_resources)
     try:
         if args.mobiles:
-            scrape_flipkart_mobiles(driver, pages=args.pages)
+            scrape_flipkart_mobiles(pages=args.pages, tabs=args.tabs, parse_workers=args.parse_workers)
         if args.electronics:
-            scrape_flipkart_electronics(driver, pages=args.pages)
+            scrape_flipkart_laptops(pages=args.pages, tabs=args.tabs, parse_workers=args.parse_workers)
         if not args.mobiles and not args.electronics:
             print("❗ Please specify at least one target: --mobiles or --electronics")
     finally:
-        driver.quit()
+        report_selectors()
+        close_pool()
         print("✅ Driver closed.")
 
 if __name__ == "__main__":
@@ -22,15 +22,18 @@
 #         df.to_csv(filename, index=False)
 # scraping/utils.py
 
-import os
-import pandas as pd
-import json
+from scraping.common.output import write_outputs
+from scraping.common.sink import read_jsonl
+from scraping.common.store import save_products, source_name
 
-def save_data(data, filename):
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    df = pd.DataFrame(data)
-    df.to_csv(filename, index=False)
-    print(f"✅ Saved {len(data)} records to {filename}")
-    json_file = filename.replace('.csv', '.json')
-    df.to_json(json_file, orient='records', indent=2)
-    print(f"🧾 Also saved JSON: {json_file}")
+def save_stream(stream_file, filename, source=None, pages=None):
+    """Store a streamed run (JSONL written page by page) in the product database and
+    write the output files, reading the stream one record at a time. `pages`: listing
+    pages the run covered (see save_products)."""
+    save_products(source or source_name(filename), read_jsonl(stream_file), pages)
+    write_outputs(read_jsonl(stream_file), filename)
+
+def save_data(data, filename, source=None, pages=None):
+    """Store the run in the product database, then write the output files (CSV and JSON by default)"""
+    save_products(source or source_name(filename), data, pages)
+    write_outputs(data, filename)
@@ -0,0 +1,46 @@
+import threading
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+
+import app
+from scraping.common.store import close_store, get_store, save_products
+
+
+def products(ids, price=100):
+    return [{"title": f"Phone {i}", "product_url": f"https://www.flipkart.com/p/itm{i}?pid=P{i}&lid=x",
+             "price": f"₹{price + i:,}"} for i in ids]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app, "_cache", {})
+    yield get_store()
+    close_store()
+
+
+def test_concurrent_requests_apply_every_delta_once(store):
+    save_products("flipkart_mobiles", products(range(50)), pages=1)
+    app.load_entries("flipkart_mobiles", "missing.json")
+
+    stop = threading.Event()
+
+    def serve():
+        while not stop.is_set():
+            app.load_entries("flipkart_mobiles", "missing.json")
+
+    readers = [threading.Thread(target=serve, daemon=True) for _ in range(4)]
+    for t in readers:
+        t.start()
+    for run in range(1, 8):
+        save_products("flipkart_mobiles", products(range(run, 50 + run), price=100 + run), pages=1)
+    stop.set()
+    for t in readers:
+        t.join(timeout=5)
+
+    served = app.load_entries("flipkart_mobiles", "missing.json")
+    key = lambda p: p["product_url"]
+    assert sorted(served, key=key) == sorted(store.products("flipkart_mobiles"), key=key)
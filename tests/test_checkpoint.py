@@ -0,0 +1,68 @@
+import json
+
+from scraping.common.checkpoint import Checkpoint
+from scraping.common.sink import JsonlSink, read_jsonl
+
+
+def page(n, size=3):
+    return [{"title": f"Phone {n}.{i}", "price": 100 * n + i} for i in range(size)]
+
+
+def log_entries(checkpoint):
+    with open(checkpoint.path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_with_a_sink_only_page_counts_are_logged(tmp_path):
+    sink = JsonlSink(str(tmp_path / "mobiles.stream.jsonl"))
+    checkpoint = Checkpoint("mobiles", directory=tmp_path, sink=sink)
+    checkpoint.record(1, page(1))
+    checkpoint.record(2, page(2, size=2))
+    sink.close()
+
+    assert [e for e in log_entries(checkpoint) if "page" in e] == [{"page": 1, "count": 3}, {"page": 2, "count": 2}]
+    assert checkpoint.pages == {1: 3, 2: 2}
+    assert list(read_jsonl(sink.path)) == page(1) + page(2, size=2)
+
+
+def test_resume_drops_stream_records_that_were_not_logged(tmp_path):
+    path = str(tmp_path / "mobiles.stream.jsonl")
+    sink = JsonlSink(path)
+    checkpoint = Checkpoint("mobiles", directory=tmp_path, sink=sink)
+    checkpoint.record(1, page(1))
+    # Crash after page 2 reached the stream but before it was logged, mid-way through page 3
+    sink.write_batch(page(2))
+    sink.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"title": "Pho')
+
+    sink = JsonlSink(path)
+    checkpoint = Checkpoint("mobiles", resume=True, directory=tmp_path, sink=sink)
+    assert checkpoint.pending([1, 2, 3]) == [2, 3]
+    checkpoint.record(2, page(2))
+    checkpoint.record(3, page(3))
+    sink.close()
+
+    assert list(read_jsonl(path)) == page(1) + page(2) + page(3)
+
+
+def test_resume_without_the_matching_stream_starts_over(tmp_path):
+    checkpoint = Checkpoint("mobiles", directory=tmp_path)
+    checkpoint.record(1, page(1))
+
+    sink = JsonlSink(str(tmp_path / "mobiles.stream.jsonl"))
+    checkpoint = Checkpoint("mobiles", resume=True, directory=tmp_path, sink=sink)
+    sink.close()
+    assert checkpoint.pending([1, 2]) == [1, 2]
+
+
+def test_resume_without_a_sink_replays_products(tmp_path):
+    checkpoint = Checkpoint("mobiles", directory=tmp_path)
+    checkpoint.record(1, page(1))
+    checkpoint.record(2, page(2))
+    with open(checkpoint.path, "a", encoding="utf-8") as f:
+        f.write('{"page": 3, "prod')
+
+    checkpoint = Checkpoint("mobiles", resume=True, directory=tmp_path)
+    assert checkpoint.products() == page(1) + page(2)
+    assert checkpoint.pending([1, 2, 3]) == [3]
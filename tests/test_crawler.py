@@ -0,0 +1,25 @@
+from scraping.common import crawler
+from scraping.common.crawler import PageTask, run_crawl
+
+
+class Limiter:
+    def __init__(self):
+        self.failures = []
+
+    def failure(self, url, reason=""):
+        self.failures.append((url, reason))
+
+
+def task(job, page, products, parse=True):
+    fetch = lambda url: products
+    return PageTask(job=job, page=page, url=f"https://www.{job}.com/search?page={page}", fetch=fetch,
+                    parse=(lambda raw, page: raw) if parse else None)
+
+
+def test_empty_parsed_pages_are_reported_to_the_limiter(monkeypatch):
+    limiter = Limiter()
+    monkeypatch.setattr(crawler, "get_limiter", lambda: limiter)
+    run_crawl([task("flipkart", 1, [{"title": "Phone"}]), task("flipkart", 2, []),
+               task("amazon", 1, [], parse=False)], max_in_flight=1)
+    # Fetch-only tasks (amazon) report their own empty pages
+    assert limiter.failures == [("https://www.flipkart.com/search?page=2", "empty page")]
@@ -0,0 +1,113 @@
+import threading
+import time
+
+from scraping.common import driver_setup
+from scraping.common.driver_setup import BLOCKED_PATTERNS, BLOCKED_RESOURCES, DriverPool, lease_driver
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+        self.cdp = []
+
+    def execute_script(self, script):
+        if self.quit_called:
+            raise RuntimeError("session gone")
+        return 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params))
+
+    def quit(self):
+        self.quit_called = True
+
+
+def run_leases(pool, threads=3, hold=0.02):
+    def work():
+        with pool.lease():
+            time.sleep(hold)
+
+    workers = [threading.Thread(target=work, daemon=True) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join(timeout=5)
+    return [t for t in workers if t.is_alive()]
+
+
+def test_waiters_are_woken_when_a_recycled_driver_is_discarded():
+    pool = DriverPool(size=1, max_pages=1, factory=FakeDriver, rotate_user_agent=False)
+    assert run_leases(pool) == []
+    assert pool._created == 0
+
+
+def test_waiters_are_woken_when_an_unhealthy_driver_is_discarded():
+    pool = DriverPool(size=1, max_pages=0, factory=FakeDriver, rotate_user_agent=False)
+
+    def work():
+        with pool.lease() as driver:
+            time.sleep(0.02)
+            driver.quit()  # fails the health check on release
+
+    workers = [threading.Thread(target=work, daemon=True) for _ in range(3)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join(timeout=5)
+    assert not any(t.is_alive() for t in workers)
+
+
+def test_drivers_are_reused_up_to_the_pool_size():
+    created = []
+
+    def factory():
+        created.append(FakeDriver())
+        return created[-1]
+
+    pool = DriverPool(size=2, max_pages=0, factory=factory, rotate_user_agent=False)
+    assert run_leases(pool, threads=6) == []
+    assert len(created) <= 2
+    pool.close()
+    assert all(d.quit_called for d in created)
+
+
+def blocked(driver):
+    return ("Network.setBlockedURLs", {"urls": BLOCKED_PATTERNS}) in driver.cdp
+
+
+def test_lean_profile_covers_pool_and_caller_drivers():
+    pool = DriverPool(size=1, factory=FakeDriver, rotate_user_agent=False, lean=True)
+    with lease_driver(pool=pool) as leased:
+        assert blocked(leased)
+    caller = FakeDriver()
+    with lease_driver(caller, pool=pool) as driver:
+        assert driver is caller
+        assert blocked(caller)
+    pool.close()
+
+
+def test_full_resources_block_nothing():
+    pool = DriverPool(size=1, factory=FakeDriver, rotate_user_agent=False, lean=False)
+    with lease_driver(pool=pool) as leased:
+        assert not blocked(leased)
+    caller = FakeDriver()
+    with lease_driver(caller, pool=pool):
+        assert not blocked(caller)
+    pool.close()
+
+
+def test_site_allowlist_is_applied_per_leased_url(monkeypatch):
+    monkeypatch.setitem(driver_setup.SITE_ALLOWLIST, "www.amazon.in", ["images", "*.woff2"])
+    pool = DriverPool(size=1, factory=FakeDriver, rotate_user_agent=False, lean=True)
+    with lease_driver(pool=pool, url="https://www.amazon.in/s?k=laptops&page=2") as leased:
+        urls = leased.cdp[-1][1]["urls"]
+    assert leased.cdp[-1][0] == "Network.setBlockedURLs"
+    assert not set(BLOCKED_RESOURCES["images"]) & set(urls)
+    assert "*.woff2" not in urls and "*.woff" in urls
+    assert set(BLOCKED_RESOURCES["trackers"]) <= set(urls)
+
+    # The same browser moving on to another site gets that site's profile
+    with lease_driver(pool=pool, url="https://www.flipkart.com/search?q=mobiles") as again:
+        assert again is leased
+        assert again.cdp[-1] == ("Network.setBlockedURLs", {"urls": BLOCKED_PATTERNS})
+    pool.close()
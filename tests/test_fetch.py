@@ -0,0 +1,70 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from scraping.common.fetch import contains_any, fetch_html
+
+URL = "https://www.flipkart.com/search?q=mobiles&page=1"
+
+
+class Limiter:
+    def __init__(self):
+        self.calls = []
+
+    def wait(self, url):
+        self.calls.append("wait")
+
+    def success(self, url):
+        self.calls.append("success")
+
+    def failure(self, url, reason=""):
+        self.calls.append(f"failure: {reason}")
+
+
+class Response:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+        self.url = URL
+        self.headers = {}
+
+
+class Session:
+    def __init__(self, text):
+        self.text = text
+
+    def get(self, url, timeout):
+        return Response(self.text)
+
+
+class Driver:
+    _lean = False
+
+
+def fetch(limiter, load):
+    return fetch_html(URL, ready=contains_any("data-id"), load=load, driver=Driver(),
+                      session=Session("<div id='app'></div>"), limiter=limiter)
+
+
+def test_browser_fallback_waits_once_and_reports_success():
+    limiter = Limiter()
+    html, source = fetch(limiter, lambda driver, url: "<div data-id='1'></div>")
+    assert source == "selenium"
+    assert limiter.calls.count("wait") == 1
+    assert limiter.calls[-1] == "success"
+
+
+def test_browser_timeout_is_reported_as_a_failure():
+    def load(driver, url):
+        raise TimeoutException()
+
+    limiter = Limiter()
+    with pytest.raises(TimeoutException):
+        fetch(limiter, load)
+    assert limiter.calls[-1] == "failure: browser timeout"
+
+
+def test_browser_page_that_is_still_not_ready_is_a_failure():
+    limiter = Limiter()
+    html, source = fetch(limiter, lambda driver, url: "<div>Something went wrong</div>")
+    assert source == "selenium"
+    assert limiter.calls[-1] == "failure: page not ready"
@@ -0,0 +1,74 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from scraping.common import history
+from scraping.common.history import append_history, product_history
+
+KEY = "/p/itm1?pid=P1"
+
+
+def record(price):
+    return {"title": "Phone", "product_url": f"https://www.flipkart.com{KEY}&lid=x", "price": f"₹{price:,}",
+            "rating": "4.3", "reviews": "1,234 Reviews"}
+
+
+@pytest.fixture
+def kolkata(monkeypatch):
+    # UTC+05:30: naive local times and UTC differ by hours and, near midnight, by a day
+    monkeypatch.setenv("TZ", "Asia/Kolkata")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture(params=["parquet", "npy"])
+def backend(request, monkeypatch):
+    if request.param == "parquet":
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr(history, "pq", None)
+    return request.param
+
+
+def test_observations_read_back_as_utc_in_a_non_utc_timezone(kolkata, backend, tmp_path):
+    # 02:00 local on the 5th is 20:30 UTC on the 4th
+    local = datetime(2024, 3, 5, 2, 0)
+    append_history("flipkart_mobiles", [record(12999)], local, directory=tmp_path)
+    append_history("flipkart_mobiles", [record(11999)], local + timedelta(hours=1), directory=tmp_path)
+
+    rows = product_history("flipkart_mobiles", KEY, directory=tmp_path)
+    assert [row["observed_at"] for row in rows] == [
+        datetime(2024, 3, 4, 20, 30, tzinfo=timezone.utc),
+        datetime(2024, 3, 4, 21, 30, tzinfo=timezone.utc),
+    ]
+    assert [row["price"] for row in rows] == [12999, 11999]
+    assert rows[0]["reviews"] == 1234
+    assert (tmp_path / "flipkart_mobiles" / "2024-03-04").is_dir()
+
+
+def test_since_is_compared_in_utc(kolkata, backend, tmp_path):
+    start = datetime(2024, 3, 5, 2, 0)
+    for hour in range(3):
+        append_history("flipkart_mobiles", [record(12999 - hour)], start + timedelta(hours=hour),
+                       directory=tmp_path)
+
+    naive = product_history("flipkart_mobiles", KEY, since=start + timedelta(hours=1), directory=tmp_path)
+    aware = product_history("flipkart_mobiles", KEY, since=datetime(2024, 3, 4, 21, 30, tzinfo=timezone.utc),
+                            directory=tmp_path)
+    assert [row["price"] for row in naive] == [12998, 12997]
+    assert aware == naive
+
+
+def test_backends_agree(kolkata, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    observed = datetime(2024, 3, 5, 2, 0)
+    append_history("flipkart_mobiles", [record(12999)], observed, directory=tmp_path / "parquet")
+    monkeypatch.setattr(history, "pq", None)
+    append_history("flipkart_mobiles", [record(12999)], observed, directory=tmp_path / "npy")
+    npy = product_history("flipkart_mobiles", KEY, directory=tmp_path / "npy")
+    monkeypatch.undo()
+    parquet = product_history("flipkart_mobiles", KEY, directory=tmp_path / "parquet")
+    assert parquet == npy
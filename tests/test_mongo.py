@@ -0,0 +1,156 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+pytest.importorskip("pymongo")
+
+from scraping.common.mongo import close_mongo, configure_mongo, get_mongo
+
+
+def products(n, price=100):
+    return [{"title": f"Phone {i}", "product_url": f"https://www.flipkart.com/p/itm{i}?pid=P{i}&lid=x",
+             "price": f"₹{price + i:,}"} for i in range(n)]
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+@pytest.fixture
+def client():
+    client = mongomock.MongoClient()
+    yield client
+    close_mongo()
+
+
+def test_upserts_are_keyed_on_source_and_product_key(client):
+    writer = configure_mongo(client=client, batch_size=10, flush_interval=0.1)
+    writer.write("flipkart_mobiles", products(25), run_id=1)
+    writer.write("flipkart_mobiles", products(25, price=90), run_id=2)
+    writer.write("amazon_mobiles", products(5), run_id=3)
+    writer.flush()
+
+    collection = client.scraper.products
+    assert collection.count_documents({}) == 30
+    assert collection.count_documents({"source": "flipkart_mobiles"}) == 25
+    doc = collection.find_one({"source": "flipkart_mobiles", "product_key": "/p/itm3?pid=P3"})
+    assert doc["price"] == 93.0
+    assert doc["observations"] == 2
+    assert doc["last_run"] == 2
+    assert doc["first_seen"] <= doc["last_seen"]
+
+
+def test_indexes_are_created(client):
+    configure_mongo(client=client)
+    indexes = client.scraper.products.index_information()
+    assert indexes["source_1_product_key_1"]["key"] == [("source", 1), ("product_key", 1)]
+    assert indexes["source_1_product_key_1"]["unique"]
+    assert "source_1_last_seen_1" in indexes
+
+
+def test_full_batches_are_sent_without_waiting_for_the_interval(client):
+    writer = configure_mongo(client=client, batch_size=5, flush_interval=60)
+    writer.write("flipkart_mobiles", products(12))
+    collection = client.scraper.products
+    assert wait_for(lambda: collection.count_documents({}) == 10)
+    time.sleep(0.2)
+    assert collection.count_documents({}) == 10  # the partial batch waits
+    writer.flush()
+    assert collection.count_documents({}) == 12
+
+
+def test_partial_batch_is_sent_after_the_flush_interval(client):
+    configure_mongo(client=client, batch_size=100, flush_interval=0.2)
+    get_mongo().write("flipkart_mobiles", products(3))
+    assert wait_for(lambda: client.scraper.products.count_documents({}) == 3)
+
+
+def test_write_blocks_while_the_database_lags(client):
+    writer = configure_mongo(client=client, batch_size=1, flush_interval=60, max_pending=1)
+    release = threading.Event()
+    bulk_write = writer.collection.bulk_write
+
+    def slow_bulk_write(*args, **kwargs):
+        release.wait(5)
+        return bulk_write(*args, **kwargs)
+
+    writer.collection.bulk_write = slow_bulk_write
+    scraper = threading.Thread(target=writer.write, args=("flipkart_mobiles", products(5)), daemon=True)
+    scraper.start()
+    scraper.join(timeout=0.3)
+    assert scraper.is_alive()  # one batch in flight, one queued, the rest can't be handed over
+
+    release.set()
+    scraper.join(timeout=5)
+    assert not scraper.is_alive()
+    writer.flush()
+    assert client.scraper.products.count_documents({}) == 5
+
+
+def test_close_flushes_everything_and_stops_the_writer(client):
+    writer = configure_mongo(client=client, batch_size=100, flush_interval=60)
+    writer.write("flipkart_mobiles", products(7))
+    close_mongo()
+    assert get_mongo() is None
+    assert client.scraper.products.count_documents({}) == 7
+    assert not writer._thread.is_alive()
+    with pytest.raises(RuntimeError):
+        writer.write("flipkart_mobiles", products(1))
+
+
+def test_lazy_configuration_creates_the_client_on_first_use(client, monkeypatch):
+    from scraping.common import mongo
+
+    created = []
+    monkeypatch.setattr(mongo, "MongoClient", lambda uri: created.append(uri) or client)
+    assert configure_mongo(uri="mongodb://localhost:27017", lazy=True) is None
+    assert created == [] and mongo._writer is None  # nothing to inherit across a fork yet
+
+    writer = get_mongo()
+    assert created == ["mongodb://localhost:27017"]
+    assert get_mongo() is writer
+
+
+def test_lazy_configuration_still_checks_the_uri(monkeypatch):
+    monkeypatch.setenv("MONGO_URI", "your_mongo_connection_string")
+    with pytest.raises(RuntimeError):
+        configure_mongo(lazy=True)
+
+
+def test_flush_waits_for_a_partial_batch_the_timer_already_took(client):
+    writer = configure_mongo(client=client, batch_size=100, flush_interval=0.1)
+    taken = threading.Event()
+    bulk_write = writer.collection.bulk_write
+
+    def slow_bulk_write(*args, **kwargs):
+        taken.set()
+        time.sleep(0.5)
+        return bulk_write(*args, **kwargs)
+
+    writer.collection.bulk_write = slow_bulk_write
+    writer.write("flipkart_mobiles", products(3))
+    assert taken.wait(3)
+    writer.flush()
+    assert client.scraper.products.count_documents({}) == 3
+
+
+def test_timestamps_are_utc(client, monkeypatch):
+    monkeypatch.setenv("TZ", "Asia/Kolkata")
+    time.tzset()
+    writer = configure_mongo(client=client, batch_size=100, flush_interval=60)
+    before = datetime.now(timezone.utc).replace(tzinfo=None)
+    writer.write("flipkart_mobiles", products(1))
+    writer.flush()
+    doc = client.scraper.products.find_one()
+    # BSON dates are UTC; a naive local time would be off by the UTC offset
+    assert before - timedelta(seconds=1) <= doc["last_seen"].replace(tzinfo=None) <= before + timedelta(seconds=5)
+    monkeypatch.undo()
+    time.tzset()
@@ -0,0 +1,13 @@
+from benchmarks.offline_suite import benchmark, failures
+
+
+def test_every_suite_extracts_products_and_fields_from_the_saved_pages():
+    # Reliance's first two saved pages have no product cards
+    results = benchmark(runs=1, limit=3)
+    assert failures(results) == []
+
+
+def test_a_suite_without_products_fails():
+    results = {"suites": {"croma_mobiles": {"pages": 0, "products": 0, "field_rates": {}},
+                          "amazon_mobiles": {"pages": 3, "products": 60, "field_rates": {"name": 0.8, "rating": 0.0}}}}
+    assert failures(results) == ["croma_mobiles: no products", "amazon_mobiles.rating: never extracted"]
@@ -0,0 +1,34 @@
+import pytest
+
+from scraping import flipkart_mobiles
+from scraping.common.parsing import available_backends, get_backend, text_pattern
+
+# Unknown class names, so delivery and reviews come from the text fallbacks
+NESTED_CARD = """
+<div class="card"><div class="row"><div class="col">
+  <div class="KzDlHZ">Phone A</div>
+  <div class="col-5"><div class="Nx9bqj">₹9,999</div></div>
+  <div class="meta">
+    <span class="counts"><span>1,234 Ratings</span><span>&amp;</span><span>56 Reviews</span></span>
+    <div class="ship"><div>Free delivery by Tomorrow</div></div>
+  </div>
+</div></div></div>
+"""
+
+
+@pytest.mark.parametrize("name", available_backends())
+def test_text_fallbacks_return_the_innermost_element(name):
+    backend = get_backend(name)
+    card = backend.cards(NESTED_CARD, "div.card")[0]
+
+    product = flipkart_mobiles.scrape_product(card, backend)
+    assert product["delivery"] == "Free delivery by Tomorrow"
+    assert product["reviews"] == "1,234 Ratings"
+
+
+@pytest.mark.parametrize("name", available_backends())
+def test_first_matching_skips_wrappers(name):
+    backend = get_backend(name)
+    card = backend.cards(NESTED_CARD, "div.card")[0]
+    found = backend.first_matching(card, "div", text_pattern("delivery"))
+    assert backend.text(found) == "Free delivery by Tomorrow"
@@ -0,0 +1,35 @@
+import pytest
+
+from scraping import flipkart_laptop, flipkart_mobiles, reliance_scraper
+
+# Listing pages captured from the live sites
+PAGES = [
+    (flipkart_mobiles.LISTING_READY, "debug/page_1.html", ("KzDlHZ", "_4rR01T", "s1Q9rs", "IRpwTa")),
+    (flipkart_laptop.LISTING_READY, "debug/page_laptop_1.html", ("tUxRFH",)),
+    (reliance_scraper.CARDS_READY, "scraping/page_source_3.html", ("card-info-container", "card-wrapper")),
+]
+EMPTY_STATE = '<script>window.__INITIAL_STATE__ = {"pageDataV4": {"page": {"data": {}}}};</script>'
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("ready, path, cards", PAGES)
+def test_captured_listing_page_is_ready(ready, path, cards):
+    assert ready(read(path))
+
+
+@pytest.mark.parametrize("ready, path, cards", PAGES)
+def test_state_marker_without_products_is_not_ready(ready, path, cards):
+    html = read(path)
+    for card in cards:
+        html = html.replace(card, "")
+    html = html.replace("</body>", EMPTY_STATE + "</body>")
+    assert not ready(html)
+
+
+@pytest.mark.parametrize("ready, path, cards", PAGES)
+def test_other_sites_pages_are_not_ready(ready, path, cards):
+    assert not ready(read("debug/amazon_page_1.html"))
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+import run_scraper
+from scraping.common.store import close_store, get_store
+
+
+def page(n, size=3):
+    return [{"title": f"Phone {n}.{i}", "product_url": f"https://www.flipkart.com/p/itm{n}{i}?pid=P{n}{i}&lid=x",
+             "price": f"₹{100 * n + i:,}"} for i in range(size)]
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    calls = {}
+
+    def scraper(name):
+        def scrape(pages, checkpoint, **options):
+            calls[name] = options
+            for n in checkpoint.pending(range(1, pages + 1)):
+                if n == calls.get("crash_at"):
+                    raise RuntimeError("browser died")
+                checkpoint.record(n, page(n))
+            return []
+        return scrape
+
+    monkeypatch.setattr(run_scraper, "ALL_JOBS", {
+        name: (scraper(name), f"data/{name}.csv", "example.com")
+        for name in ("flipkart_mobiles", "amazon_mobiles")
+    })
+    yield calls
+    close_store()
+
+
+def test_parallel_jobs_get_the_page_options(jobs):
+    for name in ("flipkart_mobiles", "amazon_mobiles"):
+        run_scraper.run_job(name, 3, tabs=4, resume=True, parse_workers=2)
+
+    assert jobs["flipkart_mobiles"] == {"tabs": 4, "parse_workers": 2}
+    assert jobs["amazon_mobiles"] == {}
+
+
+def test_jobs_are_saved_from_their_stream(jobs):
+    count, _ = run_scraper.run_job("amazon_mobiles", 3)
+
+    assert count == 9
+    assert len(get_store().products("amazon_mobiles")) == 9
+    with open("data/amazon_mobiles.json", encoding="utf-8") as f:
+        assert [p["title"] for p in json.load(f)] == [p["title"] for n in (1, 2, 3) for p in page(n)]
+
+
+def test_a_crashed_job_resumes_from_its_stream(jobs):
+    jobs["crash_at"] = 3
+    with pytest.raises(RuntimeError):
+        run_scraper.stream_job("flipkart_mobiles", 4)
+    assert get_store().products("flipkart_mobiles") == []
+
+    jobs["crash_at"] = None
+    assert run_scraper.stream_job("flipkart_mobiles", 4, resume=True) == 12
+    assert len(get_store().products("flipkart_mobiles")) == 12
@@ -0,0 +1,121 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from scraping import flipkart_mobiles, reliance_scraper
+from scraping.common.state import state_products
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def flipkart_info(pid, title="Phone", price=12999, mrp=15999, state="IN_STOCK"):
+    return {
+        "id": pid,
+        "titles": {"title": title},
+        "pricing": {"finalPrice": {"value": price}, "mrp": {"value": mrp}},
+        "rating": {"average": 4.3, "count": 1234, "reviewCount": 56},
+        "keySpecs": ["8 GB RAM", "128 GB ROM"],
+        "baseUrl": f"/phone/p/itm{pid}?pid={pid}",
+        "media": {"images": [{"url": "https://rukminim2.flixcart.com/{@width}/{@height}/x.jpeg?q={@quality}"}]},
+        "availability": {"displayState": state},
+    }
+
+
+def flipkart_page(*widgets):
+    state = {"pageDataV4": {"page": {"data": {"10003": [
+        {"widget": {"data": {"products": [{"productInfo": {"value": info}} for info in products]}}}
+        for products in widgets
+    ]}}}}
+    return f"<html><script>window.__INITIAL_STATE__ = {json.dumps(state)};</script><body></body></html>"
+
+
+def fynd_item(slug, name="Phone", price=19999, marked=24999, sellable=True):
+    return {"slug": slug, "name": name, "price": {"effective": {"min": price}, "marked": {"min": marked}},
+            "medias": [{"type": "video", "url": "https://cdn.example/v.mp4"},
+                       {"type": "image", "url": f"https://cdn.example/{slug}.jpg"}],
+            "rating": 4.1, "rating_count": 80, "review_count": 12, "sellable": sellable}
+
+
+def fynd_page(items):
+    data = {"props": {"pageProps": {"listing": {"items": items}}}}
+    return f'<html><script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script></html>'
+
+
+def test_flipkart_records_are_read_from_the_state_blob():
+    records = state_products(flipkart_page([flipkart_info("A1"), flipkart_info("B2", state="SOLD_OUT")]),
+                             "flipkart")
+    assert [r["url"] for r in records] == ["https://www.flipkart.com/phone/p/itmA1?pid=A1",
+                                           "https://www.flipkart.com/phone/p/itmB2?pid=B2"]
+    first = records[0]
+    assert (first["title"], first["price"], first["mrp"]) == ("Phone", 12999, 15999)
+    assert (first["rating"], first["ratings"], first["reviews"]) == (4.3, 1234, 56)
+    assert first["image_url"] == "https://rukminim2.flixcart.com/416/416/x.jpeg?q=70"
+    assert [r["in_stock"] for r in records] == [True, False]
+
+
+def test_flipkart_records_without_title_or_price_and_repeats_are_dropped():
+    untitled = flipkart_info("C3", title=None)
+    unpriced = flipkart_info("D4")
+    del unpriced["pricing"]["finalPrice"]
+    # A product shown again in a second widget (e.g. "sponsored") is only kept once
+    html = flipkart_page([flipkart_info("A1"), untitled, unpriced], [flipkart_info("A1", price=1)])
+    records = state_products(html, "flipkart")
+    assert [(r["url"], r["price"]) for r in records] == [("https://www.flipkart.com/phone/p/itmA1?pid=A1", 12999)]
+
+
+def test_fynd_records_are_read_from_next_data():
+    records = state_products(fynd_page([fynd_item("phone-a"), fynd_item("phone-b", sellable=False),
+                                        fynd_item("phone-a"), fynd_item("phone-c", name="")]), "fynd")
+    assert [r["url"] for r in records] == ["https://www.reliancedigital.in/product/phone-a",
+                                           "https://www.reliancedigital.in/product/phone-b"]
+    assert records[0]["image_url"] == "https://cdn.example/phone-a.jpg"
+    assert (records[0]["price"], records[0]["mrp"], records[0]["specs"]) == (19999, 24999, [])
+    assert [r["in_stock"] for r in records] == [True, False]
+
+
+def test_schemas_do_not_match_each_others_pages():
+    assert state_products(fynd_page([fynd_item("phone-a")]), "flipkart") == []
+    assert state_products(flipkart_page([flipkart_info("A1")]), "fynd") == []
+
+
+def test_flipkart_state_product_matches_the_card_shape():
+    product = flipkart_mobiles.state_product(state_products(flipkart_page([flipkart_info("A1")]), "flipkart")[0])
+    assert product["price"] == 12999
+    assert product["rating"] == 4.3
+    assert product["reviews"] == "1234 Ratings & 56 Reviews"
+    assert product["specifications"] == "8 GB RAM | 128 GB ROM"
+    assert product["product_url"] == "https://www.flipkart.com/phone/p/itmA1?pid=A1"
+    assert set(product) == {"timestamp", "title", "price", "rating", "reviews", "specifications", "delivery",
+                            "product_url", "image_url"}
+
+
+@pytest.fixture
+def scratch(tmp_path, monkeypatch):
+    # parse_listing_page saves the page under ./debug
+    monkeypatch.chdir(tmp_path)
+
+
+def test_flipkart_page_with_a_blob_uses_it(scratch):
+    products = flipkart_mobiles.parse_listing_page(flipkart_page([flipkart_info("A1")]), 1)
+    assert [p["product_url"] for p in products] == ["https://www.flipkart.com/phone/p/itmA1?pid=A1"]
+
+
+def test_flipkart_page_without_a_blob_falls_back_to_the_cards(scratch):
+    html = (ROOT / "debug" / "page_1.html").read_text(encoding="utf-8")
+    assert state_products(html, "flipkart") == []
+    products = flipkart_mobiles.parse_listing_page(html, 1)
+    assert products
+    assert all(p["title"] and p["price"] for p in products)
+
+
+def test_reliance_page_without_a_blob_falls_back_to_the_cards():
+    html = (ROOT / "scraping" / "page_source_3.html").read_text(encoding="utf-8")
+    assert state_products(html, "fynd") == []
+    assert reliance_scraper.parse_best_selling_page(html)
+
+    products = reliance_scraper.parse_best_selling_page(fynd_page([fynd_item("phone-a")]))
+    assert products == [{"title": "Phone", "price": reliance_scraper.price_text(19999),
+                         "mrp": reliance_scraper.price_text(24999), "discount": "20% OFF",
+                         "url": "https://www.reliancedigital.in/product/phone-a",
+                         "image_url": "https://cdn.example/phone-a.jpg"}]
@@ -0,0 +1,50 @@
+import pytest
+
+from scraping.common.store import close_store, get_store, save_products
+
+
+def products(ids, price=100):
+    return [{"title": f"Phone {i}", "product_url": f"https://www.flipkart.com/p/itm{i}?pid=P{i}&lid=x",
+             "price": f"₹{price + i:,}"} for i in ids]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # The store, history and delta logs all live under ./data
+    monkeypatch.chdir(tmp_path)
+    yield get_store()
+    close_store()
+
+
+def live_keys(store):
+    return {p["product_url"].split("/p/")[1].split("&")[0] for p in store.products("flipkart_mobiles")}
+
+
+def test_complete_run_marks_missing_products_disappeared(store):
+    save_products("flipkart_mobiles", products(range(4)), pages=2)
+    save_products("flipkart_mobiles", products(range(3)), pages=2)
+    assert live_keys(store) == {f"itm{i}?pid=P{i}" for i in range(3)}
+
+
+def test_empty_run_marks_nothing_disappeared(store):
+    save_products("flipkart_mobiles", products(range(4)), pages=2)
+    save_products("flipkart_mobiles", [], pages=0)
+    assert len(live_keys(store)) == 4
+
+
+def test_run_covering_fewer_pages_marks_nothing_disappeared(store):
+    save_products("flipkart_mobiles", products(range(4)), pages=2)
+    save_products("flipkart_mobiles", products(range(2)), pages=1)
+    assert len(live_keys(store)) == 4
+    # Compared with the latest run that reported pages, which was the partial one
+    save_products("flipkart_mobiles", products(range(3)), pages=1)
+    assert len(live_keys(store)) == 3
+
+
+def test_unchanged_products_get_last_seen_refreshed(store):
+    first = save_products("flipkart_mobiles", products(range(3)), pages=1)
+    second = save_products("flipkart_mobiles", products(range(3)), pages=1)
+    rows = store._conn.execute("SELECT first_seen, last_seen, last_run FROM products").fetchall()
+    assert len(rows) == 3
+    assert all(row["last_run"] == second != first for row in rows)
+    assert all(row["last_seen"] > row["first_seen"] for row in rows)
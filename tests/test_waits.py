@@ -0,0 +1,59 @@
+import json
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from scraping.common.waits import wait_for_new_cards
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="needs node to run the page script")
+
+# Just enough of a page for NEW_CARDS_JS: a card count, a body height, a
+# MutationObserver, and cards that arrive at the times in LOAD_AT (ms)
+PAGE = """
+let cards = 3, height = 2000, observe = null;
+global.window = {scrollTo() {}, __scraperInflight: 0};
+global.document = {querySelectorAll: () => ({length: cards}), body: {get scrollHeight() { return height; }}};
+global.MutationObserver = class { constructor(cb) { observe = cb; } observe() {} disconnect() {} };
+for (const ms of LOAD_AT) setTimeout(() => {
+    cards++;
+    height += 300;
+    observe([{addedNodes: [{nodeType: 1, matches: () => true}]}]);
+}, ms);
+new Function("arguments", SCRIPT)([...ARGS, result => { console.log(JSON.stringify(result)); process.exit(0); }]);
+"""
+
+
+class NodeDriver:
+    """Runs execute_async_script in node against PAGE"""
+
+    def __init__(self, load_at):
+        self.load_at = load_at
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def execute_async_script(self, script, *args):
+        source = (PAGE.replace("LOAD_AT", json.dumps(self.load_at)).replace("ARGS", json.dumps(args))
+                  .replace("SCRIPT", json.dumps(script)))
+        out = subprocess.run(["node", "-e", source], capture_output=True, text=True, timeout=30, check=True)
+        return json.loads(out.stdout)
+
+
+def timed(driver, **kwargs):
+    started = time.monotonic()
+    added = wait_for_new_cards(driver, "div.card", scroll=True, **kwargs)
+    return added, time.monotonic() - started
+
+
+def test_resolves_quickly_when_no_load_starts():
+    added, seconds = timed(NodeDriver([]), quiet=0.2, timeout=5)
+    assert added == 0
+    assert seconds < 2
+
+
+def test_waits_for_a_load_that_starts_within_the_grace_window():
+    # Starts after one quiet interval, which used to end the wait with 0
+    added, _ = timed(NodeDriver([300, 400, 500]), quiet=0.2, timeout=5)
+    assert added == 3